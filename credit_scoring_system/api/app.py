@@ -3,14 +3,28 @@
 
 from __future__ import annotations
 
+import time
+
+_T_IMPORT = time.perf_counter()
+
 import os
 import json
-from typing import Any, Dict, List
+import hashlib
+import threading
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List
+
+import numpy as np
+from fastapi import FastAPI, HTTPException, Body, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
 
-import joblib
-import pandas as pd
-from fastapi import FastAPI, HTTPException, Body
-from fastapi.responses import JSONResponse
+from credit_scoring_system.api import columnar, featurestore, jobs, streaming
+
+if TYPE_CHECKING:  # joblib/pandas are imported on first load/score, not at import
+    import pandas as pd
 
 APP_TITLE = "Credit Scoring API"
 APP_VERSION = "1.2.0"
@@ -25,7 +39,88 @@ JSON_POINTER = os.path.join(MODELS_ROOT, "PROD_POINTER.json")
 TXT_POINTER = os.path.join(MODELS_ROOT, "PROD_POINTER.txt")
 CONVENTIONAL_PROD = os.path.join(MODELS_ROOT, "PROD")
 
-app = FastAPI(title=APP_TITLE, version=APP_VERSION)
+try:
+    READY_WAIT_SEC = max(0.0, float(os.getenv("CREDIT_READY_WAIT_SEC", "30")))
+except Exception:
+    READY_WAIT_SEC = 30.0
+
+# Warm-up: a synthetic batch is scored while a bundle is built, before /ready
+# turns 200 or a reload swaps it in, so no request pays for lazy initialisation
+# and a model that cannot score is never served.
+WARMUP_ENABLED = os.getenv("CREDIT_WARMUP", "1") == "1"
+try:
+    WARMUP_ROWS = max(1, int(os.getenv("CREDIT_WARMUP_ROWS", "32")))
+except Exception:
+    WARMUP_ROWS = 32
+
+# /score_stream scores (and answers) this many NDJSON records at a time; larger
+# incoming Arrow batches are sliced to it. Bounds the endpoint's memory.
+try:
+    STREAM_CHUNK_ROWS = max(1, int(os.getenv("CREDIT_STREAM_CHUNK_ROWS", "10000")))
+except Exception:
+    STREAM_CHUNK_ROWS = 10_000
+
+# -----------------------------
+# startup / readiness
+# -----------------------------
+# The lifespan hook starts the model load on a background thread, so /livez
+# answers right after import and /ready turns 200 once the model is in memory.
+# Requests arriving earlier wait for the loader (up to CREDIT_READY_WAIT_SEC).
+_LOADER: threading.Thread | None = None
+STARTUP: Dict[str, Any] = {"import_ms": None, "model_load_ms": None, "time_to_ready_ms": None, "ready_at": None}
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    global _LOADER
+    t_start = time.perf_counter()
+
+    def _startup_load() -> None:
+        try:
+            bundle = reload_bundle(count=False)
+        except Exception:
+            return  # recorded in _LOAD_ERROR; /ready stays 503
+        STARTUP["time_to_ready_ms"] = round((time.perf_counter() - t_start) * 1000, 1)
+        STARTUP["ready_at"] = bundle["loaded_at"]
+        try:
+            FEATURE_STORE.current()  # after readiness: /score_by_id then skips the first build
+        except featurestore.FeatureStoreError:
+            pass  # recorded in FEATURE_STORE.last_error
+
+    _LOADER = threading.Thread(target=_startup_load, name="credit-startup-load", daemon=True)
+    _LOADER.start()
+    yield
+    _wait_for_startup()
+    JOBS.shutdown()
+
+def _wait_for_startup() -> None:
+    loader = _LOADER
+    if loader is not None and loader.is_alive():
+        loader.join(READY_WAIT_SEC)
+
+def _current_bundle() -> ModelBundle:
+    """
+    The bundle this request uses from start to finish. Waits for the startup
+    load; without a lifespan (bare import) loads on first use.
+    """
+    _wait_for_startup()
+    bundle = _BUNDLE
+    if bundle is None and _LOADER is None and _LOAD_ERROR is None:
+        try:
+            reload_bundle(count=False, only_if_missing=True)
+        except Exception:
+            pass
+        bundle = _BUNDLE
+    if bundle is None:
+        raise HTTPException(status_code=503, detail=_LOAD_ERROR or "Model not loaded")
+    return bundle
+
+app = FastAPI(title=APP_TITLE, version=APP_VERSION, lifespan=lifespan)
+
+# Portfolio rescoring jobs run in a process pool (see jobs.py), off the request threads
+JOBS = jobs.JobManager()
+
+# /score_by_id reads borrower features from the feature store (see featurestore.py)
+FEATURE_STORE = featurestore.FeatureStore()
 
 # -----------------------------
 # helpers
@@ -114,118 +209,378 @@ def _load_threshold(thr_path: str) -> float:
     except Exception:
         return DEFAULT_THRESHOLD
 
-def _get_proba(model, X: pd.DataFrame) -> List[float]:
+def _predict_pd(model, X: Any) -> np.ndarray:
     # Prefer predict_proba -> [p1], else decision_function/predict
     if hasattr(model, "predict_proba"):
-        proba = model.predict_proba(X)
-        try:
-            return [float(p) for p in proba[:, 1]]
-        except Exception:
-            return [float(p) for p in proba]
+        proba = np.asarray(model.predict_proba(X))
+        return proba[:, 1] if proba.ndim == 2 else proba
     if hasattr(model, "decision_function"):
-        df = model.decision_function(X)
-        return [float(p) for p in df]
-    pred = model.predict(X)
-    return [float(p) for p in pred]
+        return np.asarray(model.decision_function(X))
+    return np.asarray(model.predict(X))
+
+def _get_proba(model, X: pd.DataFrame) -> List[float]:
+    return [float(p) for p in _predict_pd(model, X)]
+
+def _warmup_records(raw_feats: Any, features: List[str], n: int) -> List[Dict[str, Any]]:
+    """Synthetic records from feature_list.json: varied numbers, a placeholder for categoricals."""
+    categorical = set(raw_feats.get("categorical_features") or []) if isinstance(raw_feats, dict) else set()
+    return [
+        {f: ("unknown" if f in categorical else float((i + j) % 10) * 0.5) for j, f in enumerate(features)}
+        for i in range(n)
+    ]
+
+def _warm_up(model, features: List[str], records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Run the /score and /score_batch paths once; returns ms per step. Errors propagate."""
+    import pandas as pd
+
+    out: Dict[str, Any] = {"rows": len(records)}
+    t = time.perf_counter()
+    _get_proba(model, pd.DataFrame(records[:1]).reindex(columns=features, fill_value=0))
+    out["score_one_ms"] = round((time.perf_counter() - t) * 1000, 3)
+    t = time.perf_counter()
+    proba = _predict_pd(model, pd.DataFrame(records).reindex(columns=features, fill_value=0))
+    out["score_batch_ms"] = round((time.perf_counter() - t) * 1000, 3)
+    if len(proba) != len(records) or not np.all(np.isfinite(proba)):
+        raise RuntimeError("Warm-up batch did not produce one finite PD per row")
+    return out
 
 # -----------------------------
 # Model bundle
 # -----------------------------
+@dataclass(frozen=True)
 class ModelBundle:
-    model = None
-    feature_list: List[str] = []
-    threshold: float = DEFAULT_THRESHOLD
-    prod_dir: str | None = None
-    load_error: Exception | None = None
-
-    @classmethod
-    def load(cls) -> None:
+    """One loaded PROD model with everything a request reads. Never mutated after load."""
+    model: Any
+    feature_list: List[str]
+    categorical: List[str]  # feature_list.json "categorical_features"; kept out of the float matrix
+    threshold: float
+    prod_dir: str
+    model_sha256: str
+    version: str  # short hash of model bytes + feature list + threshold
+    loaded_at: str
+    load_ms: float
+    warmup: Dict[str, Any] = field(default_factory=dict)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "model_sha256": self.model_sha256,
+            "model_dir": self.prod_dir,
+            "loaded_at": self.loaded_at,
+            "load_ms": self.load_ms,
+        }
+
+# Handlers read _BUNDLE once per request; a reload builds and warms a complete
+# new bundle first and then replaces it with a single assignment, so a request
+# never sees the features of one version with the model of another, and
+# scoring never waits for a model to deserialize.
+_BUNDLE: ModelBundle | None = None
+_LOAD_ERROR: str | None = None  # why there is no bundle (startup / first load failed)
+_RELOAD_LOCK = threading.Lock()  # one build at a time; readers never take it
+_RELOAD_STATS: Dict[str, Any] = {"reloads": 0, "failures": 0, "last_reload": None, "last_error": None, "in_progress": False}
+
+def _sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _bundle_version(model_sha256: str, features: List[str], threshold: float) -> str:
+    key = "|".join([model_sha256, json.dumps(features), repr(float(threshold))])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:12]
+
+def _build_bundle() -> ModelBundle:
+    """Load + warm a new bundle from the PROD dir. Raises on any problem."""
+    t0 = time.perf_counter()
+    prod = _resolve_prod_dir()
+
+    model_path = os.path.join(prod, "xgb_model.joblib")  # adjust if needed
+    feats_path = os.path.join(prod, "feature_list.json")
+    thr_path = os.path.join(prod, "threshold.json")
+
+    if not os.path.isfile(model_path):
+        raise RuntimeError(f"Missing model file: {model_path}")
+    if not os.path.isfile(feats_path):
+        raise RuntimeError(f"Missing feature_list.json: {feats_path}")
+
+    import joblib  # deferred: unpickling pulls in xgboost/sklearn
+
+    model_sha256 = _sha256_file(model_path)
+    model = joblib.load(model_path)
+
+    with open(feats_path, "r", encoding="utf-8") as f:
+        raw_feats = json.load(f)
+    feature_list = _parse_feature_list(raw_feats)
+    if not feature_list:
+        raise RuntimeError("Resolved feature_list is empty after parsing feature_list.json")
+    categorical = [str(f) for f in raw_feats.get("categorical_features") or []] if isinstance(raw_feats, dict) else []
+
+    threshold = _load_threshold(thr_path)
+    warmup: Dict[str, Any] = {}
+    if WARMUP_ENABLED:
+        # a model that cannot score the synthetic batch is never served
+        warmup = _warm_up(model, feature_list, _warmup_records(raw_feats, feature_list, WARMUP_ROWS))
+    return ModelBundle(
+        model=model,
+        feature_list=feature_list,
+        categorical=categorical,
+        threshold=threshold,
+        prod_dir=prod,
+        model_sha256=model_sha256,
+        version=_bundle_version(model_sha256, feature_list, threshold),
+        loaded_at=datetime.now().isoformat(timespec="seconds"),
+        load_ms=round((time.perf_counter() - t0) * 1000, 1),
+        warmup=warmup,
+    )
+
+def _swap_in(count: bool) -> Dict[str, Any]:
+    """Build + swap; caller holds _RELOAD_LOCK. On failure the current bundle keeps serving."""
+    global _BUNDLE, _LOAD_ERROR
+    previous = _BUNDLE
+    _RELOAD_STATS["in_progress"] = True
+    try:
+        bundle = _build_bundle()
+    except Exception as e:
+        if previous is None:
+            _LOAD_ERROR = str(e)
+        if count:
+            _RELOAD_STATS["failures"] += 1
+        _RELOAD_STATS["last_error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _RELOAD_STATS["in_progress"] = False
+    _BUNDLE = bundle
+    _LOAD_ERROR = None
+    STARTUP["model_load_ms"] = bundle.load_ms
+    if count:
+        _RELOAD_STATS.update(reloads=_RELOAD_STATS["reloads"] + 1, last_reload=bundle.loaded_at, last_error=None)
+    return {
+        **bundle.info(),
+        "previous_version": previous.version if previous is not None else None,
+        "changed": previous is None or previous.version != bundle.version,
+        "features": len(bundle.feature_list),
+    }
+
+def reload_bundle(count: bool = True, only_if_missing: bool = False) -> Dict[str, Any]:
+    """Build and warm a new bundle on the calling thread, then swap it in. Raises if the build fails."""
+    with _RELOAD_LOCK:
+        if only_if_missing and _BUNDLE is not None:
+            return _BUNDLE.info()
+        return _swap_in(count)
+
+def _start_background_reload() -> bool:
+    """Reload on a daemon thread; False if a reload is already running."""
+    if not _RELOAD_LOCK.acquire(blocking=False):
+        return False
+
+    def _run() -> None:
         try:
-            prod = _resolve_prod_dir()
-            cls.prod_dir = prod
-
-            model_path = os.path.join(prod, "xgb_model.joblib")  # adjust if needed
-            feats_path = os.path.join(prod, "feature_list.json")
-            thr_path = os.path.join(prod, "threshold.json")
-
-            if not os.path.isfile(model_path):
-                raise RuntimeError(f"Missing model file: {model_path}")
-            if not os.path.isfile(feats_path):
-                raise RuntimeError(f"Missing feature_list.json: {feats_path}")
-
-            cls.model = joblib.load(model_path)
-
-            with open(feats_path, "r", encoding="utf-8") as f:
-                raw_feats = json.load(f)
-            cls.feature_list = _parse_feature_list(raw_feats)
-            if not cls.feature_list:
-                raise RuntimeError("Resolved feature_list is empty after parsing feature_list.json")
-
-            cls.threshold = _load_threshold(thr_path)
-            cls.load_error = None
-        except Exception as e:
-            cls.model = None
-            cls.feature_list = []
-            cls.threshold = DEFAULT_THRESHOLD
-            cls.prod_dir = None
-            cls.load_error = e
-
-# Load at startup (non-fatal; report via /health)
-ModelBundle.load()
+            _swap_in(count=True)
+        except Exception:
+            pass  # recorded in _RELOAD_STATS
+        finally:
+            _RELOAD_LOCK.release()
+
+    threading.Thread(target=_run, name="credit-reload", daemon=True).start()
+    return True
+
+def _is_ready() -> bool:
+    return _BUNDLE is not None
+
+def _version_header(bundle: ModelBundle) -> Dict[str, str]:
+    return {"X-Model-Version": bundle.version}
 
 # -----------------------------
 # Routes
 # -----------------------------
+@app.get("/livez")
+async def livez():
+    # async: answers even when the scoring thread pool is saturated
+    return {"ok": True}
+
+@app.get("/ready")
+def ready():
+    content = {"ok": _is_ready(), "startup": STARTUP}
+    if _LOAD_ERROR:
+        content["error"] = _LOAD_ERROR
+    return JSONResponse(status_code=200 if content["ok"] else 503, content=content)
+
 @app.get("/health")
 def health():
-    if ModelBundle.load_error:
-        return JSONResponse(status_code=503, content={"ok": False, "error": str(ModelBundle.load_error)})
+    try:
+        b = _current_bundle()
+    except HTTPException as e:
+        return JSONResponse(status_code=503, content={"ok": False, "error": e.detail})
     return {
         "ok": True,
-        "features": len(ModelBundle.feature_list),
-        "threshold": ModelBundle.threshold,
-        "model_dir": ModelBundle.prod_dir,
-        "model_class": type(ModelBundle.model).__name__ if ModelBundle.model is not None else None,
+        "features": len(b.feature_list),
+        "threshold": b.threshold,
+        "model_dir": b.prod_dir,
+        "model_class": type(b.model).__name__,
         "version": APP_VERSION,
+        "bundle": b.info(),
+        "reloads": _RELOAD_STATS,
+        "startup": STARTUP,
+        "warmup": b.warmup,
+        "featurestore": FEATURE_STORE.info(),
     }
 
 @app.get("/features")
 def features():
-    if ModelBundle.load_error:
-        raise HTTPException(status_code=503, detail=str(ModelBundle.load_error))
-    return {"features": ModelBundle.feature_list}
+    b = _current_bundle()
+    return {"features": b.feature_list, "model_version": b.version}
 
 @app.post("/reload")
-def reload_model():
-    ModelBundle.load()
-    if ModelBundle.load_error:
-        return JSONResponse(status_code=503, content={"ok": False, "error": str(ModelBundle.load_error)})
-    return {"ok": True, "model_dir": ModelBundle.prod_dir, "features": len(ModelBundle.feature_list)}
+def reload_model(wait: bool = True):
+    """
+    Re-resolve the PROD dir, build and warm a new bundle, then swap it in.
+    The current bundle keeps serving while the new one loads, and also if it fails.
+    wait=false returns 202 at once and reloads on a background thread.
+    """
+    if not wait:
+        started = _start_background_reload()
+        current = _BUNDLE
+        return JSONResponse(status_code=202, content={
+            "ok": True,
+            "started": started,  # False: a reload was already running
+            "serving_version": current.version if current is not None else None,
+        })
+    try:
+        result = reload_bundle()
+    except Exception as e:
+        current = _BUNDLE
+        return JSONResponse(status_code=503, content={
+            "ok": False,
+            "error": str(e),
+            "serving_version": current.version if current is not None else None,
+        })
+    return {"ok": True, **result}
 
 @app.post("/score")
-def score_one(record: Dict[str, Any] = Body(...)):
-    if ModelBundle.load_error:
-        raise HTTPException(status_code=503, detail=str(ModelBundle.load_error))
+def score_one(response: Response, record: Dict[str, Any] = Body(...)):
+    b = _current_bundle()
+    response.headers.update(_version_header(b))
+    import pandas as pd
+
+    X = pd.DataFrame([record]).reindex(columns=b.feature_list, fill_value=0)
+    try:
+        p = float(_get_proba(b.model, X)[0])
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Scoring error: {e}")
+
+    return {"pd": p, "threshold": b.threshold, "decision": int(p >= b.threshold), "model_version": b.version}
+
+async def _raw_body(request: Request) -> bytes:
+    # read on the event loop; the scoring itself stays on the threadpool
+    return await request.body()
+
+_BATCH_BODY_DOC = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            columnar.JSON: {"schema": {"type": "object", "description": '{"records": [{...}]} or {"columns": {"feature": [...]}}'}},
+            columnar.ARROW: {"schema": {"type": "string", "format": "binary"}},
+            columnar.PARQUET: {"schema": {"type": "string", "format": "binary"}},
+        },
+    }
+}
+
+@app.post("/score_batch", openapi_extra=_BATCH_BODY_DOC)
+def score_batch(request: Request, body: bytes = Depends(_raw_body)):
+    """
+    Expect: {"records": [ {...}, {...} ]}, or a columnar batch (see columnar.py):
+    {"columns": {...}}, an Arrow IPC stream or a Parquet file, by Content-Type.
+    The response format follows Accept, defaulting to the request's format.
+    """
+    b = _current_bundle()
+    try:
+        batch = columnar.decode(body, request.headers.get("content-type"), b.feature_list)
+        out_fmt = columnar.negotiate(request.headers.get("accept"), batch.fmt)
+    except columnar.PayloadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    if batch.fmt == columnar.RECORDS:
+        return _score_records(b, batch.records, out_fmt)
 
-    X = pd.DataFrame([record]).reindex(columns=ModelBundle.feature_list, fill_value=0)
     try:
-        p = float(_get_proba(ModelBundle.model, X)[0])
+        X = columnar.feature_input(batch, b.feature_list, b.categorical, b.model)
+    except columnar.PayloadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    try:
+        proba = _predict_pd(b.model, X) if batch.rows else np.empty(0)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Scoring error: {e}")
+    content, media_type = columnar.encode(proba, b.threshold, out_fmt, b.version)
+    return Response(content=content, media_type=media_type, headers=_version_header(b))
+
+@app.post("/score_stream")
+async def score_stream(request: Request):
+    """
+    NDJSON or Arrow IPC stream in, scored and answered chunk by chunk (see streaming.py).
+    async: the handler only sets up the stream; reading and scoring run on the threadpool.
+    """
+    b = await run_in_threadpool(_current_bundle)  # one bundle for the whole stream
+    try:
+        in_fmt = streaming.input_format(request.headers.get("content-type"))
+        out_fmt = streaming.negotiate(request.headers.get("accept"), in_fmt)
+    except columnar.PayloadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
 
-    return {"pd": p, "threshold": ModelBundle.threshold, "decision": int(p >= ModelBundle.threshold)}
+    def score(batch: columnar.Batch) -> np.ndarray:
+        return _predict_pd(b.model, columnar.feature_input(batch, b.feature_list, b.categorical, b.model))
 
-@app.post("/score_batch")
-def score_batch(payload: Dict[str, Any] = Body(...)):
+    return streaming.stream_scores(request, in_fmt, out_fmt, b.feature_list, score, b.threshold, STREAM_CHUNK_ROWS,
+                                   b.version)
+
+@app.post("/score_by_id")
+def score_by_id(payload: Any = Body(...)):
     """
-    Expect: {"records": [ {...}, {...} ]}
+    Expect: {"borrower_id": "B001"} or {"borrower_ids": ["B001", ...]}.
+    Features come from the feature store; results keep request order and
+    unknown ids are listed under "missing" (404 for a single unknown id).
     """
-    if ModelBundle.load_error:
-        raise HTTPException(status_code=503, detail=str(ModelBundle.load_error))
+    b = _current_bundle()
+    try:
+        ids, single = featurestore.parse_ids(payload)
+        idx = FEATURE_STORE.current()
+    except featurestore.FeatureStoreError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    absent = [f for f in b.feature_list if f not in idx.columns]
+    if absent:
+        raise HTTPException(status_code=409, detail=(
+            f"Feature store lacks model features {absent}; rebuild it with build_features_credit.py"))
+
+    pos = idx.positions(ids) if ids else np.empty(0, dtype=np.int64)
+    found = pos >= 0
+    missing = [i for i, ok in zip(ids, found) if not ok]
+    if single and missing:
+        raise HTTPException(status_code=404, detail=f"Unknown borrower_id {ids[0]!r}")
+
+    try:
+        X = columnar.feature_input(idx.batch(pos[found]), b.feature_list, b.categorical, b.model)
+        proba = _predict_pd(b.model, X) if found.any() else np.empty(0)
+    except columnar.PayloadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Scoring error: {e}")
 
-    recs = payload.get("records")
-    if not isinstance(recs, list):
-        raise HTTPException(status_code=422, detail='Body must be {"records": [ {...}, {...} ]}')
+    hits = [i for i, ok in zip(ids, found) if ok]
+    results = [
+        {"borrower_id": i, "pd": float(p), "decision": int(float(p) >= b.threshold)}
+        for i, p in zip(hits, proba.tolist())
+    ]
+    return JSONResponse(headers=_version_header(b), content={
+        "count": len(results),
+        "threshold": b.threshold,
+        "model_version": b.version,
+        "features_loaded_at": idx.loaded_at,
+        "results": results,
+        "missing": missing,
+    })
+
+def _score_records(b: ModelBundle, recs: List[Any], out_fmt: str):
+    import pandas as pd
 
     rows: List[Dict[str, Any]] = []
     for r in recs:
@@ -237,17 +592,22 @@ def score_batch(payload: Dict[str, Any] = Body(...)):
             except Exception:
                 raise HTTPException(status_code=422, detail="Each record must be a JSON object (dict).")
 
-    if not rows:
-        return {"count": 0, "results": []}
+    if not rows and out_fmt == columnar.RECORDS:
+        return JSONResponse(headers=_version_header(b), content={
+            "count": 0, "results": [], "model_version": b.version})
 
-    X = pd.DataFrame(rows).reindex(columns=ModelBundle.feature_list, fill_value=0)
+    X = pd.DataFrame(rows).reindex(columns=b.feature_list, fill_value=0)
     try:
-        proba = _get_proba(ModelBundle.model, X)
+        proba = _predict_pd(b.model, X) if rows else np.empty(0)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Scoring error: {e}")
 
+    if out_fmt != columnar.RECORDS:
+        content, media_type = columnar.encode(proba, b.threshold, out_fmt, b.version)
+        return Response(content=content, media_type=media_type, headers=_version_header(b))
+
     results = [
-        {"pd": float(p), "threshold": ModelBundle.threshold, "decision": int(float(p) >= ModelBundle.threshold)}
+        {"pd": float(p), "threshold": b.threshold, "decision": int(float(p) >= b.threshold)}
         for p in proba
     ]
 
@@ -255,10 +615,51 @@ def score_batch(payload: Dict[str, Any] = Body(...)):
     debug = None
     if os.getenv("CREDIT_API_DEBUG") == "1":
         debug = {
-            "features_used": ModelBundle.feature_list,
+            "features_used": b.feature_list,
             "X_head": X.head(5).to_dict(orient="records"),
             "rows": len(X),
-            "model_dir": ModelBundle.prod_dir,
+            "model_dir": b.prod_dir,
         }
 
-    return {"count": len(results), "results": results, "debug": debug}
+    return JSONResponse(headers=_version_header(b), content={
+        "count": len(results), "results": results, "model_version": b.version, "debug": debug})
+
+# -----------------------------
+# Portfolio scoring jobs
+# -----------------------------
+@app.post("/jobs/score_portfolio", status_code=202)
+def submit_score_portfolio(payload: Dict[str, Any] = Body(default={})):
+    """
+    Optional: {"features_path", "loans_path", "model_dir", "partition_rows"}; paths
+    are relative to the repo root. Defaults are those of score_credit_portfolio.py.
+    """
+    try:
+        job = JOBS.submit(
+            features_path=payload.get("features_path"),
+            model_dir=payload.get("model_dir"),
+            loans_path=payload.get("loans_path"),
+            partition_rows=payload.get("partition_rows"),
+        )
+    except jobs.JobError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return job.to_dict()
+
+@app.get("/jobs")
+def list_jobs():
+    return {"jobs": JOBS.list()}
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job.to_dict()
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    job = JOBS.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job.to_dict()
+
+STARTUP["import_ms"] = round((time.perf_counter() - _T_IMPORT) * 1000, 1)
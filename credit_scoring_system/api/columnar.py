@@ -0,0 +1,199 @@
+# credit_scoring_system/api/columnar.py
+"""
+Content-negotiated batch payloads for /score_batch.
+
+Content-Type selects the decoder; Accept selects the encoder and defaults to
+the request's own format:
+
+  application/json                     {"records": [{...}, ...]}  (row objects, original format)
+                                       {"columns": {"f1": [...], "f2": [...]}}
+  application/vnd.apache.arrow.stream  Arrow IPC stream
+  application/vnd.apache.parquet       Parquet file (only the feature columns are read)
+
+Columnar inputs skip the per-row dicts and the DataFrame: every feature column
+is written once into a float64 matrix in feature_list order. Arrow buffers are
+read in place over the request body (one strided copy per column into the
+matrix, none per row). As on the record path, missing feature columns are 0
+and nulls are NaN. Results come back as two columns, `pd` and `decision`, in
+the negotiated format. Arrow and Parquet carry the threshold and model version
+in the schema metadata.
+
+pyarrow is imported on first use.
+"""
+from __future__ import annotations
+
+import io
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+JSON = "application/json"
+ARROW = "application/vnd.apache.arrow.stream"
+PARQUET = "application/vnd.apache.parquet"
+
+RECORDS = "records"  # JSON rows in / {"results": [...]} out
+COLUMNS = "columns"  # JSON columns in / {"columns": {"pd": [...], "decision": [...]}} out
+
+_MEDIA_ALIASES = {
+    "application/x-parquet": PARQUET,
+    "application/parquet": PARQUET,
+    "application/x-apache-arrow-stream": ARROW,
+}
+_FORMAT_MEDIA = {RECORDS: JSON, COLUMNS: JSON, ARROW: ARROW, PARQUET: PARQUET}
+
+class PayloadError(ValueError):
+    """Bad or unsupported payload; `status_code` is the HTTP status to answer with."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+@dataclass
+class Batch:
+    fmt: str  # RECORDS | COLUMNS | ARROW | PARQUET
+    rows: int
+    records: Optional[List[Any]] = None  # RECORDS only
+    columns: Any = None  # Dict[str, list] for COLUMNS, pyarrow.Table for ARROW / PARQUET
+
+    def column(self, name: str) -> Any:
+        if self.fmt == COLUMNS:
+            return self.columns.get(name)
+        if name in self.columns.column_names:
+            return self.columns.column(name)
+        return None
+
+# ---------- negotiation ----------
+def _media_type(header: Optional[str]) -> str:
+    mt = (header or "").split(";", 1)[0].strip().lower()
+    return _MEDIA_ALIASES.get(mt, mt)
+
+def negotiate(accept: Optional[str], request_fmt: str) -> str:
+    """Output format for an Accept header; the request's format when it allows anything."""
+    if not accept:
+        return request_fmt
+    for part in accept.split(","):
+        params = [p.strip() for p in part.split(";")]
+        if any(p.replace(" ", "") in ("q=0", "q=0.0") for p in params[1:]):
+            continue
+        mt = _media_type(params[0])
+        if mt in ("*/*", "application/*") or mt == _FORMAT_MEDIA[request_fmt]:
+            return request_fmt
+        if mt == JSON:
+            return COLUMNS
+        if mt in (ARROW, PARQUET):
+            return mt
+    raise PayloadError(406, f"Accept must allow one of: {JSON}, {ARROW}, {PARQUET}")
+
+# ---------- decoding ----------
+def decode(body: bytes, content_type: Optional[str], features: Sequence[str]) -> Batch:
+    mt = _media_type(content_type) or JSON
+    if mt == JSON or mt.endswith("+json"):
+        return _decode_json(body)
+    if mt == ARROW:
+        import pyarrow as pa
+
+        try:
+            table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+        except (pa.ArrowInvalid, OSError) as e:
+            raise PayloadError(422, f"Invalid Arrow IPC stream: {e}")
+        return Batch(ARROW, table.num_rows, columns=table)
+    if mt == PARQUET:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        try:
+            pf = pq.ParquetFile(pa.BufferReader(body))
+            present = set(pf.schema_arrow.names)
+            table = pf.read(columns=[f for f in features if f in present])
+        except (pa.ArrowInvalid, OSError) as e:
+            raise PayloadError(422, f"Invalid Parquet file: {e}")
+        return Batch(PARQUET, pf.metadata.num_rows, columns=table)
+    raise PayloadError(415, f"Unsupported Content-Type {content_type!r}; use {JSON}, {ARROW} or {PARQUET}")
+
+def _decode_json(body: bytes) -> Batch:
+    try:
+        payload = json.loads(body) if body else None
+    except ValueError as e:
+        raise PayloadError(422, f"Invalid JSON body: {e}")
+    if not isinstance(payload, dict):
+        payload = {}
+    if isinstance(payload.get("columns"), dict):
+        cols: Dict[str, Any] = payload["columns"]
+        lengths = {len(v) for v in cols.values() if isinstance(v, list)}
+        if len(lengths) > 1 or any(not isinstance(v, list) for v in cols.values()):
+            raise PayloadError(422, 'Every entry of "columns" must be a list, all of the same length')
+        return Batch(COLUMNS, lengths.pop() if lengths else 0, columns=cols)
+    recs = payload.get("records")
+    if not isinstance(recs, list):
+        raise PayloadError(422, 'Body must be {"records": [ {...}, {...} ]} or {"columns": {"feature": [...], ...}}')
+    return Batch(RECORDS, len(recs), records=recs)
+
+# ---------- feature matrix ----------
+def _fill(X: np.ndarray, j: int, values: Any, name: str) -> None:
+    try:
+        if isinstance(values, list):
+            X[:, j] = np.asarray(values, dtype=np.float64)  # None -> NaN
+            return
+        off = 0
+        for chunk in values.chunks:  # pyarrow.ChunkedArray: no concatenation
+            X[off:off + len(chunk), j] = chunk.to_numpy(zero_copy_only=False)
+            off += len(chunk)
+    except (TypeError, ValueError) as e:
+        raise PayloadError(422, f"Column {name!r} is not numeric: {e}")
+
+def feature_input(batch: Batch, features: Sequence[str], categorical: Sequence[str], model: Any) -> Any:
+    """
+    The model input for a columnar batch: the float matrix itself for a plain
+    booster over numeric features, otherwise a DataFrame with the same columns
+    (pipelines select columns by name; categoricals are not numeric).
+    """
+    cat = set(categorical)
+    numeric = [f for f in features if f not in cat]
+    X = np.zeros((batch.rows, len(numeric)), dtype=np.float64)
+    for j, f in enumerate(numeric):
+        values = batch.column(f)
+        if values is not None:
+            _fill(X, j, values, f)
+    if not cat and hasattr(model, "get_booster") and not hasattr(model, "steps"):
+        return X
+
+    import pandas as pd
+
+    df = pd.DataFrame(X, columns=numeric, copy=False)
+    for f in (f for f in features if f in cat):
+        values = batch.column(f)
+        if values is None:
+            df[f] = 0
+        else:
+            df[f] = values if isinstance(values, list) else values.to_pandas()
+    return df[list(features)]
+
+# ---------- encoding ----------
+def encode(proba: np.ndarray, threshold: float, fmt: str, version: str = "") -> tuple[bytes, str]:
+    """(body, media type) with the pd / decision columns in `fmt` (not RECORDS)."""
+    proba = np.asarray(proba, dtype=np.float64)
+    decision = (proba >= threshold).astype(np.int8)
+    if fmt == COLUMNS:
+        body = {"count": int(len(proba)), "threshold": threshold, "model_version": version,
+                "columns": {"pd": proba.tolist(), "decision": decision.tolist()}}
+        return json.dumps(body).encode("utf-8"), JSON
+
+    import pyarrow as pa
+
+    table = pa.table({"pd": proba, "decision": decision})
+    table = table.replace_schema_metadata({"threshold": str(threshold), "model_version": version})
+    if fmt == ARROW:
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes(), ARROW
+    if fmt == PARQUET:
+        import pyarrow.parquet as pq
+
+        buf = io.BytesIO()
+        pq.write_table(table, buf)
+        return buf.getvalue(), PARQUET
+    raise ValueError(f"Unknown output format: {fmt}")
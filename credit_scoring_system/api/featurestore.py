@@ -0,0 +1,192 @@
+# credit_scoring_system/api/featurestore.py
+"""
+Borrower feature lookup for /score_by_id.
+
+The feature store written by build_features_credit.py
+(credit_scoring_system/data/featurestore/credit_features.parquet) is read
+once, memory-mapped, into a FeatureIndex:
+
+- the id column (config "id_column") as a sorted numpy string array
+- the other columns as one Arrow table with its rows in the same order
+
+A lookup is a vectorised np.searchsorted over the ids, O(log n) per id, and a
+Table.take of the matching rows. The resulting columnar Batch goes through the
+same feature_input() as /score_batch. If an id occurs more than once, the last
+row in the file wins.
+
+The file's (mtime, size) is checked at most every CREDIT_FEATURESTORE_CHECK_SEC.
+When it changes, the thread that notices rebuilds the index. Meanwhile the
+others keep answering from the old one, and the new index replaces it with a
+single assignment. If the rebuild fails (say the file is being rewritten), the
+old index keeps serving and the next check retries.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from credit_scoring_system.api.columnar import ARROW, Batch
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+CONFIG_PATH = REPO_ROOT / "credit_scoring_system" / "config" / "credit_scoring_config.json"
+
+try:
+    CHECK_SEC = max(0.0, float(os.getenv("CREDIT_FEATURESTORE_CHECK_SEC", "2")))
+except Exception:
+    CHECK_SEC = 2.0
+try:
+    MAX_IDS = max(1, int(os.getenv("CREDIT_SCORE_BY_ID_MAX", "10000")))
+except Exception:
+    MAX_IDS = 10_000
+
+_Sig = Optional[Tuple[int, int]]
+
+class FeatureStoreError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+def _config() -> Dict[str, Any]:
+    try:
+        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def file_signature(path: Path) -> _Sig:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+@dataclass(frozen=True)
+class FeatureIndex:
+    ids: np.ndarray  # sorted, str
+    table: Any  # pyarrow.Table without the id column, rows in `ids` order
+    signature: _Sig
+    loaded_at: str
+    load_ms: float
+
+    @property
+    def columns(self) -> list:
+        return self.table.column_names
+
+    def positions(self, wanted: Sequence[str]) -> np.ndarray:
+        """Row of each wanted id in `table`, -1 where it is not in the store."""
+        q = np.asarray(wanted, dtype=str)
+        pos = np.searchsorted(self.ids, q, side="right") - 1  # last of equal ids
+        hit = pos >= 0
+        hit[hit] = self.ids[pos[hit]] == q[hit]
+        return np.where(hit, pos, -1)
+
+    def batch(self, positions: np.ndarray) -> Batch:
+        return Batch(ARROW, len(positions), columns=self.table.take(positions))
+
+def build_index(path: Path, id_col: str) -> FeatureIndex:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    t0 = time.perf_counter()
+    sig = file_signature(path)  # before the read: a write during it shows up at the next check
+    if sig is None:
+        raise FileNotFoundError(f"Feature store not found: {path}")
+    table = pq.read_table(path, memory_map=True)
+    if id_col not in table.column_names:
+        raise RuntimeError(f"Feature store {path} has no {id_col!r} column")
+    ids = table.column(id_col)
+    table = table.filter(pc.is_valid(ids))
+    table = table.set_column(table.column_names.index(id_col), id_col, table.column(id_col).cast(pa.string()))
+    table = table.sort_by(id_col)  # stable: equal ids keep file order
+    ids = np.asarray(table.column(id_col).to_numpy(zero_copy_only=False), dtype=str)
+    return FeatureIndex(
+        ids=ids,
+        table=table.drop_columns([id_col]).combine_chunks(),
+        signature=sig,
+        loaded_at=datetime.now().isoformat(timespec="seconds"),
+        load_ms=round((time.perf_counter() - t0) * 1000, 1),
+    )
+
+class FeatureStore:
+    """The current FeatureIndex of one Parquet file, rebuilt when the file changes."""
+
+    def __init__(self, path: Optional[Path] = None, id_col: Optional[str] = None, check_sec: float = CHECK_SEC):
+        cfg = _config()
+        self.path = Path(path or os.getenv("CREDIT_FEATURESTORE_PATH")
+                         or REPO_ROOT / cfg.get("features_path", "credit_scoring_system/data/featurestore/credit_features.parquet"))
+        self.id_col = id_col or cfg.get("id_column", "borrower_id")
+        self.check_sec = check_sec
+        self._index: Optional[FeatureIndex] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()  # one rebuild at a time; lookups never wait on it once an index exists
+        self.refreshes = 0
+        self.last_error: Optional[str] = None
+
+    def current(self) -> FeatureIndex:
+        idx = self._index
+        now = time.monotonic()
+        if idx is not None:
+            if now - self._checked < self.check_sec:
+                return idx
+            self._checked = now
+            if file_signature(self.path) == idx.signature:
+                return idx
+        # first load waits; a refresh is done by whoever gets the lock, the rest use the old index
+        if not self._lock.acquire(blocking=idx is None):
+            return idx
+        try:
+            self._checked = time.monotonic()
+            idx = self._index
+            if idx is None or file_signature(self.path) != idx.signature:
+                try:
+                    self._index = build_index(self.path, self.id_col)
+                except Exception as e:
+                    self.last_error = f"{type(e).__name__}: {e}"
+                    if idx is None:
+                        raise FeatureStoreError(503, f"Feature store unavailable: {e}")
+                    return idx
+                self.refreshes += 1
+                self.last_error = None
+            return self._index
+        finally:
+            self._lock.release()
+
+    def info(self) -> Dict[str, Any]:
+        idx = self._index
+        return {
+            "path": str(self.path),
+            "id_column": self.id_col,
+            "rows": int(len(idx.ids)) if idx is not None else None,
+            "loaded_at": idx.loaded_at if idx is not None else None,
+            "load_ms": idx.load_ms if idx is not None else None,
+            "refreshes": self.refreshes,
+            "last_error": self.last_error,
+        }
+
+def parse_ids(payload: Any) -> Tuple[list, bool]:
+    """(ids as str, single) from {"borrower_id": x} or {"borrower_ids": [...]}."""
+    if not isinstance(payload, dict):
+        raise FeatureStoreError(422, 'Body must be {"borrower_id": ...} or {"borrower_ids": [...]}')
+    if "borrower_ids" in payload:
+        raw, single = payload["borrower_ids"], False
+        if not isinstance(raw, list):
+            raise FeatureStoreError(422, "'borrower_ids' must be a list")
+    elif "borrower_id" in payload:
+        raw, single = [payload["borrower_id"]], True
+    else:
+        raise FeatureStoreError(422, 'Body must be {"borrower_id": ...} or {"borrower_ids": [...]}')
+    if len(raw) > MAX_IDS:
+        raise FeatureStoreError(422, f"At most {MAX_IDS} ids per request (CREDIT_SCORE_BY_ID_MAX)")
+    if not all(isinstance(x, (str, int)) and not isinstance(x, bool) for x in raw):
+        raise FeatureStoreError(422, "Borrower ids must be strings or integers")
+    return [str(x) for x in raw], single
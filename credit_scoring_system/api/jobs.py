@@ -0,0 +1,373 @@
+# credit_scoring_system/api/jobs.py
+"""
+Portfolio rescoring jobs for the credit API.
+
+A job runs the score_credit_portfolio.py scoring, with the same feature
+alignment, PD / EAD / LGD / EL and output files, without the CLI:
+
+- the features file is split into row ranges of `partition_rows`, one task
+  each for a process pool (spawn context, workers at a lower CPU priority), so
+  a rescore never competes for the GIL or the threadpool of the online routes
+- one coordinator thread per job collects partitions as they finish and keeps
+  rows_done / throughput / ETA current for GET /jobs/{id}
+- parts go to <out_dir>/.job_<id>/; when all are in, a last pool task
+  concatenates them into pd_scores_YYYYMMDD.parquet (part by part) and
+  rebuilds segment_rollups_YYYYMMDD.parquet from it. Both are written under a
+  temporary name and renamed, so a failed or cancelled job leaves the previous
+  files as they were
+- cancel drops the partitions that have not started; running ones finish, so a
+  partition is the cancellation granularity
+
+MLflow logging and the SHAP preview of the CLI are not part of a job.
+Jobs live in memory only; a restart forgets them (their outputs stay).
+"""
+from __future__ import annotations
+
+import importlib
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SCRIPT_MODULE = "credit_scoring_system.scripts.score_credit_portfolio"
+
+OUT_DIR = Path(os.getenv("CREDIT_JOBS_OUT_DIR") or REPO_ROOT / "credit_scoring_system" / "outputs" / "scoring")
+# features / loans / model paths in a request must resolve under one of these
+DATA_ROOTS: List[Path] = [REPO_ROOT] + [Path(p) for p in os.getenv("CREDIT_JOBS_DATA_ROOTS", "").split(os.pathsep) if p]
+
+try:
+    # default leaves a core for the online endpoints
+    WORKERS = max(1, int(os.getenv("CREDIT_JOB_WORKERS") or min(4, (os.cpu_count() or 2) - 1)))
+except Exception:
+    WORKERS = 1
+try:
+    PARTITION_ROWS = max(1, int(os.getenv("CREDIT_JOB_PARTITION_ROWS", "100000")))
+except Exception:
+    PARTITION_ROWS = 100_000
+try:
+    WORKER_NICE = int(os.getenv("CREDIT_JOB_NICE", "10"))
+except Exception:
+    WORKER_NICE = 10
+KEEP_FINISHED = 50  # finished jobs kept for GET /jobs
+
+QUEUED, RUNNING, CANCELLING = "queued", "running", "cancelling"
+SUCCEEDED, FAILED, CANCELLED = "succeeded", "failed", "cancelled"
+_FINAL = {SUCCEEDED, FAILED, CANCELLED}
+
+class JobError(ValueError):
+    """Rejected job request; `status_code` is the HTTP status to answer with."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+# ---------- worker side (runs in the pool processes) ----------
+_WORKER_CACHE: Dict[str, Tuple[Any, Any]] = {}  # kind -> (key, value): one model / loans table per worker
+
+def _script():
+    return importlib.import_module(SCRIPT_MODULE)
+
+def _worker_init(nice: int) -> None:
+    if nice and hasattr(os, "nice"):
+        try:
+            os.nice(nice)
+        except OSError:
+            pass
+
+def _cached(kind: str, key: Any, load):
+    hit = _WORKER_CACHE.get(kind)
+    if hit is None or hit[0] != key:
+        hit = _WORKER_CACHE[kind] = (key, load())
+    return hit[1]
+
+def _read_rows(path: str, start: int, stop: int):
+    """Rows [start, stop) of a Parquet file, reading only the row groups that overlap."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    pf = pq.ParquetFile(path)
+    tables, off = [], 0
+    for i in range(pf.num_row_groups):
+        n = pf.metadata.row_group(i).num_rows
+        if off < stop and off + n > start:
+            lo = max(start, off)
+            tables.append(pf.read_row_group(i).slice(lo - off, min(stop, off + n) - lo))
+        off += n
+        if off >= stop:
+            break
+    table = pa.concat_tables(tables) if tables else pf.schema_arrow.empty_table()
+    return table.to_pandas()
+
+def _score_partition(spec: Dict[str, Any], start: int, stop: int, part_path: str) -> int:
+    import pandas as pd
+
+    scp = _script()
+    cfg = spec["cfg"]
+    loans_cols = [cfg["id_column"], cfg["ead_column"], *cfg["segment_keys"]]
+    loans = _cached("loans", (spec["loans_path"], spec["loans_mtime"]),
+                    lambda: pd.read_csv(spec["loans_path"], usecols=lambda c: c in loans_cols))
+    model = _cached("model", (spec["model_file"], spec["model_mtime"]),
+                    lambda: __import__("joblib").load(spec["model_file"]))
+    base = scp._attach_loans(_read_rows(spec["features_path"], start, stop), loans, cfg)
+    X = scp._model_matrix(model, Path(spec["model_dir"]), base, cfg["id_column"])
+    scores = scp._score_frame(model, X, base, cfg)
+    scores.to_parquet(part_path, index=False)
+    return len(scores)
+
+def _finalize(spec: Dict[str, Any], parts: List[str], pd_path: str, seg_path: str) -> Dict[str, Any]:
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    scp = _script()
+    cfg = spec["cfg"]
+    schemas = [pq.read_schema(p) for p in parts]
+    schema = pa.unify_schemas([s.remove_metadata() for s in schemas], promote_options="permissive")
+    schema = schema.with_metadata(schemas[0].metadata)
+    tmp_pd, tmp_seg = f"{pd_path}.tmp", f"{seg_path}.tmp"
+    n, pd_sum, el_sum = 0, 0.0, 0.0
+    with pq.ParquetWriter(tmp_pd, schema) as w:
+        for p in parts:  # one part in memory at a time
+            t = pq.read_table(p).cast(schema)
+            w.write_table(t)
+            n += t.num_rows
+            pd_sum += float(np.nansum(t.column("PD").to_numpy(zero_copy_only=False)))
+            el_sum += float(np.nansum(t.column("EL").to_numpy(zero_copy_only=False)))
+    seg_keys = cfg["segment_keys"]
+    scores = pq.read_table(tmp_pd, columns=[cfg["id_column"], "EAD", "PD", "EL", *seg_keys]).to_pandas()
+    scp._make_rollups(scores, seg_keys=seg_keys, id_col=cfg["id_column"]).to_parquet(tmp_seg, index=False)
+    os.replace(tmp_pd, pd_path)
+    os.replace(tmp_seg, seg_path)
+    return {"N": n, "avg_PD": pd_sum / n if n else None, "total_EL": el_sum}
+
+# ---------- API side ----------
+@dataclass
+class Job:
+    id: str
+    spec: Dict[str, Any]
+    rows_total: int
+    ranges: List[Tuple[int, int]]
+    out_dir: Path
+    datestr: str
+    status: str = QUEUED
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    rows_done: int = 0
+    partitions_done: int = 0
+    error: Optional[str] = None
+    summary: Dict[str, Any] = field(default_factory=dict)
+    _t0: Optional[float] = None
+    _t1: Optional[float] = None
+    _futures: List[Future] = field(default_factory=list)
+    _cancel: bool = False
+
+    @property
+    def pd_path(self) -> Path:
+        return self.out_dir / f"pd_scores_{self.datestr}.parquet"
+
+    @property
+    def seg_path(self) -> Path:
+        return self.out_dir / f"segment_rollups_{self.datestr}.parquet"
+
+    @property
+    def parts_dir(self) -> Path:
+        return self.out_dir / f".job_{self.id}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = ((self._t1 or time.perf_counter()) - self._t0) if self._t0 else 0.0
+        rate = self.rows_done / elapsed if elapsed > 0 and self.rows_done else None
+        eta = (self.rows_total - self.rows_done) / rate if rate and self.status == RUNNING else None
+        return {
+            "id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "features_path": self.spec["features_path"],
+            "loans_path": self.spec["loans_path"],
+            "model_file": self.spec["model_file"],
+            "rows_total": self.rows_total,
+            "rows_done": self.rows_done,
+            "partitions": {"total": len(self.ranges), "done": self.partitions_done},
+            "elapsed_s": round(elapsed, 3),
+            "rows_per_s": round(rate, 1) if rate else None,
+            "eta_s": round(eta, 1) if eta is not None else None,
+            "outputs": {"pd_scores": str(self.pd_path), "segment_rollups": str(self.seg_path)}
+            if self.status == SUCCEEDED else None,
+            "summary": self.summary or None,
+            "error": self.error,
+        }
+
+def _resolve(raw: Optional[str], default: Path, what: str) -> Path:
+    p = Path(raw) if raw else default
+    if not p.is_absolute():
+        p = REPO_ROOT / p
+    p = p.resolve()
+    if not any(p.is_relative_to(r.resolve()) for r in DATA_ROOTS):
+        raise JobError(403, f"{what} {p} is outside the allowed data roots")
+    if not p.exists():
+        raise JobError(422, f"{what} not found: {p}")
+    return p
+
+class JobManager:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a process that runs server threads is not safe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_worker_init,
+                    initargs=(WORKER_NICE,),
+                )
+            return self._pool
+
+    def submit(self, features_path: Optional[str] = None, model_dir: Optional[str] = None,
+               loans_path: Optional[str] = None, partition_rows: Optional[int] = None) -> Job:
+        import pyarrow.parquet as pq
+
+        scp = _script()
+        cfg = scp._read_config(scp.CONFIG_PATH)
+        feats = _resolve(features_path, REPO_ROOT / cfg["features_path"], "features_path")
+        loans = _resolve(loans_path, REPO_ROOT / cfg["raw_loans_path"], "loans_path")
+        if model_dir:
+            mdir = _resolve(model_dir, REPO_ROOT, "model_dir")
+        else:
+            mdir = scp._latest_model_dir(cfg["model_dir_glob"])
+            if mdir is None:
+                raise JobError(422, "No credit_* model directories found. Train Stage 3 models first.")
+        model_file = scp._pick_model_file(mdir, cfg["pd_model_preference"])
+        if model_file is None:
+            raise JobError(422, f"No model file found in {mdir}. Expected one of {cfg['pd_model_preference']}.")
+        if cfg.get("timestamp_guard", True):
+            stale = scp._stale_features_message(loans, feats)
+            if stale:
+                raise JobError(409, stale.replace("[ERROR] ", ""))
+        try:
+            rows = pq.ParquetFile(feats).metadata.num_rows
+        except Exception as e:
+            raise JobError(422, f"features_path is not a readable Parquet file: {e}")
+        if rows == 0:
+            raise JobError(422, f"features_path has no rows: {feats}")
+
+        try:
+            step = max(1, int(partition_rows or PARTITION_ROWS))
+        except (TypeError, ValueError):
+            raise JobError(422, f"partition_rows must be an integer, got {partition_rows!r}")
+        job = Job(
+            id=uuid.uuid4().hex[:12],
+            spec={
+                "cfg": cfg,
+                "features_path": str(feats),
+                "loans_path": str(loans),
+                "loans_mtime": loans.stat().st_mtime_ns,
+                "model_dir": str(mdir),
+                "model_file": str(model_file),
+                "model_mtime": model_file.stat().st_mtime_ns,
+            },
+            rows_total=rows,
+            ranges=[(a, min(a + step, rows)) for a in range(0, rows, step)],
+            out_dir=OUT_DIR,
+            datestr=datetime.now().strftime("%Y%m%d"),  # as the CLI: local date
+        )
+        with self._lock:
+            busy = [j for j in self._jobs.values() if j.status not in _FINAL and j.pd_path == job.pd_path]
+            if busy:
+                raise JobError(409, f"Job {busy[0].id} is already writing {job.pd_path.name}")
+            self._jobs[job.id] = job
+            self._trim()
+        threading.Thread(target=self._run, args=(job,), name=f"credit-job-{job.id}", daemon=True).start()
+        return job
+
+    def _trim(self) -> None:
+        done = [j for j in self._jobs.values() if j.status in _FINAL]
+        for j in done[: max(0, len(done) - KEEP_FINISHED)]:
+            del self._jobs[j.id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [j.to_dict() for j in self._jobs.values()]
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in _FINAL:
+                return job
+            job._cancel = True
+            job.status = CANCELLING
+            futures = list(job._futures)
+        for f in futures:
+            f.cancel()  # only succeeds for partitions that have not started
+        return job
+
+    def _finish(self, job: Job, status: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            job.status = status
+            job.error = error
+            job._t1 = time.perf_counter()
+            job.finished_at = datetime.now().isoformat(timespec="seconds")
+            job._futures = []
+        shutil.rmtree(job.parts_dir, ignore_errors=True)
+
+    def _run(self, job: Job) -> None:
+        try:
+            pool = self._executor()
+            job.parts_dir.mkdir(parents=True, exist_ok=True)
+            parts = [str(job.parts_dir / f"part-{i:05d}.parquet") for i in range(len(job.ranges))]
+            with self._lock:
+                if job._cancel:
+                    raise CancelledError()
+                job.status = RUNNING
+                job._t0 = time.perf_counter()
+                job.started_at = datetime.now().isoformat(timespec="seconds")
+                job._futures = [pool.submit(_score_partition, job.spec, a, b, parts[i])
+                                for i, (a, b) in enumerate(job.ranges)]
+            for f in as_completed(job._futures):
+                if f.cancelled():
+                    continue
+                n = f.result()  # a failed partition fails the job
+                with self._lock:
+                    job.rows_done += n
+                    job.partitions_done += 1
+            if job._cancel:
+                raise CancelledError()
+            job.summary = pool.submit(_finalize, job.spec, parts, str(job.pd_path), str(job.seg_path)).result()
+            self._finish(job, SUCCEEDED)
+        except CancelledError:
+            self._finish(job, CANCELLED)
+        except Exception as e:
+            for f in job._futures:
+                f.cancel()
+            if isinstance(e, BrokenProcessPool):
+                with self._lock:
+                    self._pool = None  # a worker died; the next job gets a fresh pool
+            self._finish(job, FAILED, f"{type(e).__name__}: {e}")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+            for j in self._jobs.values():
+                if j.status not in _FINAL:
+                    j._cancel = True
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
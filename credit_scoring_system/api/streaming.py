@@ -0,0 +1,242 @@
+# credit_scoring_system/api/streaming.py
+"""
+Chunked streaming for /score_stream.
+
+The request body is consumed incrementally as NDJSON (one record per line) or
+an Arrow IPC stream (record batches), scored chunk by chunk, and every chunk's
+results are written out before the next chunk is read:
+
+  application/x-ndjson                 {"row": 0, "pd": 0.12, "decision": 0} per line
+  application/vnd.apache.arrow.stream  one record batch (pd, decision) per chunk
+
+The scoring generator runs on the threadpool (Starlette iterates sync bodies
+there). It pulls request bytes back from the event loop through BodyReader.
+It is only advanced after the previous chunk has been handed to the server, so
+a slow reader stalls the producer and the upload with it. Memory stays at about
+one chunk (CREDIT_STREAM_CHUNK_ROWS records, or one incoming Arrow batch)
+whatever the total size. Because the response starts before the upload ends,
+clients must read while they send (httpx / aiohttp streaming, curl -T).
+
+Errors after the response has started cannot change the status: NDJSON ends
+with an {"error": ..., "row": n} line; an Arrow stream is aborted (the
+connection drops without the end-of-stream marker).
+"""
+from __future__ import annotations
+
+import io
+import json
+from typing import Any, Callable, Iterator, List, Optional, Sequence
+
+import anyio
+import numpy as np
+from starlette.requests import ClientDisconnect, Request
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from credit_scoring_system.api.columnar import ARROW, COLUMNS, Batch, PayloadError
+
+NDJSON = "application/x-ndjson"
+
+_MEDIA_ALIASES = {
+    "application/ndjson": NDJSON,
+    "application/jsonl": NDJSON,
+    "application/x-jsonlines": NDJSON,
+    "application/x-apache-arrow-stream": ARROW,
+}
+
+def _media_type(header: Optional[str]) -> str:
+    mt = (header or "").split(";", 1)[0].strip().lower()
+    return _MEDIA_ALIASES.get(mt, mt)
+
+def input_format(content_type: Optional[str]) -> str:
+    mt = _media_type(content_type)
+    if mt in (NDJSON, ARROW):
+        return mt
+    raise PayloadError(415, f"Unsupported Content-Type {content_type!r}; use {NDJSON} or {ARROW}")
+
+def negotiate(accept: Optional[str], request_fmt: str) -> str:
+    if not accept:
+        return request_fmt
+    for part in accept.split(","):
+        mt = _media_type(part)
+        if mt in ("*/*", "application/*"):
+            return request_fmt
+        if mt in (NDJSON, ARROW):
+            return mt
+    raise PayloadError(406, f"Accept must allow {NDJSON} or {ARROW}")
+
+# ---------- input ----------
+class BodyReader(io.RawIOBase):
+    """Blocking file-like view of the request body, for use on a worker thread."""
+
+    def __init__(self, request: Request):
+        self._chunks = request.stream().__aiter__()
+        self._view = memoryview(b"")
+        self._eof = False
+
+    async def _next_chunk(self) -> Optional[bytes]:
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._view and not self._eof:
+            chunk = anyio.from_thread.run(self._next_chunk)
+            if chunk is None:
+                self._eof = True
+            else:
+                self._view = memoryview(chunk)
+        n = min(len(b), len(self._view))
+        b[:n] = self._view[:n]
+        self._view = self._view[n:]
+        return n
+
+def _records_batch(rows: List[dict], features: Sequence[str]) -> Batch:
+    # same semantics as DataFrame(rows).reindex(...): a key missing from some
+    # rows is NaN there, a feature missing from every row is 0
+    present = set().union(*rows)
+    cols = {f: [r.get(f) for r in rows] for f in features if f in present}
+    return Batch(COLUMNS, len(rows), columns=cols)
+
+def ndjson_batches(raw: io.RawIOBase, features: Sequence[str], chunk_rows: int) -> Iterator[Batch]:
+    rows: List[dict] = []
+    for lineno, line in enumerate(io.BufferedReader(raw, 1 << 16), 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            rec = json.loads(line)
+        except ValueError as e:
+            raise PayloadError(422, f"line {lineno}: invalid JSON: {e}")
+        if not isinstance(rec, dict):
+            raise PayloadError(422, f"line {lineno}: each line must be a JSON object")
+        rows.append(rec)
+        if len(rows) >= chunk_rows:
+            yield _records_batch(rows, features)
+            rows = []
+    if rows:
+        yield _records_batch(rows, features)
+
+def arrow_batches(raw: io.RawIOBase, chunk_rows: int) -> Iterator[Batch]:
+    import pyarrow as pa
+
+    try:
+        reader = pa.ipc.open_stream(raw)
+        while True:
+            try:
+                rb = reader.read_next_batch()
+            except StopIteration:
+                return
+            for off in range(0, rb.num_rows, chunk_rows):  # zero-copy slices of larger batches
+                part = rb.slice(off, chunk_rows)
+                yield Batch(ARROW, part.num_rows, columns=pa.Table.from_batches([part]))
+    except pa.ArrowInvalid as e:
+        raise PayloadError(422, f"Invalid Arrow IPC stream: {e}")
+
+# ---------- output ----------
+class _Sink(io.RawIOBase):
+    """Write target for the Arrow stream writer; take() returns what was written since the last call."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._parts.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def take(self) -> bytes:
+        out = b"".join(self._parts)
+        self._parts.clear()
+        return out
+
+class _NdjsonEncoder:
+    def start(self) -> bytes:
+        return b""
+
+    def chunk(self, proba: np.ndarray, decision: np.ndarray, row0: int) -> bytes:
+        return "".join(
+            f'{{"row": {row0 + i}, "pd": {p!r}, "decision": {d}}}\n'
+            for i, (p, d) in enumerate(zip(proba.tolist(), decision.tolist()))
+        ).encode("utf-8")
+
+    def error(self, detail: str, row: int) -> bytes:
+        return (json.dumps({"error": detail, "row": row}) + "\n").encode("utf-8")
+
+    def end(self) -> bytes:
+        return b""
+
+class _ArrowEncoder:
+    def __init__(self, threshold: float, version: str):
+        import pyarrow as pa
+
+        self._pa = pa
+        schema = pa.schema([("pd", pa.float64()), ("decision", pa.int8())],
+                           metadata={"threshold": str(threshold), "model_version": version})
+        self._sink = _Sink()
+        self._writer = pa.ipc.new_stream(self._sink, schema)
+
+    def start(self) -> bytes:
+        return self._sink.take()  # schema message
+
+    def chunk(self, proba: np.ndarray, decision: np.ndarray, row0: int) -> bytes:
+        self._writer.write_batch(self._pa.record_batch([proba, decision], names=["pd", "decision"]))
+        return self._sink.take()
+
+    def end(self) -> bytes:
+        self._writer.close()  # end-of-stream marker
+        return self._sink.take()
+
+def score_chunks(batches: Iterator[Batch], score: Callable[[Batch], np.ndarray], threshold: float,
+                 out_fmt: str, version: str = "") -> Iterator[bytes]:
+    enc = _ArrowEncoder(threshold, version) if out_fmt == ARROW else _NdjsonEncoder()
+    yield enc.start()
+    row = 0
+    try:
+        for batch in batches:
+            try:
+                proba = np.asarray(score(batch), dtype=np.float64)
+            except PayloadError:
+                raise
+            except Exception as e:
+                raise PayloadError(400, f"Scoring error: {e}")
+            yield enc.chunk(proba, (proba >= threshold).astype(np.int8), row)
+            row += batch.rows
+    except PayloadError as e:
+        if out_fmt != NDJSON:
+            raise
+        yield enc.error(e.detail, row)
+        return
+    yield enc.end()
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that leaves `receive` alone: the body iterator is still
+    reading the request, so a disconnect listener would swallow its messages.
+    A client that goes away surfaces as ClientDisconnect in that reader instead.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+
+def stream_scores(request: Request, in_fmt: str, out_fmt: str, features: Sequence[str],
+                  score: Callable[[Batch], np.ndarray], threshold: float, chunk_rows: int,
+                  version: str = "") -> DuplexStreamingResponse:
+    raw = BodyReader(request)
+    batches = ndjson_batches(raw, features, chunk_rows) if in_fmt == NDJSON else arrow_batches(raw, chunk_rows)
+    body = (b for b in score_chunks(batches, score, threshold, out_fmt, version) if b)
+    return DuplexStreamingResponse(body, media_type=out_fmt, headers={"X-Model-Version": version})
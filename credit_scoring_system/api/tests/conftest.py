@@ -0,0 +1,47 @@
+# ===== BEGIN: conftest.py =====
+import json
+
+import joblib
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from xgboost import XGBClassifier
+
+import credit_scoring_system.api.app as api
+
+FEATURES = ["income_to_loan_ratio", "num_past_delinquencies", "credit_utilization_pct", "n_records"]
+
+def columns(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "income_to_loan_ratio": rng.uniform(0, 5, n).round(3).tolist(),
+        "num_past_delinquencies": rng.integers(0, 6, n).tolist(),
+        "credit_utilization_pct": rng.uniform(0, 100, n).round(1).tolist(),
+        "n_records": rng.integers(1, 10, n).tolist(),
+    }
+
+def write_model_dir(d, seed=1, threshold=0.5):
+    """A small XGB model over FEATURES whose PD actually varies (the PROD one is near constant)."""
+    d.mkdir(parents=True, exist_ok=True)
+    cols = columns(400, seed=seed)
+    X = np.column_stack([cols[f] for f in FEATURES])
+    y = (X[:, 1] + X[:, 2] / 40 > 3).astype(int)
+    joblib.dump(XGBClassifier(n_estimators=20, max_depth=3).fit(X, y), d / "xgb_model.joblib")
+    (d / "feature_list.json").write_text(json.dumps({"numeric_features": FEATURES}), encoding="utf-8")
+    (d / "threshold.json").write_text(json.dumps({"pd_threshold": threshold}), encoding="utf-8")
+    return d
+
+@pytest.fixture()
+def make_columns():
+    return columns
+
+@pytest.fixture()
+def make_model_dir():
+    return write_model_dir
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv("CREDIT_PROD_DIR", str(write_model_dir(tmp_path / "model")))
+    with TestClient(api.app) as c:
+        yield c
+# ===== END: conftest.py =====
@@ -0,0 +1,78 @@
+# ===== BEGIN: test_bundle_reload.py =====
+import threading
+import time
+
+import pyarrow as pa
+
+import credit_scoring_system.api.app as api
+
+RECORD = {"income_to_loan_ratio": 0.4, "num_past_delinquencies": 4, "credit_utilization_pct": 90.0, "n_records": 3}
+
+def test_version_in_health_and_every_response(client, make_columns):
+    bundle = client.get("/health").json()["bundle"]
+    version = bundle["version"]
+    assert len(version) == 12 and len(bundle["model_sha256"]) == 64
+
+    r = client.post("/score", json=RECORD)
+    assert r.json()["model_version"] == r.headers["x-model-version"] == version
+    r = client.post("/score_batch", json={"records": [RECORD]})
+    assert r.json()["model_version"] == r.headers["x-model-version"] == version
+    r = client.post("/score_batch", json={"columns": make_columns(5)})
+    assert r.json()["model_version"] == version
+    r = client.post("/score_batch", json={"columns": make_columns(5)}, headers={"accept": api.columnar.ARROW})
+    assert pa.ipc.open_stream(r.content).schema.metadata[b"model_version"] == version.encode()
+    r = client.post("/score_stream", content=b'{"n_records": 2}\n', headers={"content-type": "application/x-ndjson"})
+    assert r.headers["x-model-version"] == version
+
+def test_reload_swaps_to_new_model_and_keeps_old_one_on_failure(client, tmp_path, monkeypatch, make_model_dir):
+    v1 = client.get("/health").json()["bundle"]["version"]
+    r = client.post("/reload").json()
+    assert r["ok"] and r["version"] == r["previous_version"] == v1 and not r["changed"]
+
+    monkeypatch.setenv("CREDIT_PROD_DIR", str(make_model_dir(tmp_path / "model2", seed=7, threshold=0.3)))
+    r = client.post("/reload").json()
+    assert r["changed"] and r["previous_version"] == v1
+    v2 = r["version"]
+    assert client.post("/score", json=RECORD).json()["threshold"] == 0.3
+
+    broken = tmp_path / "broken"
+    broken.mkdir()
+    (broken / "xgb_model.joblib").write_bytes(b"not a pickle")
+    (broken / "feature_list.json").write_text('["income_to_loan_ratio"]', encoding="utf-8")
+    monkeypatch.setenv("CREDIT_PROD_DIR", str(broken))
+    r = client.post("/reload")
+    assert r.status_code == 503 and r.json()["serving_version"] == v2
+    assert client.post("/score", json=RECORD).json()["model_version"] == v2
+    health = client.get("/health").json()
+    assert health["bundle"]["version"] == v2 and health["reloads"]["failures"] == 1
+    assert client.get("/ready").status_code == 200
+
+def test_background_reload_never_mixes_versions(client, tmp_path, monkeypatch, make_model_dir):
+    old = api._current_bundle()
+    monkeypatch.setenv("CREDIT_PROD_DIR", str(make_model_dir(tmp_path / "model2", seed=7, threshold=0.3)))
+    thresholds = {old.version: old.threshold}
+
+    seen, stop = [], threading.Event()
+
+    def hammer():
+        while not stop.is_set():
+            body = client.post("/score", json=RECORD).json()
+            seen.append((body["model_version"], body["threshold"]))
+
+    t = threading.Thread(target=hammer)
+    t.start()
+    r = client.post("/reload", params={"wait": "false"})
+    assert r.status_code == 202 and r.json()["serving_version"] == old.version
+    deadline = time.time() + 30
+    while api._current_bundle() is old and time.time() < deadline:
+        time.sleep(0.05)
+    time.sleep(0.1)
+    stop.set()
+    t.join()
+
+    new = api._current_bundle()
+    assert new.version != old.version
+    thresholds[new.version] = new.threshold
+    assert {v for v, _ in seen} <= set(thresholds)
+    assert all(thresholds[v] == thr for v, thr in seen)
+# ===== END: test_bundle_reload.py =====
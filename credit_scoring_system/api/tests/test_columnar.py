@@ -0,0 +1,58 @@
+# ===== BEGIN: test_columnar.py =====
+import io
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+import credit_scoring_system.api.app as api
+
+def _arrow(table):
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as w:
+        w.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def test_columnar_formats_match_record_scores(client, make_columns):
+    cols = make_columns(50)
+    records = [dict(zip(cols, row)) for row in zip(*cols.values())]
+    base = [r["pd"] for r in client.post("/score_batch", json={"records": records}).json()["results"]]
+    assert len(set(base)) > 1
+
+    r = client.post("/score_batch", json={"columns": cols})
+    assert r.json()["columns"]["pd"] == pytest.approx(base)
+
+    r = client.post("/score_batch", content=_arrow(pa.table(cols)), headers={"content-type": api.columnar.ARROW})
+    out = pa.ipc.open_stream(r.content).read_all()
+    assert r.headers["content-type"] == api.columnar.ARROW and out.schema.metadata[b"threshold"] == b"0.5"
+    assert out.column("pd").to_pylist() == pytest.approx(base)
+    assert out.column("decision").to_pylist() == [int(p >= 0.5) for p in out.column("pd").to_pylist()]
+
+    buf = io.BytesIO()
+    pq.write_table(pa.table({**cols, "loan_id": list(range(50))}), buf)
+    r = client.post("/score_batch", content=buf.getvalue(),
+                    headers={"content-type": "application/x-parquet", "accept": "application/json"})
+    assert r.json()["columns"]["pd"] == pytest.approx(base)
+
+    # records in, Parquet out
+    r = client.post("/score_batch", json={"records": records}, headers={"accept": api.columnar.PARQUET})
+    assert pq.read_table(io.BytesIO(r.content)).column("pd").to_pylist() == pytest.approx(base)
+
+def test_missing_columns_and_nulls_follow_record_semantics(client, make_columns):
+    cols = make_columns(3)
+    cols["credit_utilization_pct"][1] = None
+    del cols["n_records"]
+    records = [dict(zip(cols, row)) for row in zip(*cols.values())]
+    base = [r["pd"] for r in client.post("/score_batch", json={"records": records}).json()["results"]]
+    r = client.post("/score_batch", content=_arrow(pa.table(cols)), headers={"content-type": api.columnar.ARROW})
+    assert pa.ipc.open_stream(r.content).read_all().column("pd").to_pylist() == pytest.approx(base)
+
+def test_bad_payloads(client):
+    assert client.post("/score_batch", content=b"a,b", headers={"content-type": "text/csv"}).status_code == 415
+    assert client.post("/score_batch", json={"columns": {"n_records": [1]}}, headers={"accept": "text/csv"}).status_code == 406
+    assert client.post("/score_batch", json={"columns": {"n_records": [1, 2], "x": [1]}}).status_code == 422
+    r = client.post("/score_batch", json={"columns": {"n_records": ["a"]}})
+    assert r.status_code == 422 and "n_records" in r.json()["detail"]
+    r = client.post("/score_batch", content=b"garbage", headers={"content-type": api.columnar.ARROW})
+    assert r.status_code == 422
+# ===== END: test_columnar.py =====
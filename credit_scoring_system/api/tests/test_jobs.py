@@ -0,0 +1,71 @@
+# ===== BEGIN: test_jobs.py =====
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from credit_scoring_system.api import jobs
+from credit_scoring_system.scripts import score_credit_portfolio as scp
+
+@pytest.fixture()
+def portfolio(tmp_path, monkeypatch, make_columns):
+    n = 1200
+    rng = np.random.default_rng(3)
+    ids = [f"B{i:05d}" for i in range(n)]
+    pd.DataFrame({
+        "borrower_id": ids,
+        "loan_amount": rng.integers(1_000, 50_000, n),
+        "grade": rng.choice(list("ABCD"), n),
+        "state": rng.choice(["CA", "NY", "TX"], n),
+        "vintage_year": rng.integers(2018, 2024, n),
+    }).to_csv(tmp_path / "loans.csv", index=False)
+    pd.DataFrame({"borrower_id": ids, **make_columns(n, seed=4)}).to_parquet(
+        tmp_path / "features.parquet", index=False, row_group_size=250)
+    monkeypatch.setattr(jobs, "DATA_ROOTS", [jobs.REPO_ROOT, tmp_path])
+    monkeypatch.setattr(jobs, "OUT_DIR", tmp_path / "out")
+    monkeypatch.setattr(jobs, "WORKERS", 1)
+    return {"features_path": str(tmp_path / "features.parquet"), "loans_path": str(tmp_path / "loans.csv"),
+            "model_dir": str(tmp_path / "model")}
+
+def _wait(client, job_id, timeout=120):
+    t0 = time.time()
+    while time.time() - t0 < timeout:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed", "cancelled"):
+            return job
+        time.sleep(0.2)
+    raise AssertionError(f"job {job_id} still {job['status']}")
+
+def test_job_matches_cli_scoring(client, portfolio):
+    r = client.post("/jobs/score_portfolio", json={**portfolio, "partition_rows": 300})
+    assert r.status_code == 202 and r.json()["partitions"]["total"] == 4
+    job = _wait(client, r.json()["id"])
+    assert job["status"] == "succeeded", job["error"]
+    assert job["rows_done"] == job["rows_total"] == 1200 and job["summary"]["N"] == 1200
+
+    cfg = scp._read_config(scp.CONFIG_PATH)
+    base = scp._attach_loans(pd.read_parquet(portfolio["features_path"]), pd.read_csv(portfolio["loans_path"]), cfg)
+    model, model_dir, _ = scp._load_model(cfg, jobs.Path(portfolio["model_dir"]))
+    expected = scp._score_frame(model, scp._model_matrix(model, model_dir, base, "borrower_id"), base, cfg)
+    got = pd.read_parquet(job["outputs"]["pd_scores"])
+    pd.testing.assert_frame_equal(got, expected)
+    rollups = pd.read_parquet(job["outputs"]["segment_rollups"])
+    assert rollups["borrowers"].sum() == 1200
+    assert not list(jobs.OUT_DIR.glob(".job_*")) and not list(jobs.OUT_DIR.glob("*.tmp"))
+
+def test_cancel_stops_at_partition_boundary(client, portfolio):
+    r = client.post("/jobs/score_portfolio", json={**portfolio, "partition_rows": 50})
+    job = client.post(f"/jobs/{r.json()['id']}/cancel").json()
+    assert job["status"] in ("cancelling", "cancelled")
+    job = _wait(client, job["id"])
+    assert job["status"] == "cancelled" and job["rows_done"] < job["rows_total"]
+    assert job["outputs"] is None and not list(jobs.OUT_DIR.glob("pd_scores_*"))
+
+def test_rejected_requests(client, portfolio, tmp_path):
+    assert client.post("/jobs/score_portfolio", json={**portfolio, "features_path": "/etc/hosts"}).status_code == 403
+    assert client.post("/jobs/score_portfolio", json={**portfolio, "features_path": str(tmp_path / "nope.parquet")}).status_code == 422
+    assert client.post("/jobs/score_portfolio", json={**portfolio, "features_path": portfolio["loans_path"]}).status_code == 422
+    assert client.post("/jobs/score_portfolio", json={**portfolio, "partition_rows": "many"}).status_code == 422
+    assert client.get("/jobs/does-not-exist").status_code == 404
+# ===== END: test_jobs.py =====
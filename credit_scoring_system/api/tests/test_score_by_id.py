@@ -0,0 +1,60 @@
+# ===== BEGIN: test_score_by_id.py =====
+import os
+
+import pandas as pd
+import pytest
+
+import credit_scoring_system.api.app as api
+from credit_scoring_system.api import featurestore
+
+@pytest.fixture()
+def store(tmp_path, monkeypatch, make_columns):
+    path = tmp_path / "credit_features.parquet"
+
+    def write(cols, ids):
+        pd.DataFrame({"borrower_id": ids, **cols}).to_parquet(path, index=False)
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))  # a new mtime even within one tick
+
+    write(make_columns(50, seed=5), [f"B{i:03d}" for i in range(50)][::-1])  # ids not sorted in the file
+    monkeypatch.setattr(api, "FEATURE_STORE", featurestore.FeatureStore(path, check_sec=0))
+    return write
+
+def test_scores_match_batch_and_keep_request_order(client, store, make_columns):
+    cols = make_columns(50, seed=5)
+    base = client.post("/score_batch", json={"columns": cols}).json()["columns"]["pd"]  # row i is B{49 - i}
+
+    r = client.post("/score_by_id", json={"borrower_ids": ["B007", "nope", "B042", "B007"]})
+    body = r.json()
+    assert r.headers["x-model-version"] == body["model_version"]
+    assert [x["borrower_id"] for x in body["results"]] == ["B007", "B042", "B007"]
+    assert [x["pd"] for x in body["results"]] == pytest.approx([base[42], base[7], base[42]])
+    assert body["missing"] == ["nope"] and body["count"] == 3
+
+    one = client.post("/score_by_id", json={"borrower_id": "B000"}).json()["results"]
+    assert one[0]["pd"] == pytest.approx(base[49])
+    assert client.post("/score_by_id", json={"borrower_id": "nope"}).status_code == 404
+    assert client.post("/score_by_id", json={"borrower_ids": []}).json()["results"] == []
+
+def test_index_follows_the_file_and_last_duplicate_wins(client, store, make_columns):
+    before = client.post("/score_by_id", json={"borrower_id": "B001"}).json()["results"][0]["pd"]
+    cols = make_columns(3, seed=9)
+    store(cols, ["B001", "B900", "B001"])
+    base = client.post("/score_batch", json={"columns": cols}).json()["columns"]["pd"]
+
+    body = client.post("/score_by_id", json={"borrower_ids": ["B001", "B900", "B002"]}).json()
+    assert [x["pd"] for x in body["results"]] == pytest.approx([base[2], base[1]])
+    assert body["missing"] == ["B002"] and body["results"][0]["pd"] != pytest.approx(before)
+    assert client.get("/health").json()["featurestore"]["refreshes"] == 2
+
+def test_rejected_requests(client, store, make_columns):
+    assert client.post("/score_by_id", json={"ids": ["B001"]}).status_code == 422
+    assert client.post("/score_by_id", json={"borrower_ids": [{"id": 1}]}).status_code == 422
+    assert client.post("/score_by_id", json={"borrower_ids": "B001"}).status_code == 422
+
+    cols = make_columns(2)
+    cols.pop("n_records")
+    store(cols, ["B001", "B002"])
+    r = client.post("/score_by_id", json={"borrower_id": "B001"})
+    assert r.status_code == 409 and "n_records" in r.json()["detail"]
+# ===== END: test_score_by_id.py =====
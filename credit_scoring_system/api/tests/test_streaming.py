@@ -0,0 +1,54 @@
+# ===== BEGIN: test_streaming.py =====
+import json
+
+import pyarrow as pa
+import pytest
+
+import credit_scoring_system.api.app as api
+
+def _ndjson(records, piece=7):
+    body = "\n".join(json.dumps(r) for r in records).encode("utf-8")
+    # split mid-line so the reader has to reassemble records across body chunks
+    return (body[i:i + piece] for i in range(0, len(body), piece))
+
+def test_ndjson_stream_matches_batch_scores(client, make_columns, monkeypatch):
+    monkeypatch.setattr(api, "STREAM_CHUNK_ROWS", 4)
+    cols = make_columns(10)
+    records = [dict(zip(cols, row)) for row in zip(*cols.values())]
+    records[3].pop("n_records")
+    base = [r["pd"] for r in client.post("/score_batch", json={"records": records[:4]}).json()["results"]]
+    base += [r["pd"] for r in client.post("/score_batch", json={"records": records[4:8]}).json()["results"]]
+    base += [r["pd"] for r in client.post("/score_batch", json={"records": records[8:]}).json()["results"]]
+
+    r = client.post("/score_stream", content=_ndjson(records), headers={"content-type": "application/x-ndjson"})
+    assert r.status_code == 200 and r.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(x) for x in r.text.splitlines()]
+    assert [x["row"] for x in lines] == list(range(10))
+    assert [x["pd"] for x in lines] == pytest.approx(base)
+    assert [x["decision"] for x in lines] == [int(p >= 0.5) for p in base]
+
+def test_arrow_stream_is_answered_per_chunk(client, make_columns, monkeypatch):
+    monkeypatch.setattr(api, "STREAM_CHUNK_ROWS", 3)
+    table = pa.table(make_columns(10))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as w:
+        w.write_table(table, max_chunksize=4)  # batches of 4, 4, 2 -> chunks of 3, 1, 3, 1, 2
+    r = client.post("/score_stream", content=sink.getvalue().to_pybytes(), headers={"content-type": api.columnar.ARROW})
+    out = pa.ipc.open_stream(r.content)
+    assert [b.num_rows for b in out] == [3, 1, 3, 1, 2]
+    assert out.schema.metadata[b"threshold"] == b"0.5"
+
+    base = client.post("/score_batch", json={"columns": table.to_pydict()}).json()["columns"]["pd"]
+    r = client.post("/score_stream", content=sink.getvalue().to_pybytes(),
+                    headers={"content-type": api.columnar.ARROW, "accept": "application/x-ndjson"})
+    assert [json.loads(x)["pd"] for x in r.text.splitlines()] == pytest.approx(base)
+
+def test_errors_before_and_after_the_stream_starts(client, monkeypatch):
+    monkeypatch.setattr(api, "STREAM_CHUNK_ROWS", 1)
+    assert client.post("/score_stream", json={"records": []}).status_code == 415
+    r = client.post("/score_stream", content=b"{}", headers={"content-type": "application/x-ndjson", "accept": "text/csv"})
+    assert r.status_code == 406
+    r = client.post("/score_stream", content=b'{"n_records": 2}\nnot json\n', headers={"content-type": "application/x-ndjson"})
+    first, last = [json.loads(x) for x in r.text.splitlines()]
+    assert first["row"] == 0 and last["row"] == 1 and "line 2" in last["error"]
+# ===== END: test_streaming.py =====
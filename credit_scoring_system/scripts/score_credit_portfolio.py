@@ -1,6 +1,6 @@
 # ===== BEGIN: score_credit_portfolio.py =====
 from __future__ import annotations
-import os, sys, json, glob, math, warnings, mlflow
+import os, sys, json, glob, math, warnings
 from pathlib import Path
 from datetime import datetime, timezone
 import numpy as np
@@ -8,10 +8,6 @@ import pandas as pd
 from typing import List, Optional, Tuple
 import joblib
 
-PROJECT_ROOT = Path(r"C:\DevProjects\risk_analysis_flagship")
-mlflow.set_tracking_uri(os.environ.get("MLFLOW_TRACKING_URI", f"file:///{(PROJECT_ROOT / 'mlruns').as_posix()}"))
-mlflow.set_experiment("credit_stage4_scoring")
-
 # Optional deps
 try:
     import mlflow
@@ -72,17 +68,22 @@ def _read_features(path: Path) -> pd.DataFrame:
             return pd.read_csv(csv_path)
         raise
 
-def _timestamp_guard(raw_path: Path, features_path: Path):
+def _stale_features_message(raw_path: Path, features_path: Path) -> Optional[str]:
     raw_m = raw_path.stat().st_mtime
     feat_m = features_path.stat().st_mtime
     if raw_m > feat_m:
         raw_dt = datetime.fromtimestamp(raw_m)
         feat_dt = datetime.fromtimestamp(feat_m)
-        msg = (
+        return (
             f"[ERROR] Timestamp guard triggered: raw loans ({raw_dt}) is newer than features ({feat_dt}).\n"
             f"Rebuild features BEFORE scoring to avoid stale joins.\n"
             f"Hint: Right-click build_features_credit.py → Run Python File in Terminal."
         )
+    return None
+
+def _timestamp_guard(raw_path: Path, features_path: Path):
+    msg = _stale_features_message(raw_path, features_path)
+    if msg:
         print(msg)
         sys.exit(2)
 
@@ -258,6 +259,8 @@ def _maybe_log_mlflow(summary: dict, artifacts_dir: Path):
         print("[INFO] MLflow not available; skipping tracking")
         return
     try:
+        mlflow.set_tracking_uri(os.environ.get("MLFLOW_TRACKING_URI", (ROOT / "mlruns").as_uri()))
+        mlflow.set_experiment("credit_stage4_scoring")
         mlflow.set_tag("stage4_credit_batch_scoring", "true")
         for k, v in summary.items():
             if isinstance(v, (int, float)) and not math.isnan(v):
@@ -287,45 +290,34 @@ def _maybe_shap(model, X_sample: pd.DataFrame, out_png: Path):
     except Exception as e:
         print(f"[WARN] SHAP skipped: {e}")
 
-def main():
-    cfg = _read_config(CONFIG_PATH)
-    id_col = cfg["id_column"]
-    ead_col = cfg["ead_column"]
-    seg_keys = cfg["segment_keys"]
-    lgd_default = float(cfg["lgd_default"])
-    features_path = ROOT / cfg["features_path"]
-    loans_path = ROOT / cfg["raw_loans_path"]
-
-    # Timestamp guard (optional via config)
-    if cfg.get("timestamp_guard", True):
-        _timestamp_guard(loans_path, features_path)
-
-    # Load data
-    feat = _read_features(features_path)
-    loans = pd.read_csv(loans_path)
-
+def _attach_loans(feat: pd.DataFrame, loans: pd.DataFrame, cfg: dict) -> pd.DataFrame:
+    """Feature rows with EAD + segment keys from the raw loans."""
+    id_col, ead_col, seg_keys = cfg["id_column"], cfg["ead_column"], cfg["segment_keys"]
     # Sanity columns
     for c in [id_col, ead_col, *seg_keys]:
         if c not in loans.columns:
             raise AssertionError(f"Missing required column in raw loans: '{c}'")
 
     # Combine to get EAD + segments on the feature rows
-    base = feat.merge(
+    return feat.merge(
         loans[[id_col, ead_col, *seg_keys]].drop_duplicates(id_col),
         on=id_col,
         how="left",
         validate="m:1",
     )
 
-    # Locate model
-    model_dir = _latest_model_dir(cfg["model_dir_glob"])
+def _load_model(cfg: dict, model_dir: Optional[Path] = None):
+    """(model, model_dir, model_file); model_dir defaults to the newest credit_* directory."""
+    if model_dir is None:
+        model_dir = _latest_model_dir(cfg["model_dir_glob"])
     if model_dir is None:
         raise FileNotFoundError("No credit_* model directories found. Train Stage 3 models first.")
     model_file = _pick_model_file(model_dir, cfg["pd_model_preference"])
     if model_file is None:
         raise FileNotFoundError(f"No model file found in {model_dir}. Expected one of {cfg['pd_model_preference']}.")
-    model = joblib.load(model_file)
+    return joblib.load(model_file), model_dir, model_file
 
+def _model_matrix(model, model_dir: Path, base: pd.DataFrame, id_col: str) -> pd.DataFrame:
     # Feature list awareness (prefer what the model says it saw at fit)
     allowed_from_file = _load_feature_list(model_dir)  # may be None or []
     # Build numeric matrix first (all numeric, minus ID)
@@ -360,12 +352,14 @@ def main():
                 "Your features parquet is missing columns required by the model: "
                 + ", ".join(missing_for_model)
             )
-        X = X_all.reindex(columns=expected, fill_value=0.0)
-    else:
-        # No explicit list; proceed with all numeric (original behavior)
-        X = X_all
-
+        return X_all.reindex(columns=expected, fill_value=0.0)
+    # No explicit list; proceed with all numeric (original behavior)
+    return X_all
 
+def _score_frame(model, X: pd.DataFrame, base: pd.DataFrame, cfg: dict) -> pd.DataFrame:
+    """pd_scores rows: id, PD, EAD, LGD, EL and the segment keys."""
+    id_col, ead_col, seg_keys = cfg["id_column"], cfg["ead_column"], cfg["segment_keys"]
+    lgd_default = float(cfg["lgd_default"])
 
     # Predict PD
     pd_hat = _predict_pd(model, X)
@@ -388,6 +382,31 @@ def main():
     # Preserve segment keys for rollups
     for k in seg_keys:
         scores[k] = base[k].values
+    return scores[[id_col, "PD", "EAD", "LGD", "EL"] + seg_keys]
+
+def main():
+    cfg = _read_config(CONFIG_PATH)
+    id_col = cfg["id_column"]
+    seg_keys = cfg["segment_keys"]
+    features_path = ROOT / cfg["features_path"]
+    loans_path = ROOT / cfg["raw_loans_path"]
+
+    # Timestamp guard (optional via config)
+    if cfg.get("timestamp_guard", True):
+        _timestamp_guard(loans_path, features_path)
+
+    # Load data
+    feat = _read_features(features_path)
+    loans = pd.read_csv(loans_path)
+    base = _attach_loans(feat, loans, cfg)
+
+    # Locate model
+    model, model_dir, model_file = _load_model(cfg)
+    X = _model_matrix(model, model_dir, base, id_col)
+
+    scores = _score_frame(model, X, base, cfg)
+    pd_hat = scores["PD"].values
+    el_vec = scores["EL"].values
 
     # Outputs (dated)
     out_dir = ROOT / "credit_scoring_system" / "outputs" / "scoring"
@@ -396,7 +415,7 @@ def main():
     pd_path = out_dir / f"pd_scores_{datestr}.parquet"
     seg_path = out_dir / f"segment_rollups_{datestr}.parquet"
 
-    _safe_to_parquet(scores[[id_col, "PD", "EAD", "LGD", "EL"] + seg_keys], pd_path)
+    _safe_to_parquet(scores, pd_path)
 
     # Rollups
     rollups = _make_rollups(scores, seg_keys=seg_keys, id_col=id_col)
@@ -27,7 +27,12 @@ def load_logs_for_day(day: str):
     for f in [f_main, f_shadow]:
         if f.exists():
             dfs.append(pd.read_json(f, lines=True))
-    return pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+    df = pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+    if "cache_hit" in df.columns:  # idempotent retries replayed by the API, not decisions
+        df = df[df["cache_hit"].isna() | (df["cache_hit"] == False)]  # noqa: E712
+    if "degraded" in df.columns:  # rules-only under overload: no model latency to compare
+        df = df[df["degraded"].isna() | (df["degraded"] == False)]  # noqa: E712
+    return df
 
 def compute_metrics(df: pd.DataFrame, labels: pd.DataFrame|None):
     out = []
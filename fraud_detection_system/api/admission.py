@@ -0,0 +1,148 @@
+# ===== BEGIN: admission.py =====
+"""
+Admission control for the fraud scoring endpoints.
+
+Sync FastAPI handlers queue for the default thread pool without bound, so under
+a spike every request waits and latency grows for all of them. The middleware
+counts scoring requests from the moment they reach the ASGI app (queued ones
+included) and gives each a verdict before any thread is taken:
+
+  full     - within `max_inflight`: normal scoring
+  degraded - over `max_inflight`: the handler takes the cheap path (rules only,
+             no model / explanation / shadow) and labels the response
+  shed     - over `shed_inflight`, or over `max_inflight` when the policy is
+             "shed": 503 with Retry-After, the handler never runs
+
+The latency budget is checked by the handler itself, right before model
+inference: a request that already spent more than `budget_ms` since arrival
+(mostly waiting for a thread) is degraded (or shed) the same way.
+
+A limit of 0 disables that check; with everything at 0 the middleware only
+passes requests through.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+FULL = "full"
+DEGRADED = "degraded"
+SHED = "shed"
+POLICIES = ("degrade", "shed")
+
+class AdmissionController:
+    """In-flight counter plus admitted / degraded / shed counters (thread-safe)."""
+
+    def __init__(self, max_inflight: int = 0, shed_inflight: int = 0, budget_ms: float = 0.0, policy: str = "degrade"):
+        self.max_inflight = max_inflight
+        self.shed_inflight = shed_inflight
+        self.budget_ms = budget_ms
+        self.policy = policy if policy in POLICIES else "degrade"
+        self._lock = threading.Lock()
+        self.inflight = 0
+        self.peak_inflight = 0
+        self.admitted = 0
+        self.degraded = 0
+        self.over_budget = 0
+        self.shed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_inflight > 0 or self.shed_inflight > 0 or self.budget_ms > 0
+
+    def enter(self) -> str:
+        with self._lock:
+            n = self.inflight + 1
+            if self.shed_inflight and n > self.shed_inflight:
+                self.shed += 1
+                return SHED
+            verdict = FULL
+            if self.max_inflight and n > self.max_inflight:
+                if self.policy == "shed":
+                    self.shed += 1
+                    return SHED
+                verdict = DEGRADED
+            self.inflight = n
+            self.peak_inflight = max(self.peak_inflight, n)
+            self.admitted += 1
+            if verdict == DEGRADED:
+                self.degraded += 1
+            return verdict
+
+    def leave(self) -> None:
+        with self._lock:
+            self.inflight -= 1
+
+    def check_budget(self, t_start: Optional[float]) -> str:
+        """FULL, or the over-budget verdict for a request that arrived at `t_start` (perf_counter)."""
+        if not self.budget_ms or t_start is None:
+            return FULL
+        if (time.perf_counter() - t_start) * 1000.0 <= self.budget_ms:
+            return FULL
+        with self._lock:
+            self.over_budget += 1
+            if self.policy == "shed":
+                self.shed += 1
+                return SHED
+            self.degraded += 1
+            return DEGRADED
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "policy": self.policy,
+                "max_inflight": self.max_inflight,
+                "shed_inflight": self.shed_inflight,
+                "budget_ms": self.budget_ms,
+                "inflight": self.inflight,
+                "peak_inflight": self.peak_inflight,
+                "admitted": self.admitted,
+                "degraded": self.degraded,
+                "over_budget": self.over_budget,
+                "shed": self.shed,
+            }
+
+class AdmissionMiddleware:
+    """
+    Pure ASGI middleware: sets request.state.admission on the guarded paths and
+    answers 503 itself for shed requests. `controller` is a zero-arg callable so
+    the app can swap the controller (config reload, tests) after add_middleware.
+    """
+
+    def __init__(self, app: Any, controller: Callable[[], Optional[AdmissionController]], paths: Iterable[str], retry_after_sec: int = 1):
+        self.app = app
+        self.controller = controller
+        self.paths = frozenset(paths)
+        self.retry_after = str(retry_after_sec).encode()
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        ctl = self.controller() if scope["type"] == "http" and scope["path"] in self.paths else None
+        if ctl is None or not ctl.enabled:
+            await self.app(scope, receive, send)
+            return
+        verdict = ctl.enter()
+        if verdict == SHED:
+            await self._shed(send)
+            return
+        scope.setdefault("state", {})["admission"] = verdict
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            ctl.leave()
+
+    async def _shed(self, send: Any) -> None:
+        body = json.dumps({"detail": "Overloaded, retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", self.retry_after),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+# ===== END: admission.py =====
@@ -1,25 +1,38 @@
 # ===== BEGIN: app.py (Stage 6 - PROD pointer + Shadow + A/B) =====
 from __future__ import annotations
 
+import time
+
+_T_IMPORT = time.perf_counter()
+
 import hashlib
 import json
 import os
-import time
+import threading
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Tuple
 
-import joblib
-import pandas as pd
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel, Field, validator
 
-# --- Optional SHAP (graceful fallback) ---
-try:
-    import shap  # type: ignore
-    _HAS_SHAP = True
-except Exception:
-    _HAS_SHAP = False
+from fraud_detection_system.api.admission import DEGRADED, FULL, SHED, AdmissionController, AdmissionMiddleware
+from fraud_detection_system.api.context_store import ContextStore, SharedContextOwner, SnapshotThread, connect_shared
+from fraud_detection_system.api.explain import CONTRIBS, LazyExplainer
+from fraud_detection_system.api.fastpath import FAST_PATH, FRAME_PATH, RowScorer, build_row_scorer
+from fraud_detection_system.api.idempotency import IdempotencyCache, idempotency_key, is_client_key
+from fraud_detection_system.api.log_writer import POLICIES as LOG_POLICIES, AsyncJsonlWriter, append_locked
+from fraud_detection_system.api.metrics import RequestStartMiddleware, StageMetrics, StageTimer
+from fraud_detection_system.api.microbatch import BatcherStopped, MicroBatcher
+from fraud_detection_system.api.reload_watcher import ReloadWatcher
+from fraud_detection_system.api.shadow import ShadowWorkerPool
+from fraud_detection_system.src.rules_engine import CompiledRuleset, RuleHits, load_ruleset
+
+if TYPE_CHECKING:  # joblib/pandas load lazily: plain boosters never need a DataFrame
+    import pandas as pd
 
 # --- Paths (repo-root aware) ---
 ROOT = Path(__file__).resolve().parents[2]
@@ -28,6 +41,7 @@ MODELS_DIR = FRAUD_ROOT / "models"
 PROD_POINTER = MODELS_DIR / "PROD_POINTER.txt"
 RULES_PATH = FRAUD_ROOT / "rules" / "rules_v1.yml"
 LOGS_DIR = FRAUD_ROOT / "api" / "logs"
+STATE_DIR = FRAUD_ROOT / "api" / "state"
 
 # ---------- .env support (root .env and/or shared_env/.env) ----------
 def _load_dotenv_if_present() -> None:
@@ -80,37 +94,48 @@ def _resolve_prod_dir() -> Tuple[Path, str]:
     best = max(cands, key=lambda d: (d / "xgb_model.joblib").stat().st_mtime)
     return best.resolve(), "latest"
 
-def _load_rules(path: Path) -> List[Dict[str, Any]]:
-    import yaml
-    if not path.exists():
-        return []
-    with path.open("r", encoding="utf-8") as f:
-        obj = yaml.safe_load(f) or []
-    rules: List[Dict[str, Any]] = []
-    for r in obj:
-        if isinstance(r, dict) and "condition" in r and "name" in r:
-            rules.append({"name": str(r["name"]), "condition": str(r["condition"])})
-    return rules
-
-def _apply_rules(tx: Dict[str, Any], rules: List[Dict[str, Any]]) -> List[str]:
-    hits: List[str] = []
-    safe_locals = dict(tx)
-    for rule in rules:
-        try:
-            cond = rule.get("condition", "")
-            if cond and eval(cond, {"__builtins__": {}}, safe_locals):
-                hits.append(rule.get("name", "unnamed_rule"))
-        except Exception:
-            continue
-    return hits
+def _load_rules(path: Path) -> CompiledRuleset:
+    """Compile rules_v1.yml (structured or legacy flat list) once; bad rules are dropped."""
+    try:
+        return load_ruleset(path)
+    except Exception:
+        return CompiledRuleset()
+
+def _apply_rules(tx: Dict[str, Any], rules: CompiledRuleset, ctx: Optional[Dict[str, Any]] = None) -> RuleHits:
+    return rules.evaluate_one(tx, ctx)
+
+def _decide(proba: Optional[float], threshold: float, hits: RuleHits) -> str:
+    """
+    flag: a "flag" rule hit, or proba + the hit rules' score_delta >= threshold;
+    review: a "review" rule hit; else allow. proba=None (degraded) uses the rules alone.
+    """
+    if hits.flag or (proba is not None and proba + hits.score_delta >= threshold):
+        return "flag"
+    return "review" if hits.review else "allow"
+
+def _apply_rules_batch(
+    txs: List[Dict[str, Any]], rules: CompiledRuleset, ctxs: Optional[List[Dict[str, Any]]] = None
+) -> List[RuleHits]:
+    """Vectorized rule pass over a batch (same results as _apply_rules per tx)."""
+    if not rules or not txs:
+        return [RuleHits() for _ in txs]
+    cols = {k: [tx.get(k) for tx in txs] for k in txs[0]}
+    if ctxs:
+        for k in ctxs[0]:
+            cols[f"ctx_{k}"] = [c.get(k) for c in ctxs]
+    return rules.hits_for_rows(cols, len(txs))
 
 # ---------- I/O Schemas ----------
+_STRING_TX_FIELDS = ("country", "device_id", "account_id", "transaction_id")
+
 class TransactionIn(BaseModel):
     amount: float = Field(..., ge=0)
     account_age_days: int = Field(..., ge=0)
     country: str = Field("US", min_length=2, max_length=2)
     device_id: str = Field("unknown")
     hour_of_day: int = Field(12, ge=0, le=23)
+    account_id: Optional[str] = None  # keys online ctx (falls back to device_id)
+    transaction_id: Optional[str] = None  # idempotency key for gateway retries
 
     @validator("country")
     def _upper_iso(cls, v: str) -> str:
@@ -118,32 +143,200 @@ class TransactionIn(BaseModel):
 
 class ScoreOut(BaseModel):
     decision: str
-    proba: float
+    proba: Optional[float]  # None when degraded (rules-only, no model call)
     rules_hit: List[str]
     top_features: Optional[List[Dict[str, Any]]] = None
     model_timestamp: str
     latency_ms: int
+    degraded: bool = False
+
+class BatchIn(BaseModel):
+    transactions: List[TransactionIn] = Field(default_factory=list)
+
+class BatchScoreOut(BaseModel):
+    count: int
+    results: List[ScoreOut]
+    latency_ms: int
+
+class ExplainOut(BaseModel):
+    top_features: Optional[List[Dict[str, Any]]] = None
+    backend: Optional[str] = None
+    model_timestamp: str
+    latency_ms: float
 
 # ---------- App ----------
-app = FastAPI(title="Fraud Scoring API", version="1.0")
-
-# Globals (PROD)
-_MODEL = None
-_THRESHOLD: float = 0.5
-_FEATURES: List[str] = []
-_RULES: List[Dict[str, Any]] = []
-_MODEL_TS = ""
-_PROD_DIR_PATH: Optional[Path] = None
-_PROD_DIR_SOURCE: str = "unknown"
-
-_EXPLAINER = None
-_BG = None
-
-# ---------- Candidate globals ----------
-_CAND = None
-_CAND_THRESHOLD: float = 0.5
-_CAND_FEATURES: List[str] = []
-_CAND_TS = ""
+@asynccontextmanager
+async def _lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    on_startup()
+    try:
+        yield
+    finally:
+        on_shutdown()
+
+app = FastAPI(title="Fraud Scoring API", version="1.0", lifespan=_lifespan)
+app.add_middleware(RequestStartMiddleware)  # stamps request start for the "parse" stage
+app.add_middleware(AdmissionMiddleware, controller=lambda: _ADMISSION, paths=("/score", "/score_batch"))
+
+# Per-stage latency histograms (see metrics.py), exposed on /metrics
+_METRICS = StageMetrics()
+
+# ---------- Serving bundle (swapped atomically on reload) ----------
+_DEFAULT_FEATURES = ["amount", "account_age_days", "hour_of_day"]
+
+@dataclass(frozen=True)
+class ModelSlot:
+    """One loaded model drop (PROD or candidate). Never mutated after load."""
+    model: Any
+    threshold: float
+    features: List[str]
+    model_ts: str
+    path: Path
+    categorical: List[str] = field(default_factory=list)
+    fast: Optional[RowScorer] = None  # set when the model is a plain booster (see fastpath.py)
+    explainer: Optional[LazyExplainer] = None  # built lazily on the first explain request
+
+@dataclass(frozen=True)
+class ServingBundle:
+    """Everything a request reads: PROD, optional candidate, compiled rules."""
+    prod: ModelSlot
+    prod_source: str
+    rules: CompiledRuleset
+    cand: Optional[ModelSlot] = None
+    version: str = ""
+    loaded_at: str = ""
+    warmup: Dict[str, Any] = field(default_factory=dict)  # per-step ms of the warm-up run
+
+# Handlers read _BUNDLE once per request; a reload replaces it with a single
+# assignment, so in-flight requests finish on the bundle they started with.
+_BUNDLE: Optional[ServingBundle] = None
+_RELOAD_LOCK = threading.Lock()  # one build at a time; readers never take it
+_RELOAD_STATS: Dict[str, Any] = {"reloads": 0, "failures": 0, "last_reload": None, "last_error": None, "last_load_ms": None}
+
+# ---------- Startup / readiness ----------
+# The lifespan hook only starts cheap infrastructure, so the process is live
+# (/livez) right after import; the bundle is loaded and warmed on a background
+# thread and /ready flips to 200 once it is in place. Requests that arrive
+# earlier wait for the loader (up to FRAUD_READY_WAIT_SEC).
+STARTUP_BLOCKING = os.getenv("FRAUD_STARTUP_BLOCKING", "0") == "1"
+try:
+    READY_WAIT_SEC = max(0.0, float(os.getenv("FRAUD_READY_WAIT_SEC", "30")))
+except Exception:
+    READY_WAIT_SEC = 30.0
+
+_LOADER: Optional[threading.Thread] = None
+_READY = threading.Event()
+_STARTUP: Dict[str, Any] = {
+    "import_ms": None,
+    "bundle_ms": None,
+    "ctx_restore_ms": None,
+    "time_to_ready_ms": None,
+    "ready_at": None,
+    "error": None,
+}
+
+# ---------- Online context (ctx.* for rules) ----------
+CTX_ENABLED = os.getenv("FRAUD_CTX_STORE", "1") == "1"
+CTX_SNAPSHOT_PATH = Path(os.getenv("FRAUD_CTX_SNAPSHOT", str(STATE_DIR / "ctx_snapshot.json")))
+try:
+    CTX_MAX_ACCOUNTS = max(1, int(os.getenv("FRAUD_CTX_MAX_ACCOUNTS", "100000")))
+    CTX_TTL_DAYS = max(1.0, float(os.getenv("FRAUD_CTX_TTL_DAYS", "30")))
+    CTX_SNAPSHOT_SEC = max(0.0, float(os.getenv("FRAUD_CTX_SNAPSHOT_SEC", "300")))
+except Exception:
+    CTX_MAX_ACCOUNTS, CTX_TTL_DAYS, CTX_SNAPSHOT_SEC = 100000, 30.0, 300.0
+
+_CTX: Optional[ContextStore] = None  # or a proxy to the launcher's shared store
+_CTX_SNAPSHOTTER: Optional[SnapshotThread] = None
+_CTX_SHARED: Optional[Tuple[Any, bytes]] = None  # (address, authkey) of the ctx owner, set before fork
+_CTX_ERRORS = 0
+
+# ---------- Request log writer ----------
+LOG_ASYNC = os.getenv("FRAUD_LOG_ASYNC", "1") == "1"
+LOG_QUEUE_POLICY = os.getenv("FRAUD_LOG_QUEUE_POLICY", "block").lower()
+try:
+    LOG_QUEUE_MAX = max(1, int(os.getenv("FRAUD_LOG_QUEUE_MAX", "10000")))
+    LOG_SAMPLE_N = max(1, int(os.getenv("FRAUD_LOG_SAMPLE_N", "10")))
+except Exception:
+    LOG_QUEUE_MAX, LOG_SAMPLE_N = 10000, 10
+if LOG_QUEUE_POLICY not in LOG_POLICIES:
+    LOG_QUEUE_POLICY = "block"
+
+_LOG_WRITER: Optional[AsyncJsonlWriter] = None
+
+# ---------- Shadow worker pool ----------
+try:
+    SHADOW_WORKERS = max(1, int(os.getenv("FRAUD_SHADOW_WORKERS", "1")))
+    SHADOW_QUEUE_MAX = max(1, int(os.getenv("FRAUD_SHADOW_QUEUE_MAX", "1000")))
+except Exception:
+    SHADOW_WORKERS, SHADOW_QUEUE_MAX = 1, 1000
+
+_SHADOW_POOL: Optional[ShadowWorkerPool] = None
+
+# ---------- Micro-batching of concurrent /score calls (opt-in) ----------
+MICROBATCH_ENABLED = os.getenv("FRAUD_MICROBATCH", "0") == "1"
+try:
+    MICROBATCH_WINDOW_MS = max(0.0, float(os.getenv("FRAUD_MICROBATCH_WINDOW_MS", "2")))
+    MICROBATCH_MAX = max(1, int(os.getenv("FRAUD_MICROBATCH_MAX", "64")))
+except Exception:
+    MICROBATCH_WINDOW_MS, MICROBATCH_MAX = 2.0, 64
+
+_PROD_BATCHER: Optional[MicroBatcher] = None
+_CAND_BATCHER: Optional[MicroBatcher] = None
+
+
+# ---------- Hot reload watcher (opt-in) ----------
+try:
+    RELOAD_WATCH_SEC = max(0.0, float(os.getenv("FRAUD_RELOAD_WATCH_SEC", "0")))
+except Exception:
+    RELOAD_WATCH_SEC = 0.0
+
+_RELOAD_WATCHER: Optional[ReloadWatcher] = None
+
+# ---------- Idempotent /score (opt-in) ----------
+# A retried tx (same transaction_id, or same payload) gets its first ScoreOut back:
+# no inference, no ctx update, and a `cache_hit` log line instead of a second decision.
+IDEMPOTENCY_ENABLED = os.getenv("FRAUD_IDEMPOTENCY", "0") == "1"
+try:
+    IDEMPOTENCY_TTL_SEC = max(0.0, float(os.getenv("FRAUD_IDEMPOTENCY_TTL_SEC", "300")))
+    IDEMPOTENCY_MAX = max(1, int(os.getenv("FRAUD_IDEMPOTENCY_MAX", "100000")))
+except Exception:
+    IDEMPOTENCY_TTL_SEC, IDEMPOTENCY_MAX = 300.0, 100000
+
+_IDEMPOTENCY: Optional[IdempotencyCache] = None
+
+# ---------- Worker processes (prefork.py) ----------
+# FRAUD_XGB_NTHREAD pins XGBoost threads per process (0 = library default, all cores).
+# Under the pre-fork launcher each worker calls configure_worker(): N workers share
+# the daily log files (locked appends) and one ctx store in the launcher's ctx-owner process.
+try:
+    XGB_NTHREAD = max(0, int(os.getenv("FRAUD_XGB_NTHREAD", "0")))
+except Exception:
+    XGB_NTHREAD = 0
+WORKERS = 1
+WORKER_INDEX = 0
+_PRELOADED = False
+
+# ---------- Admission control / degraded mode under overload ----------
+# Above FRAUD_MAX_INFLIGHT concurrent scoring requests (queued ones included), or
+# past FRAUD_LATENCY_BUDGET_MS before inference, requests are scored rules-only
+# (policy "degrade") or rejected with 503 (policy "shed"); FRAUD_SHED_INFLIGHT is
+# a hard cap that always sheds. 0 disables a limit.
+try:
+    MAX_INFLIGHT = max(0, int(os.getenv("FRAUD_MAX_INFLIGHT", "0")))
+    SHED_INFLIGHT = max(0, int(os.getenv("FRAUD_SHED_INFLIGHT", "0")))
+    LATENCY_BUDGET_MS = max(0.0, float(os.getenv("FRAUD_LATENCY_BUDGET_MS", "0")))
+except Exception:
+    MAX_INFLIGHT, SHED_INFLIGHT, LATENCY_BUDGET_MS = 0, 0, 0.0
+OVERLOAD_POLICY = os.getenv("FRAUD_OVERLOAD_POLICY", "degrade").lower()
+
+_ADMISSION = AdmissionController(MAX_INFLIGHT, SHED_INFLIGHT, LATENCY_BUDGET_MS, OVERLOAD_POLICY)
+
+# ---------- Warm-up (before a bundle is marked ready / swapped in) ----------
+WARMUP_ENABLED = os.getenv("FRAUD_WARMUP", "1") == "1"
+WARMUP_EXPLAIN = os.getenv("FRAUD_WARMUP_EXPLAIN", "auto").lower()  # auto | 1 | 0
+try:
+    WARMUP_ROWS = max(1, int(os.getenv("FRAUD_WARMUP_ROWS", "32")))
+except Exception:
+    WARMUP_ROWS = 32
 
 # ---------- Traffic toggle ----------
 # Modes: 'prod' (default), 'shadow' (prod decides; cand logged), 'ab' (~N% cand decides)
@@ -161,238 +354,992 @@ def assign_arm(key: str, percent: int) -> str:
     return "cand" if bucket < percent else "prod"
 
 # ---------- Model/Explainer loading ----------
-def _load_model_bundle() -> None:
-    global _MODEL, _THRESHOLD, _FEATURES, _RULES, _MODEL_TS, _EXPLAINER, _BG, _PROD_DIR_PATH, _PROD_DIR_SOURCE
+def _numeric_features(features: List[str], categorical: List[str]) -> List[str]:
+    """Features that can be written into a float row (not declared categorical, not a str tx field)."""
+    return [f for f in features if f not in categorical and f not in _STRING_TX_FIELDS]
 
-    mdir, source = _resolve_prod_dir()
-    _PROD_DIR_PATH, _PROD_DIR_SOURCE = mdir, source
+def _read_features(fl_path: Path) -> Tuple[List[str], List[str]]:
+    """feature_list.json -> (features, categorical); empty features when missing/unreadable."""
+    if not fl_path.exists():
+        return [], []
+    try:
+        fl_obj = json.loads(fl_path.read_text(encoding="utf-8"))
+    except Exception:
+        return [], []
+    if isinstance(fl_obj, list):
+        return [str(x) for x in fl_obj], []
+    if isinstance(fl_obj, dict):
+        num = [str(x) for x in (fl_obj.get("numeric") or fl_obj.get("numeric_features") or [])]
+        cat = [str(x) for x in (fl_obj.get("categorical") or fl_obj.get("categorical_features") or [])]
+        return list(dict.fromkeys([*num, *cat])), cat
+    return [], []
+
+def _set_nthread(model: Any, n: int) -> None:
+    """Pin XGBoost threads on a bare XGB model or the XGB step of a Pipeline (no-op otherwise)."""
+    est = model.steps[-1][1] if hasattr(model, "steps") else model
+    if not hasattr(est, "get_booster"):
+        return
+    est.set_params(n_jobs=n)
+    est.get_booster().set_param({"nthread": n})
 
+def _load_slot(mdir: Path, default_features: List[str]) -> ModelSlot:
     model_path = mdir / "xgb_model.joblib"
     thr_path = mdir / "threshold.json"
-    fl_path = mdir / "feature_list.json"
-
     if not model_path.exists():
         raise FileNotFoundError(f"Missing model file: {model_path}")
 
-    _MODEL = joblib.load(model_path)
+    import joblib  # deferred with the model: pulls in xgboost/sklearn on unpickle
 
+    model = joblib.load(model_path)
+    if XGB_NTHREAD > 0:
+        _set_nthread(model, XGB_NTHREAD)
+
+    threshold = 0.5
     if thr_path.exists():
         try:
-            _THRESHOLD = json.loads(thr_path.read_text(encoding="utf-8")).get("threshold", 0.5)
+            threshold = float(json.loads(thr_path.read_text(encoding="utf-8")).get("threshold", 0.5))
         except Exception:
-            _THRESHOLD = 0.5
-    else:
-        _THRESHOLD = 0.5
+            threshold = 0.5
 
-    if fl_path.exists():
-        try:
-            fl_obj = json.loads(fl_path.read_text(encoding="utf-8"))
-            if isinstance(fl_obj, list):
-                _FEATURES = [str(x) for x in fl_obj]
-            elif isinstance(fl_obj, dict):
-                num = [str(x) for x in (fl_obj.get("numeric") or fl_obj.get("numeric_features") or [])]
-                cat = [str(x) for x in (fl_obj.get("categorical") or fl_obj.get("categorical_features") or [])]
-                _FEATURES = list(dict.fromkeys([*num, *cat]))
-            else:
-                _FEATURES = ["amount", "account_age_days", "hour_of_day"]
-        except Exception:
-            _FEATURES = ["amount", "account_age_days", "hour_of_day"]
-    else:
-        _FEATURES = ["amount", "account_age_days", "hour_of_day"]
+    features, categorical = _read_features(mdir / "feature_list.json")
+    features = features or list(default_features)
 
-    _RULES = _load_rules(RULES_PATH)
-    _MODEL_TS = datetime.fromtimestamp(model_path.stat().st_mtime).isoformat(timespec="seconds")
+    fast = build_row_scorer(model, features, _numeric_features(features, categorical))
+    return ModelSlot(
+        model=model,
+        threshold=threshold,
+        features=features,
+        model_ts=datetime.fromtimestamp(model_path.stat().st_mtime).isoformat(timespec="seconds"),
+        path=mdir,
+        categorical=categorical,
+        fast=fast,
+        explainer=LazyExplainer(model, features, fast),
+    )
 
-    if _HAS_SHAP:
-        try:
-            _BG = pd.DataFrame([{f: 0 for f in _FEATURES}])
-            _EXPLAINER = shap.TreeExplainer(_MODEL)
-        except Exception:
-            _EXPLAINER = None
+def _probe(slot: ModelSlot) -> None:
+    """One prediction on a default payload: a drop that cannot score is never swapped in."""
+    _score_txs(slot, [TransactionIn(amount=0.0, account_age_days=0).dict()])
 
-def _load_candidate_bundle(cand_dir: Path) -> None:
-    global _CAND, _CAND_THRESHOLD, _CAND_FEATURES, _CAND_TS
-    _CAND = None
-    _CAND_THRESHOLD = 0.5
-    _CAND_FEATURES = []
-    _CAND_TS = ""
+_WARMUP_COUNTRIES = ("US", "GB", "DE", "NG")
 
-    if not cand_dir or not cand_dir.exists():
-        return
+def _warmup_txs(slot: ModelSlot, n: int) -> List[Dict[str, Any]]:
+    """
+    Synthetic requests built from feature_list.json: every model feature gets a
+    varied value (strings for categoricals), validated through TransactionIn
+    like a real payload; extra model features ride along as real callers' would.
+    """
+    txs = []
+    for i in range(n):
+        raw: Dict[str, Any] = {f: (f"warmup-{i % 4}" if f in slot.categorical else float(i % 10) * 1.5) for f in slot.features}
+        raw.update(
+            amount=float(10 ** (i % 5)), account_age_days=i % 400, hour_of_day=i % 24,
+            country=_WARMUP_COUNTRIES[i % len(_WARMUP_COUNTRIES)], device_id=f"warmup-{i}",
+        )
+        txs.append({**raw, **TransactionIn(**raw).dict()})
+    return txs
 
-    model_path = cand_dir / "xgb_model.joblib"
-    thr_path = cand_dir / "threshold.json"
-    fl_path = cand_dir / "feature_list.json"
-    if not model_path.exists():
-        return
+def _warm_explain(slot: ModelSlot) -> bool:
+    if slot.explainer is None or WARMUP_EXPLAIN == "0":
+        return False
+    # "auto": only the native backend; building a shap TreeExplainer stays lazy
+    return WARMUP_EXPLAIN == "1" or slot.explainer.backend == CONTRIBS
+
+def _warm_up_slot(slot: ModelSlot, txs: List[Dict[str, Any]], rules: CompiledRuleset) -> Dict[str, float]:
+    """Run the /score and /score_batch steps once on synthetic data; returns ms per step."""
+    ctx = {k: None for k in rules.ctx_fields()}
+    t = StageTimer()
+    hits = [_apply_rules(tx, rules, ctx) for tx in txs]
+    _apply_rules_batch(txs, rules, [ctx] * len(txs))
+    t.mark("rules")
+    p1 = _score_tx(slot, txs[0])
+    t.mark("predict_one")
+    probas = _score_txs(slot, txs)
+    t.mark("predict_batch")
+    if _warm_explain(slot):
+        slot.explainer.warm_up(txs[:1])
+        slot.explainer.warm_up(txs)
+        t.mark("explain")
+    results = [
+        ScoreOut(decision="allow", proba=p, rules_hit=h, model_timestamp=slot.model_ts, latency_ms=0)
+        for p, h in zip([p1, *probas[1:]], hits)
+    ]
+    BatchScoreOut(count=len(results), results=results, latency_ms=0).dict()
+    t.mark("schema")
+    out = t.ms()
+    out["total"] = round(sum(out.values()), 3)
+    return out
+
+def _warm_up(prod: ModelSlot, cand: Optional[ModelSlot], rules: CompiledRuleset) -> Dict[str, Any]:
+    """Warm PROD (errors propagate) and the candidate (errors are recorded) before the swap."""
+    if not WARMUP_ENABLED:
+        return {}
+    t0 = time.perf_counter()
+    out: Dict[str, Any] = {"rows": WARMUP_ROWS, "prod": _warm_up_slot(prod, _warmup_txs(prod, WARMUP_ROWS), rules)}
+    if cand is not None:
+        try:
+            out["cand"] = _warm_up_slot(cand, _warmup_txs(cand, WARMUP_ROWS), rules)
+        except Exception as e:
+            out["cand"] = {"error": f"{type(e).__name__}: {e}"}
+    out["total_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    return out
 
+def _load_candidate_slot(cand_dir: Path, prod_features: List[str]) -> Optional[ModelSlot]:
+    """Candidate is best-effort: a missing or broken drop just means no candidate."""
+    if not cand_dir or not cand_dir.exists():
+        return None
     try:
-        _CAND = joblib.load(model_path)
+        slot = _load_slot(cand_dir, prod_features)
+        _probe(slot)
+        return slot
     except Exception:
-        _CAND = None
-        return
+        return None
 
-    if thr_path.exists():
-        try:
-            _CAND_THRESHOLD = json.loads(thr_path.read_text(encoding="utf-8")).get("threshold", 0.5)
-        except Exception:
-            _CAND_THRESHOLD = 0.5
+def _bundle_version(prod: ModelSlot, cand: Optional[ModelSlot], rules: CompiledRuleset) -> str:
+    parts = [str(prod.path), prod.model_ts, rules.version or ""]
+    if cand is not None:
+        parts += [str(cand.path), cand.model_ts]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:12]
+
+def _build_bundle() -> ServingBundle:
+    """Load PROD (+ candidate when configured) and rules into a new, warmed bundle."""
+    mdir, source = _resolve_prod_dir()
+    prod = _load_slot(mdir, _DEFAULT_FEATURES)
+    _probe(prod)
+    cand = None
+    if TRAFFIC_MODE in ("shadow", "ab") and CAND_DIR_ENV:
+        cand = _load_candidate_slot(Path(CAND_DIR_ENV), prod.features)
+    rules = _load_rules(RULES_PATH)
+    warmup = _warm_up(prod, cand, rules)
+    return ServingBundle(
+        prod=prod,
+        prod_source=source,
+        rules=rules,
+        cand=cand,
+        version=_bundle_version(prod, cand, rules),
+        loaded_at=datetime.now().isoformat(timespec="seconds"),
+        warmup=warmup,
+    )
+
+def _load_model_bundle() -> ServingBundle:
+    global _BUNDLE
+    _BUNDLE = _build_bundle()
+    return _BUNDLE
 
-    if fl_path.exists():
+def preload() -> ServingBundle:
+    """Build the bundle before the workers are forked (prefork.py); on_startup then reuses it."""
+    global _PRELOADED
+    with _RELOAD_LOCK:
+        bundle = _load_model_bundle()
+    _PRELOADED = True
+    return bundle
+
+def configure_worker(index: int, workers: int, nthread: int) -> None:
+    """Called in each forked worker before its lifespan starts."""
+    global WORKER_INDEX, WORKERS, XGB_NTHREAD
+    WORKER_INDEX, WORKERS, XGB_NTHREAD = index, workers, nthread
+    b = _BUNDLE
+    if b is not None and nthread > 0:
+        # touches only the booster config, the trees stay shared with the parent
+        for slot in (b.prod, b.cand):
+            if slot is not None:
+                _set_nthread(slot.model, nthread)
+
+def reload_bundle() -> Dict[str, Any]:
+    """
+    Build and warm a new bundle on the calling thread (never a request thread
+    that is scoring), then swap it in. On failure the current bundle keeps
+    serving and the error is recorded.
+    """
+    global _BUNDLE
+    with _RELOAD_LOCK:
+        previous = _BUNDLE
+        t0 = time.perf_counter()
         try:
-            fl_obj = json.loads(fl_path.read_text(encoding="utf-8"))
-            if isinstance(fl_obj, dict):
-                num = [str(x) for x in (fl_obj.get("numeric") or fl_obj.get("numeric_features") or [])]
-                cat = [str(x) for x in (fl_obj.get("categorical") or fl_obj.get("categorical_features") or [])]
-                _CAND_FEATURES = list(dict.fromkeys([*num, *cat]))
-            elif isinstance(fl_obj, list):
-                _CAND_FEATURES = [str(x) for x in fl_obj]
-        except Exception:
-            _CAND_FEATURES = []
+            bundle = _build_bundle()
+        except Exception as e:
+            _RELOAD_STATS["failures"] += 1
+            _RELOAD_STATS["last_error"] = f"{type(e).__name__}: {e}"
+            raise
+        _BUNDLE = bundle
+        _READY.set()  # also recovers from a failed startup load
+        load_ms = round((time.perf_counter() - t0) * 1000, 1)
+        _RELOAD_STATS.update(reloads=_RELOAD_STATS["reloads"] + 1, last_reload=bundle.loaded_at, last_error=None, last_load_ms=load_ms)
+    return {
+        "version": bundle.version,
+        "previous_version": previous.version if previous is not None else None,
+        "changed": previous is None or previous.version != bundle.version,
+        "prod_dir": str(bundle.prod.path),
+        "prod_source": bundle.prod_source,
+        "candidate_loaded": bundle.cand is not None,
+        "load_ms": load_ms,
+    }
+
+def _startup_load(t_start: float) -> None:
+    """Load + warm the first bundle, then the ctx store; records the startup profile."""
+    t0 = time.perf_counter()
+    try:
+        with _RELOAD_LOCK:
+            bundle = _BUNDLE if _PRELOADED and _BUNDLE is not None else _load_model_bundle()
+        t1 = time.perf_counter()
+        _init_context_store(bundle.rules)
+        t2 = time.perf_counter()
+        _STARTUP.update(
+            bundle_ms=round((t1 - t0) * 1000, 1),
+            ctx_restore_ms=round((t2 - t1) * 1000, 1),
+            time_to_ready_ms=round((t2 - t_start) * 1000, 1),
+            ready_at=datetime.now().isoformat(timespec="seconds"),
+            error=None,
+        )
+        _READY.set()
+    except Exception as e:
+        _STARTUP["error"] = f"{type(e).__name__}: {e}"
+
+def _wait_for_startup() -> None:
+    loader = _LOADER
+    if loader is not None and loader.is_alive():
+        loader.join(READY_WAIT_SEC)
 
-    _CAND_TS = datetime.fromtimestamp(model_path.stat().st_mtime).isoformat(timespec="seconds")
+def _current_bundle() -> ServingBundle:
+    _wait_for_startup()
+    bundle = _BUNDLE
+    if bundle is None and _LOADER is None and _STARTUP["error"] is None:
+        # no lifespan (bare import, scripts): load on first use
+        with _RELOAD_LOCK:
+            if _BUNDLE is None:
+                try:
+                    _load_model_bundle()
+                    _READY.set()
+                except Exception as e:
+                    _STARTUP["error"] = f"{type(e).__name__}: {e}"
+            bundle = _BUNDLE
+    if bundle is None:
+        detail = f"Model not loaded: {_STARTUP['error']}" if _STARTUP["error"] else "Model not loaded"
+        raise HTTPException(status_code=503, detail=detail)
+    return bundle
+
+def _watched_paths() -> List[Path]:
+    paths = [PROD_POINTER, MODELS_DIR, RULES_PATH]  # MODELS_DIR mtime moves when a drop is added
+    if CAND_DIR_ENV:
+        cand = Path(CAND_DIR_ENV)
+        paths += [cand, cand / "xgb_model.joblib", cand / "threshold.json", cand / "feature_list.json"]
+    return paths
+
+def _ctx_store_kwargs(rules: CompiledRuleset) -> Dict[str, Any]:
+    vel = rules.params_for_ctx("velocity_spike")
+    return {
+        "max_accounts": CTX_MAX_ACCOUNTS,
+        "ttl_sec": CTX_TTL_DAYS * 86400,
+        "window_minutes": float(vel.get("window_minutes", 30)),
+        "baseline_days": float(vel.get("baseline_days", 14)),
+        "multiplier": float(vel.get("multiplier", 3.5)),
+    }
+
+def start_shared_context(rules: CompiledRuleset) -> Optional[SharedContextOwner]:
+    """Pre-fork launcher, before forking: one ctx store process that every worker connects to."""
+    global _CTX_SHARED
+    if not CTX_ENABLED:
+        return None
+    owner = SharedContextOwner(_ctx_store_kwargs(rules), CTX_SNAPSHOT_PATH, CTX_SNAPSHOT_SEC)
+    _CTX_SHARED = (owner.address, owner.authkey)
+    return owner
+
+def _init_context_store(rules: CompiledRuleset) -> None:
+    """Build the ctx store from the velocity rule's params, warm it from the last snapshot."""
+    global _CTX, _CTX_SNAPSHOTTER
+    if not CTX_ENABLED:
+        return
+    if _CTX_SHARED is not None:
+        _CTX = connect_shared(*_CTX_SHARED)  # the owner restores and snapshots
+        return
+    _CTX = ContextStore(**_ctx_store_kwargs(rules))
+    _CTX.restore(CTX_SNAPSHOT_PATH)
+    if CTX_SNAPSHOT_SEC > 0:
+        _CTX_SNAPSHOTTER = SnapshotThread(_CTX, CTX_SNAPSHOT_PATH, CTX_SNAPSHOT_SEC)
+        _CTX_SNAPSHOTTER.start()
+
+def _observe_ctx(tx: Dict[str, Any]) -> Dict[str, Any]:
+    global _CTX_ERRORS
+    if _CTX is None:
+        return {}
+    try:
+        return _CTX.observe(tx)
+    except Exception:  # shared owner unreachable: score without ctx rather than fail
+        _CTX_ERRORS += 1
+        return {}
 
 def _tx_to_frame(tx: Dict[str, Any], features: List[str]) -> pd.DataFrame:
+    import pandas as pd
+
     row = {f: tx.get(f, 0) for f in features}
     return pd.DataFrame([row], columns=features)
 
+def _txs_to_frame(txs: List[Dict[str, Any]], features: List[str]) -> pd.DataFrame:
+    """Column-wise build of one feature matrix for a whole batch (one row per tx)."""
+    import pandas as pd
+
+    cols = {f: [tx.get(f, 0) for tx in txs] for f in features}
+    return pd.DataFrame(cols, columns=features)
+
 def _predict_proba(model, df: pd.DataFrame) -> float:
     try:
         return float(model.predict_proba(df)[0][1])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Inference failed: {e}")
 
-def _top_features(df: pd.DataFrame, k: int = 5) -> Optional[List[Dict[str, Any]]]:
-    if _EXPLAINER is None:
-        return None
+def _predict_proba_batch(model, df: pd.DataFrame) -> List[float]:
+    if df.empty:
+        return []
     try:
-        vals = _EXPLAINER.shap_values(df)
-        row = vals[0] if hasattr(vals, "__len__") else vals
-        pairs = list(zip(_FEATURES, row))
-        pairs.sort(key=lambda t: abs(float(t[1])), reverse=True)
-        return [{"feature": n, "shap_value": float(v)} for n, v in pairs[:k]]
-    except Exception:
-        return None
+        return [float(p) for p in model.predict_proba(df)[:, 1]]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Inference failed: {e}")
+
+def _score_tx(slot: ModelSlot, tx: Dict[str, Any]) -> float:
+    """One tx -> probability; float32 row + inplace_predict when available, else one-row DataFrame."""
+    if slot.fast is None:
+        return _predict_proba(slot.model, _tx_to_frame(tx, slot.features))
+    try:
+        return slot.fast.predict(tx)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Inference failed: {e}")
+
+def _score_txs(slot: ModelSlot, txs: List[Dict[str, Any]]) -> List[float]:
+    if slot.fast is None:
+        return _predict_proba_batch(slot.model, _txs_to_frame(txs, slot.features))
+    try:
+        return slot.fast.predict_many(txs)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Inference failed: {e}")
+
+def _score_tx_timed(slot: ModelSlot, tx: Dict[str, Any], timer: StageTimer) -> float:
+    """_score_tx split into "frame"/"predict" stages."""
+    if slot.fast is not None:
+        proba = _score_tx(slot, tx)
+    else:
+        df = _tx_to_frame(tx, slot.features)
+        timer.mark("frame")
+        proba = _predict_proba(slot.model, df)
+    timer.mark("predict")
+    return proba
+
+def _group_by_slot(slots: List[ModelSlot]) -> List[Tuple[ModelSlot, List[int]]]:
+    """Indices per distinct slot (a batch collected across a reload can hold two)."""
+    groups: Dict[int, Tuple[ModelSlot, List[int]]] = {}
+    for i, slot in enumerate(slots):
+        groups.setdefault(id(slot), (slot, []))[1].append(i)
+    return list(groups.values())
+
+def _explain(slot: ModelSlot, txs: List[Dict[str, Any]]) -> List[Optional[List[Dict[str, Any]]]]:
+    """Top-5 attributions per tx; only called when the request asked for them."""
+    if slot.explainer is None:
+        return [None] * len(txs)
+    return slot.explainer.explain(txs)
+
+# ---------- Micro-batching (opt-in) ----------
+# Batchers queue (slot, tx) so each caller is scored by the model it resolved.
+def _score_slot_items(items: List[Tuple[ModelSlot, Dict[str, Any]]]) -> List[float]:
+    out = [0.0] * len(items)
+    for slot, idx in _group_by_slot([s for s, _ in items]):
+        for i, p in zip(idx, _score_txs(slot, [items[i][1] for i in idx])):
+            out[i] = p
+    return out
+
+def _batched_proba(batcher: MicroBatcher, slot: ModelSlot, tx: Dict[str, Any]) -> float:
+    try:
+        try:
+            return float(batcher.predict((slot, tx)))
+        except BatcherStopped:  # shutting down: score this one directly
+            return float(_score_txs(slot, [tx])[0])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Inference failed: {e}")
+
+def _start_batchers() -> None:
+    global _PROD_BATCHER, _CAND_BATCHER
+    if not MICROBATCH_ENABLED:
+        return
+    if _PROD_BATCHER is None:
+        _PROD_BATCHER = MicroBatcher(_score_slot_items, window_ms=MICROBATCH_WINDOW_MS, max_batch=MICROBATCH_MAX, name="prod")
+        _PROD_BATCHER.start()
+    # a candidate may appear on a later reload, so this does not depend on one being loaded now
+    if _CAND_BATCHER is None and TRAFFIC_MODE == "ab" and CAND_DIR_ENV:
+        _CAND_BATCHER = MicroBatcher(_score_slot_items, window_ms=MICROBATCH_WINDOW_MS, max_batch=MICROBATCH_MAX, name="cand")
+        _CAND_BATCHER.start()
+
+def _stop_batchers() -> None:
+    global _PROD_BATCHER, _CAND_BATCHER
+    for b in (_PROD_BATCHER, _CAND_BATCHER):
+        if b is not None:
+            b.stop()
+    _PROD_BATCHER = _CAND_BATCHER = None
+
+# ---------- Shadow scoring (background) ----------
+def _score_shadow_jobs(jobs: List[Dict[str, Any]]) -> None:
+    """Score the candidate once per group of PROD outcomes and write the shadow lines."""
+    if not jobs:
+        return
+    for cand, idx in _group_by_slot([j["cand"] for j in jobs]):
+        group = [jobs[i] for i in idx]
+        t1 = time.perf_counter()
+        for job in group:  # time spent waiting in the shadow queue
+            _METRICS.observe("shadow", "shadow", {"queue": t1 - job["t_submit"]})
+        probas_cand = _score_txs(cand, [j["payload"] for j in group])
+        predict_sec = time.perf_counter() - t1
+        latency_cand_ms = int(predict_sec * 1000)
+        decisions = ["flag" if pc >= cand.threshold else "allow" for pc in probas_cand]
+        _write_logs([
+            {
+                "ts": job["ts"],
+                "payload": job["payload"],
+                "prod": job["prod"],
+                "cand": {"proba": pc, "decision": d},
+                "latency_ms": {"prod": job["latency_prod_ms"], "cand": latency_cand_ms},
+                "model_ts": {"prod": job["prod_ts"], "cand": cand.model_ts},
+            }
+            for job, pc, d in zip(group, probas_cand, decisions)
+        ], suffix="_shadow")
+        _METRICS.observe("shadow", "shadow", {"predict": predict_sec, "log": time.perf_counter() - t1 - predict_sec})
+        for d in decisions:
+            _METRICS.count_request("shadow", "shadow", d)
+
+def _submit_shadow(jobs: List[Dict[str, Any]]) -> None:
+    pool = _SHADOW_POOL
+    if pool is not None and pool.running:
+        pool.submit(jobs)
+    else:
+        _score_shadow_jobs(jobs)
 
 # ---------- Daily JSONL logging (LOCAL DATE) ----------
-def _write_log(entry: Dict[str, Any]) -> None:
+# When the background writer is running (app lifecycle), request threads only
+# enqueue; otherwise (scripts, bare imports) lines are appended synchronously.
+def _append_sync(entries: List[Dict[str, Any]], suffix: str) -> None:
     LOGS_DIR.mkdir(parents=True, exist_ok=True)
-    fname = datetime.now().strftime("%Y%m%d") + ".jsonl"
+    fname = datetime.now().strftime("%Y%m%d") + suffix + ".jsonl"
+    data = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries)
+    if WORKERS > 1:
+        with (LOGS_DIR / fname).open("ab", buffering=0) as fb:
+            append_locked(fb, data.encode("utf-8"))
+        return
     with (LOGS_DIR / fname).open("a", encoding="utf-8") as f:
-        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        f.write(data)
+
+def _write_logs(entries: List[Dict[str, Any]], suffix: str = "") -> None:
+    if not entries:
+        return
+    writer = _LOG_WRITER
+    if writer is not None and writer.running:
+        for e in entries:
+            writer.write(e, suffix)
+    else:
+        _append_sync(entries, suffix)
+
+def _write_log(entry: Dict[str, Any]) -> None:
+    _write_logs([entry])
 
 def _write_shadow_log(entry: Dict[str, Any]) -> None:
-    LOGS_DIR.mkdir(parents=True, exist_ok=True)
-    fname = datetime.now().strftime("%Y%m%d") + "_shadow.jsonl"
-    with (LOGS_DIR / fname).open("a", encoding="utf-8") as f:
-        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    _write_logs([entry], suffix="_shadow")
 
-# ---------- FastAPI lifecycle & endpoints ----------
-@app.on_event("startup")
+# ---------- FastAPI lifecycle (lifespan) & endpoints ----------
 def on_startup() -> None:
-    _load_model_bundle()
-    # Load candidate for SHADOW and A/B if provided
-    if TRAFFIC_MODE in ("shadow", "ab") and CAND_DIR_ENV:
-        _load_candidate_bundle(Path(CAND_DIR_ENV))
+    global _LOG_WRITER, _SHADOW_POOL, _RELOAD_WATCHER, _LOADER, _BUNDLE, _IDEMPOTENCY
+    t_start = time.perf_counter()
+    _READY.clear()
+    if not _PRELOADED:
+        _BUNDLE = None
+    _STARTUP["error"] = None
+    if LOG_ASYNC and _LOG_WRITER is None:
+        _LOG_WRITER = AsyncJsonlWriter(
+            LOGS_DIR, max_queue=LOG_QUEUE_MAX, policy=LOG_QUEUE_POLICY, sample_n=LOG_SAMPLE_N, shared=WORKERS > 1,
+        )
+        _LOG_WRITER.start()
+    # Shadow workers run whenever a candidate is configured; reloads may add/replace it
+    if TRAFFIC_MODE == "shadow" and CAND_DIR_ENV and _SHADOW_POOL is None:
+        _SHADOW_POOL = ShadowWorkerPool(_score_shadow_jobs, workers=SHADOW_WORKERS, max_queue=SHADOW_QUEUE_MAX)
+        _SHADOW_POOL.start()
+    _start_batchers()
+    _IDEMPOTENCY = IdempotencyCache(IDEMPOTENCY_MAX, IDEMPOTENCY_TTL_SEC) if IDEMPOTENCY_ENABLED else None
+    if RELOAD_WATCH_SEC > 0 and _RELOAD_WATCHER is None:
+        _RELOAD_WATCHER = ReloadWatcher(_watched_paths, reload_bundle, RELOAD_WATCH_SEC)
+        _RELOAD_WATCHER.start()
+    if STARTUP_BLOCKING:
+        _startup_load(t_start)
+    else:
+        _LOADER = threading.Thread(target=_startup_load, args=(t_start,), name="fraud-startup-load", daemon=True)
+        _LOADER.start()
+
+def on_shutdown() -> None:
+    global _LOG_WRITER, _SHADOW_POOL, _RELOAD_WATCHER
+    _wait_for_startup()
+    if _RELOAD_WATCHER is not None:
+        _RELOAD_WATCHER.stop()
+        _RELOAD_WATCHER = None
+    _stop_batchers()
+    # shadow workers still write log lines -> drain them before the writer
+    if _SHADOW_POOL is not None:
+        _SHADOW_POOL.stop()
+        _SHADOW_POOL = None
+    if _LOG_WRITER is not None:
+        _LOG_WRITER.stop()
+        _LOG_WRITER = None
+    if _CTX_SNAPSHOTTER is not None:
+        _CTX_SNAPSHOTTER.stop()
+    if _CTX is not None and _CTX_SHARED is None:  # a shared store is snapshotted by its owner
+        try:
+            _CTX.snapshot(CTX_SNAPSHOT_PATH)
+        except Exception:
+            pass
+
+def _ctx_stats() -> Optional[Dict[str, Any]]:
+    if _CTX is None:
+        return None
+    try:
+        st = _CTX.stats()
+    except Exception as e:
+        st = {"error": str(e)}
+    return {**st, "shared": _CTX_SHARED is not None, "errors": _CTX_ERRORS}
+
+@app.get("/livez")
+async def livez() -> Dict[str, Any]:
+    """Liveness: the process serves HTTP. async so it never queues behind the scoring thread pool."""
+    return {"status": "alive"}
+
+@app.get("/ready")
+def ready() -> JSONResponse:
+    """Readiness: 200 once a warmed bundle is serving, 503 while loading or after a failed load."""
+    b = _BUNDLE
+    is_ready = _READY.is_set() and b is not None
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={
+            "ready": is_ready,
+            "bundle_version": b.version if b is not None else None,
+            "startup": _STARTUP,
+        },
+    )
 
 @app.get("/health")
 def health() -> Dict[str, Any]:
+    _wait_for_startup()  # report the loaded bundle, not the loading state
+    b = _BUNDLE
+    prod = b.prod if b is not None else None
+    cand = b.cand if b is not None else None
+    rules = b.rules if b is not None else CompiledRuleset()
+    features = prod.features if prod is not None else []
     return {
         "status": "ok",
+        "ready": _READY.is_set() and b is not None,
+        "startup": _STARTUP,
+        "worker": {"index": WORKER_INDEX, "workers": WORKERS, "pid": os.getpid(), "xgb_nthread": XGB_NTHREAD},
         "traffic_mode": TRAFFIC_MODE,
         "ab_percent": AB_PERCENT,
-        "prod_dir": str(_PROD_DIR_PATH) if _PROD_DIR_PATH else None,
-        "prod_source": _PROD_DIR_SOURCE,
-        "model_timestamp": _MODEL_TS,
-        "rules_count": len(_RULES),
-        "features_count": len(_FEATURES),
-        "features_preview": _FEATURES[:10],
-        "candidate_loaded": bool(_CAND),
-        "candidate_timestamp": _CAND_TS,
+        "bundle_version": b.version if b is not None else None,
+        "bundle_loaded_at": b.loaded_at if b is not None else None,
+        "warmup": b.warmup if b is not None else None,
+        "prod_dir": str(prod.path) if prod is not None else None,
+        "prod_source": b.prod_source if b is not None else "unknown",
+        "model_timestamp": prod.model_ts if prod is not None else "",
+        "rules_count": len(rules),
+        "rules_version": rules.version,
+        "rules_errors": rules.errors,
+        "features_count": len(features),
+        "features_preview": features[:10],
+        "candidate_loaded": cand is not None,
+        "candidate_timestamp": cand.model_ts if cand is not None else "",
+        "explain": {
+            "prod": prod.explainer.stats() if prod is not None and prod.explainer is not None else None,
+            "cand": cand.explainer.stats() if cand is not None and cand.explainer is not None else None,
+        },
+        "inference_path": {
+            "prod": (FAST_PATH if prod.fast is not None else FRAME_PATH) if prod is not None else None,
+            "cand": (FAST_PATH if cand.fast is not None else FRAME_PATH) if cand is not None else None,
+        },
+        "reload": {
+            **_RELOAD_STATS,
+            "watcher": {
+                "interval_sec": RELOAD_WATCH_SEC,
+                "triggered": _RELOAD_WATCHER.triggered,
+                "errors": _RELOAD_WATCHER.errors,
+            } if _RELOAD_WATCHER is not None else None,
+        },
+        "ctx_store": _ctx_stats(),
+        "log_writer": _LOG_WRITER.stats() if _LOG_WRITER is not None else None,
+        "shadow": _SHADOW_POOL.stats() if _SHADOW_POOL is not None else None,
+        "idempotency": _IDEMPOTENCY.stats() if _IDEMPOTENCY is not None else None,
+        "admission": _ADMISSION.stats(),
+        "microbatch": {
+            "prod": _PROD_BATCHER.stats() if _PROD_BATCHER is not None else None,
+            "cand": _CAND_BATCHER.stats() if _CAND_BATCHER is not None else None,
+        } if MICROBATCH_ENABLED else None,
     }
 
+@app.post("/reload")
+def reload() -> Dict[str, Any]:
+    """Re-resolve PROD_POINTER.txt / FRAUD_CANDIDATE_DIR / rules and swap the bundle in atomically."""
+    try:
+        return reload_bundle()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed: {e}")
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> str:
+    """Prometheus text format: per-stage latency histograms (endpoint/arm/stage) and request counters."""
+    text = _METRICS.render_prometheus()
+    if _IDEMPOTENCY is not None:
+        st = _IDEMPOTENCY.stats()
+        text += "# HELP fraud_idempotency_lookups_total Idempotency cache lookups on /score.\n"
+        text += "# TYPE fraud_idempotency_lookups_total counter\n"
+        text += f'fraud_idempotency_lookups_total{{result="hit"}} {st["hits"]}\n'
+        text += f'fraud_idempotency_lookups_total{{result="miss"}} {st["misses"]}\n'
+    if _ADMISSION.enabled:
+        st = _ADMISSION.stats()
+        text += "# HELP fraud_admission_total Scoring requests by admission outcome.\n"
+        text += "# TYPE fraud_admission_total counter\n"
+        for result in ("admitted", "degraded", "shed"):
+            text += f'fraud_admission_total{{result="{result}"}} {st[result]}\n'
+        text += "# HELP fraud_inflight_requests Scoring requests currently admitted.\n"
+        text += "# TYPE fraud_inflight_requests gauge\n"
+        text += f"fraud_inflight_requests {st['inflight']}\n"
+    return text
+
+@app.post("/explain", response_model=ExplainOut)
+def explain_tx(payload: TransactionIn) -> ExplainOut:
+    """PROD top-5 feature attributions for one tx (no decision, no log line, no ctx update)."""
+    t0 = time.perf_counter()
+    prod = _current_bundle().prod
+    tops = _explain(prod, [payload.dict()])[0]
+    return ExplainOut(
+        top_features=tops,
+        backend=prod.explainer.backend if prod.explainer is not None else None,
+        model_timestamp=prod.model_ts,
+        latency_ms=round((time.perf_counter() - t0) * 1000, 3),
+    )
+
+def _admission(request: Request) -> str:
+    """Verdict for this request: middleware concurrency check, then the latency budget."""
+    verdict = getattr(request.state, "admission", FULL)
+    if verdict == FULL:
+        verdict = _ADMISSION.check_budget(getattr(request.state, "t_start", None))
+    if verdict == SHED:
+        raise HTTPException(status_code=503, detail="Overloaded, retry later", headers={"Retry-After": "1"})
+    return verdict
+
+def _replay_cached(
+    cached: Tuple[str, ScoreOut], key: str, tx: Dict[str, Any], b: ServingBundle, explain: bool, timer: StageTimer
+) -> ScoreOut:
+    """Answer a retry from the idempotency cache; the log gets a marker, not a second decision."""
+    arm, out = cached
+    if explain and out.top_features is None:
+        # first call was not explained: explain now with the bundle that scored it, if still loaded
+        slot = b.cand if arm == "cand" else b.prod
+        if slot is not None and slot.model_ts == out.model_timestamp:
+            out = out.copy(update={"top_features": _explain(slot, [tx])[0]})
+            timer.mark("explain")
+    _write_log({
+        "ts": datetime.now().isoformat(timespec="seconds"),
+        "arm": arm,
+        "cache_hit": True,
+        "idempotency_key": key,
+        "decision": out.decision,
+        "model_ts": out.model_timestamp,
+        "stages_ms": timer.ms(),
+    })
+    timer.mark("log")
+    _METRICS.observe("score", arm, {**timer.stages, "total": timer.total()})
+    _METRICS.count_request("score", arm, "cache_hit")
+    return out
+
 @app.post("/score", response_model=ScoreOut)
-def score(payload: TransactionIn) -> ScoreOut:
+def score(payload: TransactionIn, request: Request, explain: bool = False) -> ScoreOut:
+    timer = StageTimer(getattr(request.state, "t_start", None))
+    timer.mark("parse")
+    b = _current_bundle()  # one consistent bundle for the whole request
     tx = payload.dict()
-    rules_hit = _apply_rules(tx, _RULES) if _RULES else []
+    key, cached = None, None
+    if _IDEMPOTENCY is not None:
+        key = idempotency_key(tx)
+        cached = _IDEMPOTENCY.get(key)
+        timer.mark("cache")
+        if cached is not None and is_client_key(key):
+            return _replay_cached(cached, key, tx, b, explain, timer)
+    verdict = _admission(request)  # a shed request leaves no trace in the ctx store
+    ctx = _observe_ctx(tx)
+    timer.mark("ctx")
+    rules_hit = _apply_rules(tx, b.rules, ctx) if b.rules else RuleHits()
+    timer.mark("rules")
+    if cached is not None and cached[1].rules_hit == rules_hit:
+        # payload-hash key: a retry or a repeat of the same charge, so ctx still counts it;
+        # replayed only while the rules agree (a burst that now trips velocity is rescored)
+        return _replay_cached(cached, key, tx, b, explain, timer)
+
+    if verdict == DEGRADED:
+        # overload: rules-only decision; no model, explanation, shadow or cache entry
+        decision = _decide(None, b.prod.threshold, rules_hit)
+        _write_log({
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "arm": "prod",
+            "tx": tx,
+            "ctx": ctx,
+            "proba": None,
+            "decision": decision,
+            "rules_hit": rules_hit,
+            "degraded": True,
+            "latency_ms": 0,
+            "stages_ms": timer.ms(),
+            "model_ts": b.prod.model_ts,
+        })
+        timer.mark("log")
+        _METRICS.observe("score", "degraded", {**timer.stages, "total": timer.total()})
+        _METRICS.count_request("score", "degraded", decision)
+        return ScoreOut(
+            decision=decision, proba=None, rules_hit=rules_hit, model_timestamp=b.prod.model_ts,
+            latency_ms=0, degraded=True,
+        )
 
     # Decide arm
     arm = "prod"
-    if TRAFFIC_MODE == "ab" and _CAND is not None:
+    if TRAFFIC_MODE == "ab" and b.cand is not None:
         arm = assign_arm(tx.get("device_id", ""), AB_PERCENT)
 
     if arm == "cand":
         # CANDIDATE DECISION PATH
+        cand = b.cand
         t0 = time.perf_counter()
-        cand_features = _CAND_FEATURES if _CAND_FEATURES else _FEATURES
-        df_cand = _tx_to_frame(tx, cand_features)
-        proba_cand = _predict_proba(_CAND, df_cand)
+        if _CAND_BATCHER is not None:
+            proba_cand = _batched_proba(_CAND_BATCHER, cand, tx)
+            timer.mark("predict")
+        else:
+            proba_cand = _score_tx_timed(cand, tx, timer)
+        tops = None
+        if explain:
+            tops = _explain(cand, [tx])[0]
+            timer.mark("explain")
         latency_ms = int((time.perf_counter() - t0) * 1000)
-        decision_cand = "flag" if (proba_cand >= _CAND_THRESHOLD or len(rules_hit) > 0) else "allow"
+        decision_cand = _decide(proba_cand, cand.threshold, rules_hit)
 
         _write_log({
             "ts": datetime.now().isoformat(timespec="seconds"),
             "arm": "cand",
             "tx": tx,
+            "ctx": ctx,
             "proba": proba_cand,
             "decision": decision_cand,
             "rules_hit": rules_hit,
             "latency_ms": latency_ms,
-            "model_ts": _CAND_TS,
+            "stages_ms": timer.ms(),
+            "model_ts": cand.model_ts,
         })
+        timer.mark("log")
+        _METRICS.observe("score", "cand", {**timer.stages, "total": timer.total()})
+        _METRICS.count_request("score", "cand", decision_cand)
 
-        return ScoreOut(
+        out = ScoreOut(
             decision=decision_cand,
             proba=proba_cand,
             rules_hit=rules_hit,
-            top_features=None,
-            model_timestamp=_CAND_TS,
+            top_features=tops,
+            model_timestamp=cand.model_ts,
             latency_ms=latency_ms,
         )
+        if key is not None:
+            _IDEMPOTENCY.put(key, ("cand", out))
+        return out
 
     # PRODUCTION DECISION PATH (default and SHADOW)
+    prod = b.prod
     t0 = time.perf_counter()
-    df_prod = _tx_to_frame(tx, _FEATURES)
-    proba_prod = _predict_proba(_MODEL, df_prod)
-    decision = "flag" if (proba_prod >= _THRESHOLD or len(rules_hit) > 0) else "allow"
-    tops = _top_features(df_prod)
+    if _PROD_BATCHER is not None:
+        proba_prod = _batched_proba(_PROD_BATCHER, prod, tx)
+        timer.mark("predict")
+    else:
+        proba_prod = _score_tx_timed(prod, tx, timer)
+    decision = _decide(proba_prod, prod.threshold, rules_hit)
+    tops = None
+    if explain:
+        tops = _explain(prod, [tx])[0]
+        timer.mark("explain")
     latency_ms = int((time.perf_counter() - t0) * 1000)
 
     _write_log({
         "ts": datetime.now().isoformat(timespec="seconds"),
         "arm": "prod",
         "tx": tx,
+        "ctx": ctx,
         "proba": proba_prod,
         "decision": decision,
         "rules_hit": rules_hit,
         "latency_ms": latency_ms,
-        "model_ts": _MODEL_TS,
+        "stages_ms": timer.ms(),
+        "model_ts": prod.model_ts,
     })
+    timer.mark("log")
 
-    # If in SHADOW, still do side-by-side recording
-    if TRAFFIC_MODE == "shadow" and _CAND is not None:
-        t1 = time.perf_counter()
-        cand_features = _CAND_FEATURES if _CAND_FEATURES else _FEATURES
-        df_cand = _tx_to_frame(tx, cand_features)
-        proba_cand = _predict_proba(_CAND, df_cand)
-        latency_cand_ms = int((time.perf_counter() - t1) * 1000)
-        decision_cand = "flag" if proba_cand >= _CAND_THRESHOLD else "allow"
-
-        _write_shadow_log({
+    # If in SHADOW, record side-by-side off the request path
+    if TRAFFIC_MODE == "shadow" and b.cand is not None:
+        _submit_shadow([{
             "ts": datetime.now().isoformat(timespec="seconds"),
             "payload": tx,
             "prod": {"proba": proba_prod, "decision": decision, "rules_hit": rules_hit},
-            "cand": {"proba": proba_cand, "decision": decision_cand},
-            "latency_ms": {"prod": latency_ms, "cand": latency_cand_ms},
-            "model_ts": {"prod": _MODEL_TS, "cand": _CAND_TS},
-        })
+            "latency_prod_ms": latency_ms,
+            "prod_ts": prod.model_ts,
+            "cand": b.cand,
+            "t_submit": time.perf_counter(),
+        }])
+        timer.mark("shadow_submit")
+    _METRICS.observe("score", "prod", {**timer.stages, "total": timer.total()})
+    _METRICS.count_request("score", "prod", decision)
 
-    return ScoreOut(
+    out = ScoreOut(
         decision=decision,
         proba=proba_prod,
         rules_hit=rules_hit,
         top_features=tops,
-        model_timestamp=_MODEL_TS,
+        model_timestamp=prod.model_ts,
         latency_ms=latency_ms,
     )
+    if key is not None:
+        _IDEMPOTENCY.put(key, ("prod", out))
+    return out
+
+def _score_batch_degraded(
+    txs: List[Dict[str, Any]], ctxs: List[Dict[str, Any]], rules_hits: List[RuleHits], b: ServingBundle, timer: StageTimer
+) -> BatchScoreOut:
+    """Rules-only /score_batch under overload (same log/metric labels as /score)."""
+    ts = datetime.now().isoformat(timespec="seconds")
+    model_ts = b.prod.model_ts
+    stages_ms = timer.ms()
+    entries, results = [], []
+    for tx, ctx, hits in zip(txs, ctxs, rules_hits):
+        decision = _decide(None, b.prod.threshold, hits)
+        entries.append({
+            "ts": ts, "arm": "prod", "tx": tx, "ctx": ctx, "proba": None, "decision": decision, "rules_hit": hits,
+            "degraded": True, "latency_ms": 0, "stages_ms": stages_ms, "model_ts": model_ts,
+        })
+        results.append(ScoreOut(
+            decision=decision, proba=None, rules_hit=hits, model_timestamp=model_ts, latency_ms=0, degraded=True,
+        ))
+        _METRICS.count_request("score_batch", "degraded", decision)
+    _write_logs(entries)
+    timer.mark("log")
+    _METRICS.observe("score_batch", "degraded", {**timer.stages, "total": timer.total()})
+    return BatchScoreOut(count=len(results), results=results, latency_ms=int(timer.total() * 1000))
+
+@app.post("/score_batch", response_model=BatchScoreOut)
+def score_batch(payload: BatchIn, request: Request, explain: bool = False) -> BatchScoreOut:
+    """
+    Vectorized twin of /score: one feature matrix and one predict_proba per arm
+    for the whole batch. Arm assignment, rules, logging and shadow recording
+    follow the same semantics as the single-transaction path.
+    """
+    timer = StageTimer(getattr(request.state, "t_start", None))
+    timer.mark("parse")
+    txs = [p.dict() for p in payload.transactions]
+    if not txs:
+        return BatchScoreOut(count=0, results=[], latency_ms=0)
+    b = _current_bundle()
+    verdict = _admission(request)  # shed before any ctx update
+    ctxs = [_observe_ctx(tx) for tx in txs]
+    timer.mark("ctx")
+    rules_hits = _apply_rules_batch(txs, b.rules, ctxs)
+    timer.mark("rules")
+    if verdict == DEGRADED:
+        return _score_batch_degraded(txs, ctxs, rules_hits, b, timer)
+    shared = dict(timer.stages)  # batch-wide stages; per-arm stages get their own timer
+
+    # Decide arm per tx, then score each arm once
+    arms = ["prod"] * len(txs)
+    if TRAFFIC_MODE == "ab" and b.cand is not None:
+        arms = [assign_arm(tx.get("device_id", ""), AB_PERCENT) for tx in txs]
+    prod_idx = [i for i, a in enumerate(arms) if a == "prod"]
+    cand_idx = [i for i, a in enumerate(arms) if a == "cand"]
+
+    results: List[Optional[ScoreOut]] = [None] * len(txs)
+    entries: List[Dict[str, Any]] = []
+    ts = datetime.now().isoformat(timespec="seconds")
+
+    if cand_idx:
+        cand = b.cand
+        arm_timer = StageTimer()
+        cand_txs = [txs[i] for i in cand_idx]
+        if cand.fast is None:
+            df_cand = _txs_to_frame(cand_txs, cand.features)
+            arm_timer.mark("frame")
+            probas_cand = _predict_proba_batch(cand.model, df_cand)
+        else:
+            probas_cand = _score_txs(cand, cand_txs)
+        arm_timer.mark("predict")
+        tops_cand = [None] * len(cand_txs)
+        if explain:
+            tops_cand = _explain(cand, cand_txs)
+            arm_timer.mark("explain")
+        latency_ms = int(arm_timer.total() * 1000)
+        stages_ms = {**arm_timer.ms(), **{k: round(v * 1000.0, 3) for k, v in shared.items()}}
+        for i, p, top in zip(cand_idx, probas_cand, tops_cand):
+            decision_cand = _decide(p, cand.threshold, rules_hits[i])
+            entries.append({
+                "ts": ts, "arm": "cand", "tx": txs[i], "ctx": ctxs[i], "proba": p, "decision": decision_cand,
+                "rules_hit": rules_hits[i], "latency_ms": latency_ms, "stages_ms": stages_ms, "model_ts": cand.model_ts,
+            })
+            results[i] = ScoreOut(
+                decision=decision_cand, proba=p, rules_hit=rules_hits[i], top_features=top,
+                model_timestamp=cand.model_ts, latency_ms=latency_ms,
+            )
+            _METRICS.count_request("score_batch", "cand", decision_cand)
+        _METRICS.observe("score_batch", "cand", arm_timer.stages)
+
+    if prod_idx:
+        prod = b.prod
+        arm_timer = StageTimer()
+        prod_txs = [txs[i] for i in prod_idx]
+        if prod.fast is None:
+            df_prod = _txs_to_frame(prod_txs, prod.features)
+            arm_timer.mark("frame")
+            probas_prod = _predict_proba_batch(prod.model, df_prod)
+        else:
+            probas_prod = _score_txs(prod, prod_txs)
+        arm_timer.mark("predict")
+        tops = [None] * len(prod_txs)
+        if explain:
+            tops = _explain(prod, prod_txs)
+            arm_timer.mark("explain")
+        latency_ms = int(arm_timer.total() * 1000)
+        stages_ms = {**arm_timer.ms(), **{k: round(v * 1000.0, 3) for k, v in shared.items()}}
+        decisions = [_decide(p, prod.threshold, rules_hits[i]) for i, p in zip(prod_idx, probas_prod)]
+        for j, i in enumerate(prod_idx):
+            entries.append({
+                "ts": ts, "arm": "prod", "tx": txs[i], "ctx": ctxs[i], "proba": probas_prod[j], "decision": decisions[j],
+                "rules_hit": rules_hits[i], "latency_ms": latency_ms, "stages_ms": stages_ms, "model_ts": prod.model_ts,
+            })
+            results[i] = ScoreOut(
+                decision=decisions[j], proba=probas_prod[j], rules_hit=rules_hits[i], top_features=tops[j],
+                model_timestamp=prod.model_ts, latency_ms=latency_ms,
+            )
+            _METRICS.count_request("score_batch", "prod", decisions[j])
+        _METRICS.observe("score_batch", "prod", arm_timer.stages)
+
+        if TRAFFIC_MODE == "shadow" and b.cand is not None:
+            t_submit = time.perf_counter()
+            _submit_shadow([
+                {
+                    "ts": ts,
+                    "payload": txs[i],
+                    "prod": {"proba": probas_prod[j], "decision": decisions[j], "rules_hit": rules_hits[i]},
+                    "latency_prod_ms": latency_ms,
+                    "prod_ts": prod.model_ts,
+                    "cand": b.cand,
+                    "t_submit": t_submit,
+                }
+                for j, i in enumerate(prod_idx)
+            ])
+
+    timer.skip()  # per-arm work is recorded under its own arm
+    _write_logs(entries)
+    timer.mark("log")
+    _METRICS.observe("score_batch", "all", {**timer.stages, "total": timer.total()})
+    return BatchScoreOut(
+        count=len(results),
+        results=results,
+        latency_ms=int(timer.total() * 1000),
+    )
+_STARTUP["import_ms"] = round((time.perf_counter() - _T_IMPORT) * 1000, 1)
 # ===== END: app.py (Stage 6 - PROD pointer + Shadow + A/B) =====
@@ -0,0 +1,278 @@
+# ===== BEGIN: context_store.py =====
+"""
+In-process online context for rule `ctx.*` fields.
+
+Per account (falls back to device_id when the caller sends no account_id) we keep:
+  - a ring buffer of recent (timestamp, amount) pairs   -> ctx.velocity_spike
+  - the set of devices seen                             -> ctx.device_is_new
+  - per-country counts                                  -> ctx.home_country (modal country)
+
+Memory is bounded: accounts live in an LRU (OrderedDict) capped at max_accounts,
+idle accounts expire after ttl_sec, and every per-account container is capped.
+Each observe() is constant work (bounded buffers, O(1) LRU touch/evict).
+
+ctx fields are computed from history *before* the current tx is recorded, and
+are None while an account has no history, so cold accounts never trip rules.
+
+Under the pre-fork launcher, connections reach workers with no account affinity.
+Per-worker stores would each see about 1/N of an account's burst, so one store
+lives in a ctx-owner process (SharedContextOwner), and every worker calls it
+through a manager proxy (connect_shared). The owner restores the snapshot at
+start, snapshots on its interval, and writes the final snapshot at shutdown.
+"""
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from collections import OrderedDict, deque
+from multiprocessing.managers import BaseManager
+from pathlib import Path
+from typing import Any, Deque, Dict, Optional, Tuple
+
+class _AccountState:
+    __slots__ = ("events", "devices", "countries", "last_seen")
+
+    def __init__(self, max_events: int):
+        self.events: Deque[Tuple[float, float]] = deque(maxlen=max_events)
+        self.devices: "OrderedDict[str, None]" = OrderedDict()
+        self.countries: Dict[str, int] = {}
+        self.last_seen: float = 0.0
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "events": [list(e) for e in self.events],
+            "devices": list(self.devices),
+            "countries": self.countries,
+            "last_seen": self.last_seen,
+        }
+
+    @classmethod
+    def from_json(cls, obj: Dict[str, Any], max_events: int) -> "_AccountState":
+        st = cls(max_events)
+        st.events.extend((float(t), float(a)) for t, a in obj.get("events", []))
+        st.devices.update((str(d), None) for d in obj.get("devices", []))
+        st.countries = {str(k): int(v) for k, v in (obj.get("countries") or {}).items()}
+        st.last_seen = float(obj.get("last_seen", 0.0))
+        return st
+
+class ContextStore:
+    def __init__(
+        self,
+        max_accounts: int = 100_000,
+        ttl_sec: float = 30 * 86400,
+        max_events: int = 64,
+        max_devices: int = 16,
+        window_minutes: float = 30,
+        baseline_days: float = 14,
+        multiplier: float = 3.5,
+        min_baseline_events: int = 3,
+    ):
+        self.max_accounts = max_accounts
+        self.ttl_sec = ttl_sec
+        self.max_events = max_events
+        self.max_devices = max_devices
+        self.window_sec = window_minutes * 60
+        self.baseline_sec = baseline_days * 86400
+        self.multiplier = multiplier
+        self.min_baseline_events = min_baseline_events
+        self._accounts: "OrderedDict[str, _AccountState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted = 0
+        self.expired = 0
+        self.last_snapshot_ts: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._accounts)
+
+    # ---------- ctx derivation ----------
+    def _velocity_spike(self, st: _AccountState, now: float, amount: float) -> Optional[bool]:
+        window_sum = amount
+        base_sum, base_n = 0.0, 0
+        for ts, amt in st.events:
+            age = now - ts
+            if age <= self.window_sec:
+                window_sum += amt
+            elif age <= self.baseline_sec:
+                base_sum += amt
+                base_n += 1
+        if base_n < self.min_baseline_events:
+            return None
+        return window_sum > self.multiplier * (base_sum / base_n)
+
+    @staticmethod
+    def _home_country(st: _AccountState) -> Optional[str]:
+        if not st.countries:
+            return None
+        return max(st.countries.items(), key=lambda kv: kv[1])[0]
+
+    # ---------- main entry ----------
+    def observe(self, tx: Dict[str, Any], now: Optional[float] = None) -> Dict[str, Any]:
+        """Return ctx for this tx (from prior history), then record the tx."""
+        now = time.time() if now is None else now
+        account = tx.get("account_id")
+        device = str(tx.get("device_id") or "unknown")
+        key = str(account) if account else f"device:{device}"
+        amount = float(tx.get("amount") or 0.0)
+        country = tx.get("country")
+
+        with self._lock:
+            st = self._accounts.get(key)
+            if st is not None and now - st.last_seen > self.ttl_sec:
+                del self._accounts[key]
+                self.expired += 1
+                st = None
+
+            if st is None or not st.events:
+                ctx: Dict[str, Any] = {"velocity_spike": None, "device_is_new": None, "home_country": None}
+            else:
+                ctx = {
+                    "velocity_spike": self._velocity_spike(st, now, amount),
+                    # keyed by device itself -> "new device" is meaningless
+                    "device_is_new": (device not in st.devices) if account else None,
+                    "home_country": self._home_country(st),
+                }
+
+            if st is None:
+                st = _AccountState(self.max_events)
+                self._accounts[key] = st
+            else:
+                self._accounts.move_to_end(key)
+            st.events.append((now, amount))
+            st.devices[device] = None
+            st.devices.move_to_end(device)
+            if len(st.devices) > self.max_devices:
+                st.devices.popitem(last=False)
+            if country:
+                st.countries[country] = st.countries.get(country, 0) + 1
+            st.last_seen = now
+            self._evict(now)
+        return ctx
+
+    def _evict(self, now: float) -> None:
+        # LRU order == last_seen order, so expired accounts sit at the front
+        while self._accounts:
+            oldest = next(iter(self._accounts.values()))
+            if now - oldest.last_seen > self.ttl_sec:
+                self.expired += 1
+            elif len(self._accounts) > self.max_accounts:
+                self.evicted += 1
+            else:
+                break
+            self._accounts.popitem(last=False)
+
+    # ---------- snapshot / restore ----------
+    def snapshot(self, path: Path) -> int:
+        """Atomically write all account state to `path` (JSON). Returns accounts written."""
+        with self._lock:
+            data = {k: st.to_json() for k, st in self._accounts.items()}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps({"saved_at": time.time(), "accounts": data}), encoding="utf-8")
+        os.replace(tmp, path)
+        self.last_snapshot_ts = time.strftime("%Y-%m-%dT%H:%M:%S")
+        return len(data)
+
+    def restore(self, path: Path, now: Optional[float] = None) -> int:
+        """Load a snapshot written by snapshot(); expired accounts are skipped. Returns accounts loaded."""
+        if not path.exists():
+            return 0
+        now = time.time() if now is None else now
+        try:
+            obj = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            return 0
+        items = [
+            (str(k), _AccountState.from_json(v, self.max_events))
+            for k, v in (obj.get("accounts") or {}).items()
+        ]
+        items = [(k, st) for k, st in items if now - st.last_seen <= self.ttl_sec]
+        items.sort(key=lambda kv: kv[1].last_seen)
+        with self._lock:
+            self._accounts = OrderedDict(items[-self.max_accounts:])
+        return len(self._accounts)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "accounts": len(self._accounts),
+            "max_accounts": self.max_accounts,
+            "evicted": self.evicted,
+            "expired": self.expired,
+            "last_snapshot": self.last_snapshot_ts,
+        }
+
+class SnapshotThread(threading.Thread):
+    """Daemon that snapshots a ContextStore every `interval_sec` until stop()."""
+
+    def __init__(self, store: ContextStore, path: Path, interval_sec: float):
+        super().__init__(name="fraud-ctx-snapshot", daemon=True)
+        self.store, self.path, self.interval_sec = store, path, interval_sec
+        self._stop_evt = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_evt.wait(self.interval_sec):
+            try:
+                self.store.snapshot(self.path)
+            except Exception:
+                pass
+
+    def stop(self) -> None:
+        self._stop_evt.set()
+
+# ---------- shared store (pre-fork workers) ----------
+class _CtxManager(BaseManager):
+    pass
+
+_OWNED: Optional[ContextStore] = None  # set in the owner process only
+
+def _owned_store() -> ContextStore:
+    return _OWNED
+
+def _owner_init(store_kwargs: Dict[str, Any], path: Path, interval_sec: float) -> None:
+    global _OWNED
+    # Ctrl-C / a group SIGTERM reach us too; the launcher stops us after its workers
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, signal.SIG_IGN)
+    _OWNED = ContextStore(**store_kwargs)
+    _OWNED.restore(path)
+    if interval_sec > 0:
+        SnapshotThread(_OWNED, path, interval_sec).start()
+    threading.Thread(target=_exit_with_launcher, args=(_OWNED, path, os.getppid()), daemon=True).start()
+
+def _exit_with_launcher(store: ContextStore, path: Path, launcher_pid: int) -> None:
+    while os.getppid() == launcher_pid:
+        time.sleep(1.0)
+    try:  # launcher killed without close(): keep what we have, then go
+        store.snapshot(path)
+    finally:
+        os._exit(0)
+
+_CtxManager.register("store", callable=_owned_store, exposed=("observe", "snapshot", "stats"))
+
+class SharedContextOwner:
+    """One ContextStore in its own process, for all workers of a pre-fork launch."""
+
+    def __init__(self, store_kwargs: Dict[str, Any], snapshot_path: Path, snapshot_sec: float):
+        self.snapshot_path = Path(snapshot_path)
+        self.authkey = os.urandom(16)
+        self._mgr = _CtxManager(authkey=self.authkey, ctx=multiprocessing.get_context("spawn"))
+        self._mgr.start(_owner_init, (store_kwargs, self.snapshot_path, snapshot_sec))
+        self.address = self._mgr.address
+
+    def close(self) -> None:
+        """Final snapshot, then stop the owner process. Call after the workers are gone."""
+        try:
+            self._mgr.store().snapshot(self.snapshot_path)
+        except Exception:
+            pass
+        self._mgr.shutdown()
+
+def connect_shared(address: Any, authkey: bytes):
+    """Proxy with observe/snapshot/stats; each calling thread gets its own connection."""
+    mgr = _CtxManager(address=address, authkey=authkey)
+    mgr.connect()
+    return mgr.store()
+# ===== END: context_store.py =====
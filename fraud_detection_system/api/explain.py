@@ -0,0 +1,105 @@
+# ===== BEGIN: explain.py =====
+"""
+On-demand per-feature explanations for the fraud API.
+
+Nothing here runs unless a caller asks for an explanation (`?explain=true` or
+POST /explain). Backends, in order of preference:
+
+  pred_contribs - plain XGBoost booster (the models that get a RowScorer):
+                  Booster.predict(..., pred_contribs=True) gives exact
+                  TreeSHAP values natively, no shap import needed
+  shap          - anything else: `shap` is imported and TreeExplainer is
+                  built on the first request, then reused
+
+A backend that cannot be built (shap missing, unsupported model) is remembered
+as unavailable, so later requests do not retry it; they get None.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from fraud_detection_system.api.fastpath import RowScorer
+
+CONTRIBS = "pred_contribs"
+SHAP = "shap"
+
+_Pairs = List[Dict[str, Any]]
+
+def top_k(features: Sequence[str], row: Sequence[float], k: int) -> _Pairs:
+    pairs = list(zip(features, row))
+    pairs.sort(key=lambda t: abs(float(t[1])), reverse=True)
+    return [{"feature": n, "shap_value": float(v)} for n, v in pairs[:k]]
+
+class LazyExplainer:
+    def __init__(self, model: Any, features: Sequence[str], fast: Optional[RowScorer] = None):
+        self.model = model
+        self.features = list(features)
+        self.fast = fast
+        self.backend = CONTRIBS if fast is not None else SHAP
+        self._explainer: Any = None
+        self._unavailable = False
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.fast is not None or self._explainer is not None
+
+    def _tree_explainer(self) -> Any:
+        if self._explainer is None and not self._unavailable:
+            with self._lock:
+                if self._explainer is None and not self._unavailable:
+                    try:
+                        import shap  # type: ignore  # deferred: seconds of import time
+                        self._explainer = shap.TreeExplainer(self.model)
+                    except Exception:
+                        self._unavailable = True
+        return self._explainer
+
+    def _contribs(self, txs: List[Dict[str, Any]]) -> np.ndarray:
+        import xgboost as xgb  # already loaded by the unpickled model
+
+        fast = self.fast
+        X = np.empty((len(txs), len(fast.features)), dtype=np.float32)
+        for j, f in enumerate(fast.features):
+            X[:, j] = [tx.get(f, 0) for tx in txs]
+        dm = xgb.DMatrix(X, feature_names=fast.features)
+        out = fast.booster.predict(dm, pred_contribs=True, iteration_range=fast.iteration_range)
+        return out[:, :-1]  # last column is the bias term
+
+    def explain(self, txs: List[Dict[str, Any]], k: int = 5) -> List[Optional[_Pairs]]:
+        """Top-k attributions per tx (None per row when no backend is available)."""
+        if not txs:
+            return []
+        self.calls += 1
+        try:
+            if self.fast is not None:
+                vals = self._contribs(txs)
+                return [top_k(self.fast.features, vals[i], k) for i in range(len(txs))]
+            explainer = self._tree_explainer()
+            if explainer is None:
+                return [None] * len(txs)
+            import pandas as pd
+
+            df = pd.DataFrame({f: [tx.get(f, 0) for tx in txs] for f in self.features}, columns=self.features)
+            vals = explainer.shap_values(df)
+            return [top_k(self.features, vals[i], k) for i in range(len(txs))]
+        except Exception:
+            return [None] * len(txs)
+
+    def warm_up(self, txs: List[Dict[str, Any]]) -> None:
+        """Run explain() without counting it as a request (startup / reload warm-up)."""
+        self.explain(txs)
+        self.calls -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "ready": self.ready,
+            "available": not self._unavailable,
+            "calls": self.calls,
+        }
+# ===== END: explain.py =====
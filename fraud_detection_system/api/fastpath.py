@@ -0,0 +1,69 @@
+# ===== BEGIN: fastpath.py =====
+"""
+Zero-DataFrame inference for plain XGBoost classifiers.
+
+For a bare XGBClassifier (binary:logistic, numeric features only) the tx dict
+is copied straight into a float32 row laid out in the booster's own feature
+order (index map built once at load time) and scored with
+Booster.inplace_predict. Pipelines such as the CAND_* ColumnTransformer
+bundles, or any model this cannot prove equivalent for, get no RowScorer and
+stay on the DataFrame path.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+FAST_PATH = "fast_inplace"
+FRAME_PATH = "dataframe"
+
+class RowScorer:
+    def __init__(self, booster: Any, features: Sequence[str], iteration_range: Tuple[int, int] = (0, 0)):
+        self.booster = booster
+        self.features = list(features)
+        self.iteration_range = iteration_range
+        self._local = threading.local()  # one preallocated row per thread
+
+    def _row(self) -> np.ndarray:
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = self._local.row = np.empty((1, len(self.features)), dtype=np.float32)
+        return row
+
+    def predict(self, tx: Dict[str, Any]) -> float:
+        row = self._row()
+        for i, f in enumerate(self.features):
+            row[0, i] = tx.get(f, 0)
+        return float(self.booster.inplace_predict(row, iteration_range=self.iteration_range)[0])
+
+    def predict_many(self, txs: List[Dict[str, Any]]) -> List[float]:
+        if not txs:
+            return []
+        X = np.empty((len(txs), len(self.features)), dtype=np.float32)
+        for j, f in enumerate(self.features):
+            X[:, j] = [tx.get(f, 0) for tx in txs]
+        return [float(p) for p in self.booster.inplace_predict(X, iteration_range=self.iteration_range)]
+
+def build_row_scorer(model: Any, features: Sequence[str], numeric_features: Sequence[str]) -> Optional[RowScorer]:
+    """RowScorer for `model` if the fast path is exactly equivalent to predict_proba, else None."""
+    if not hasattr(model, "get_booster") or hasattr(model, "steps"):
+        return None
+    if getattr(model, "objective", None) != "binary:logistic" or getattr(model, "n_classes_", 2) != 2:
+        return None
+    try:
+        booster = model.get_booster()
+    except Exception:
+        return None
+    order = list(booster.feature_names or features)
+    # every model input must come from the declared feature list and be numeric
+    if set(order) - set(features) or set(order) - set(numeric_features):
+        return None
+    try:
+        best = int(model.best_iteration)
+        iteration_range = (0, best + 1)
+    except (AttributeError, TypeError, ValueError):
+        iteration_range = (0, 0)
+    return RowScorer(booster, order, iteration_range)
+# ===== END: fastpath.py =====
@@ -0,0 +1,94 @@
+# ===== BEGIN: idempotency.py =====
+"""
+Idempotent /score: a retried transaction gets the decision it was first given.
+
+The key is the client-supplied `transaction_id` when present, otherwise a
+SHA-1 of the canonical (sorted-key) JSON of the validated TransactionIn, so two
+payloads that differ only in key order or defaulted fields share a key. Entries
+live in a bounded LRU (oldest evicted first) and expire `ttl_sec` after they
+were stored; a hit does not extend the TTL.
+
+Without a transaction_id a retry cannot be told apart from a new charge with
+the same fields (a card-testing burst of identical small amounts), so /score
+still records hash-keyed hits in the ctx store and only replays them while the
+rules give the same hits; a client transaction_id is trusted as a true retry.
+
+Two retries that arrive while the first call is still in flight both miss; the
+cache removes duplicates of completed calls, which is what gateway timeouts
+produce.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+def idempotency_key(tx: Dict[str, Any]) -> str:
+    tx_id = tx.get("transaction_id")
+    if tx_id:
+        return f"id:{tx_id}"
+    canonical = json.dumps(tx, sort_keys=True, separators=(",", ":"), default=str)
+    return "sha1:" + hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+def is_client_key(key: str) -> bool:
+    """True for keys from a client transaction_id (not a payload hash)."""
+    return key.startswith("id:")
+
+class IdempotencyCache:
+    """Thread-safe LRU with per-entry TTL; values are stored as given (immutable responses)."""
+
+    def __init__(self, max_items: int, ttl_sec: float):
+        self.max_items = max_items
+        self.ttl_sec = ttl_sec
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and item[0] <= now:
+                del self._items[key]
+                self.expired += 1
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl_sec, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+                self.evicted += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._items)
+        lookups = self.hits + self.misses
+        return {
+            "size": size,
+            "max_items": self.max_items,
+            "ttl_sec": self.ttl_sec,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
+# ===== END: idempotency.py =====
@@ -0,0 +1,205 @@
+# ===== BEGIN: log_writer.py =====
+"""
+Background JSONL writer for the fraud API request logs.
+
+Request threads only enqueue (entry, file suffix, local day). One daemon thread
+drains the bounded queue in batches, serializes, and appends to
+LOGS_DIR/YYYYMMDD<suffix>.jsonl through file handles it keeps open. Handles for
+a suffix are swapped when the local day changes (midnight rotation), and
+stop() drains everything and closes the files.
+
+With `shared=True` (several worker processes appending to the same daily
+files) each batch is written unbuffered to an O_APPEND handle as one run of
+whole lines, under an exclusive flock, so lines from different processes never
+interleave.
+
+Full-queue policy:
+  block  - request thread waits for space (no loss, latency absorbs the backlog)
+  drop   - entry is discarded and counted
+  sample - 1 in `sample_n` entries waits for space, the rest are dropped
+"""
+from __future__ import annotations
+
+import json
+import queue
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, IO, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no fork-based multi-worker mode there either
+    fcntl = None  # type: ignore[assignment]
+
+POLICIES = ("block", "drop", "sample")
+
+_Item = Tuple[Dict[str, Any], str, str]  # (entry, suffix, YYYYMMDD)
+_STOP = object()
+
+def append_locked(fh: IO[bytes], data: bytes) -> None:
+    """Append `data` (whole lines) to an unbuffered O_APPEND handle under an exclusive flock."""
+    if fcntl is not None:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[fh.write(view):]  # raw handles may write partially
+    finally:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+class AsyncJsonlWriter:
+    def __init__(
+        self,
+        logs_dir: Path,
+        max_queue: int = 10_000,
+        policy: str = "block",
+        sample_n: int = 10,
+        max_batch: int = 512,
+        flush_interval_sec: float = 0.2,
+        shared: bool = False,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}, got {policy!r}")
+        self.logs_dir = logs_dir
+        self.policy = policy
+        self.sample_n = max(1, sample_n)
+        self.max_batch = max_batch
+        self.flush_interval_sec = flush_interval_sec
+        self.shared = shared
+        self._q: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._handles: Dict[str, Tuple[str, IO[Any]]] = {}  # suffix -> (fname, handle)
+        self._thread: Optional[threading.Thread] = None
+        self._counter_lock = threading.Lock()
+        self._overflow_seen = 0
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+
+    # ---------- producer side ----------
+    def write(self, entry: Dict[str, Any], suffix: str = "", day: Optional[str] = None) -> bool:
+        """Enqueue one entry. Returns False when it was dropped by the full-queue policy."""
+        item: _Item = (entry, suffix, day or datetime.now().strftime("%Y%m%d"))
+        try:
+            self._q.put_nowait(item)
+        except queue.Full:
+            if not self._admit_overflow():
+                with self._counter_lock:
+                    self.dropped += 1
+                return False
+            self._q.put(item)
+        with self._counter_lock:
+            self.enqueued += 1
+        return True
+
+    def _admit_overflow(self) -> bool:
+        if self.policy == "block":
+            return True
+        if self.policy == "drop":
+            return False
+        with self._counter_lock:
+            self._overflow_seen += 1
+            return self._overflow_seen % self.sample_n == 0
+
+    # ---------- consumer side ----------
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self.logs_dir.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="fraud-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Drain the queue, flush and close files."""
+        if self._thread is None:
+            return
+        self._q.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            try:
+                first = self._q.get(timeout=self.flush_interval_sec)
+            except queue.Empty:
+                continue
+            batch: List[_Item] = []
+            for item in self._drain(first):
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+            if batch:
+                self._write_batch(batch)
+        self._close_all()
+
+    def _drain(self, first: Any) -> List[Any]:
+        items = [first]
+        while len(items) < self.max_batch:
+            try:
+                items.append(self._q.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def _handle(self, suffix: str, day: str) -> IO[Any]:
+        fname = f"{day}{suffix}.jsonl"
+        cur = self._handles.get(suffix)
+        if cur is not None and cur[0] == fname:
+            return cur[1]
+        if cur is not None:
+            cur[1].close()  # day rolled over for this suffix
+        path = self.logs_dir / fname
+        fh = path.open("ab", buffering=0) if self.shared else path.open("a", encoding="utf-8")
+        self._handles[suffix] = (fname, fh)
+        return fh
+
+    def _write_batch(self, batch: List[_Item]) -> None:
+        groups: Dict[Tuple[str, str], List[str]] = {}
+        for entry, suffix, day in batch:
+            try:
+                line = json.dumps(entry, ensure_ascii=False) + "\n"
+            except Exception:
+                self.errors += 1
+                continue
+            groups.setdefault((suffix, day), []).append(line)
+        for (suffix, day), lines in sorted(groups.items(), key=lambda kv: kv[0][1]):
+            try:
+                fh = self._handle(suffix, day)
+                if self.shared:
+                    append_locked(fh, "".join(lines).encode("utf-8"))
+                else:
+                    fh.write("".join(lines))
+                    fh.flush()
+                self.written += len(lines)
+            except Exception:
+                self.errors += len(lines)
+
+    def _close_all(self) -> None:
+        for _, fh in self._handles.values():
+            try:
+                fh.close()
+            except Exception:
+                pass
+        self._handles.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "policy": self.policy,
+            "shared": self.shared,
+            "queue_depth": self._q.qsize(),
+            "queue_max": self._q.maxsize,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
+# ===== END: log_writer.py =====
@@ -0,0 +1,124 @@
+# ===== BEGIN: metrics.py =====
+"""
+Per-stage request latency for the fraud API.
+
+A StageTimer is created per request and `mark(stage)` records the time since
+the previous mark (perf_counter, so sub-millisecond). The elapsed times go into
+the JSONL log entry (`stages_ms`) and into a StageMetrics registry: one
+fixed-bucket histogram per (endpoint, arm, stage), using a 1-2-5 log series
+from 10 µs to 10 s. Those histograms are rendered in the Prometheus text format
+by /metrics.
+
+The "parse" stage covers the time from the ASGI call until the handler starts:
+body read, JSON decode, pydantic validation and thread-pool dispatch.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# seconds; 1-2-5 series, 10us .. 10s
+BUCKETS: Tuple[float, ...] = tuple(m * 10.0 ** e for e in range(-5, 2) for m in (1, 2, 5) if m * 10.0 ** e <= 10.0)
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)  # last slot = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+class StageTimer:
+    """Splits one request into named stages; `stages` holds seconds per stage."""
+    __slots__ = ("start", "_last", "stages")
+
+    def __init__(self, start: Optional[float] = None):
+        now = time.perf_counter()
+        self.start = now if start is None else start
+        self._last = self.start
+        self.stages: Dict[str, float] = {}
+
+    def mark(self, stage: str) -> float:
+        now = time.perf_counter()
+        dt = now - self._last
+        self.stages[stage] = self.stages.get(stage, 0.0) + dt
+        self._last = now
+        return dt
+
+    def skip(self) -> None:
+        """Drop the time since the last mark (e.g. work that belongs to no stage)."""
+        self._last = time.perf_counter()
+
+    def total(self) -> float:
+        return time.perf_counter() - self.start
+
+    def ms(self) -> Dict[str, float]:
+        return {k: round(v * 1000.0, 3) for k, v in self.stages.items()}
+
+class StageMetrics:
+    """Thread-safe (endpoint, arm, stage) -> Histogram registry plus request counters."""
+
+    def __init__(self, namespace: str = "fraud"):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._hists: Dict[Tuple[str, str, str], Histogram] = {}
+        self._requests: Dict[Tuple[str, str, str], int] = {}
+
+    def observe(self, endpoint: str, arm: str, stages: Dict[str, float]) -> None:
+        with self._lock:
+            for stage, seconds in stages.items():
+                key = (endpoint, arm, stage)
+                h = self._hists.get(key)
+                if h is None:
+                    h = self._hists[key] = Histogram()
+                h.observe(seconds)
+
+    def count_request(self, endpoint: str, arm: str, decision: str, n: int = 1) -> None:
+        key = (endpoint, arm, decision)
+        with self._lock:
+            self._requests[key] = self._requests.get(key, 0) + n
+
+    def render_prometheus(self) -> str:
+        ns = self.namespace
+        with self._lock:
+            hists = sorted((k, list(h.counts), h.sum, h.count) for k, h in self._hists.items())
+            requests = sorted(self._requests.items())
+        lines: List[str] = [
+            f"# HELP {ns}_stage_latency_seconds Time spent per request stage.",
+            f"# TYPE {ns}_stage_latency_seconds histogram",
+        ]
+        for (endpoint, arm, stage), counts, total, count in hists:
+            labels = f'endpoint="{endpoint}",arm="{arm}",stage="{stage}"'
+            cum = 0
+            for bound, c in zip(BUCKETS, counts):
+                cum += c
+                lines.append(f'{ns}_stage_latency_seconds_bucket{{{labels},le="{bound:g}"}} {cum}')
+            lines.append(f'{ns}_stage_latency_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"{ns}_stage_latency_seconds_sum{{{labels}}} {total:.9f}")
+            lines.append(f"{ns}_stage_latency_seconds_count{{{labels}}} {count}")
+        lines += [
+            f"# HELP {ns}_requests_total Scored transactions by arm and decision.",
+            f"# TYPE {ns}_requests_total counter",
+        ]
+        for (endpoint, arm, decision), n in requests:
+            lines.append(f'{ns}_requests_total{{endpoint="{endpoint}",arm="{arm}",decision="{decision}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+class RequestStartMiddleware:
+    """Pure ASGI middleware: stamps perf_counter() into request.state.t_start."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] == "http":
+            scope.setdefault("state", {})["t_start"] = time.perf_counter()
+        await self.app(scope, receive, send)
+# ===== END: metrics.py =====
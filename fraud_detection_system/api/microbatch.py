@@ -0,0 +1,141 @@
+# ===== BEGIN: microbatch.py =====
+"""
+Dynamic micro-batching for single-transaction scoring.
+
+/score runs on FastAPI's thread pool, so under load many threads would each
+call predict_proba with one row. With a MicroBatcher, each thread enqueues its
+tx and waits on a Future; one collector thread takes the first waiting tx,
+keeps collecting until `window_ms` has passed or `max_batch` txs are queued,
+runs `predict_many` once on the stacked rows and resolves every Future.
+
+Batch sizes are counted in power-of-two buckets for tuning window/max_batch.
+
+After stop(), predict() raises BatcherStopped at once. Txs still queued when the
+collector exits get BatcherStopped too, so no caller waits out its timeout.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_STOP = object()
+
+class BatcherStopped(RuntimeError):
+    pass
+
+class MicroBatcher:
+    def __init__(
+        self,
+        predict_many: Callable[[List[Dict[str, Any]]], List[float]],
+        window_ms: float = 2.0,
+        max_batch: int = 64,
+        name: str = "prod",
+    ):
+        self.predict_many = predict_many
+        self.window_sec = max(0.0, window_ms) / 1000.0
+        self.max_batch = max(1, max_batch)
+        self.name = name
+        self._q: "queue.Queue[Any]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()  # orders predict()'s put against stop()'s sentinel
+        self._buckets = [2 ** i for i in range(max(1, self.max_batch - 1).bit_length() + 1)]
+        self._hist = [0] * len(self._buckets)
+        self.batches = 0
+        self.items = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"fraud-microbatch-{self.name}", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._q.put(_STOP)
+        thread.join(timeout)
+        if thread.is_alive():  # stuck in a batch: fail the queue now, let it exit when done
+            self._fail_pending()
+            self._q.put(_STOP)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def predict(self, tx: Dict[str, Any], timeout: Optional[float] = 10.0) -> float:
+        """Block until this tx's probability comes back from a shared batch."""
+        fut: "Future[float]" = Future()
+        with self._lock:
+            if self._thread is None:
+                raise BatcherStopped(f"micro-batcher {self.name!r} is not running")
+            self._q.put((tx, fut))
+        return fut.result(timeout=timeout)
+
+    def _collect(self, first: Tuple[Dict[str, Any], Future]) -> Tuple[List[Tuple[Dict[str, Any], Future]], bool]:
+        batch = [first]
+        deadline = time.perf_counter() + self.window_sec
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._q.get(timeout=remaining) if remaining > 0 else self._q.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._q.get()
+            if first is _STOP:
+                break
+            batch, stopping = self._collect(first)
+            self._observe(len(batch))
+            txs = [tx for tx, _ in batch]
+            try:
+                probas = self.predict_many(txs)
+                for (_, fut), p in zip(batch, probas):
+                    fut.set_result(p)
+            except BaseException as e:  # hand the failure to every waiting caller
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+        self._fail_pending()
+
+    def _fail_pending(self) -> None:
+        """Fail the txs queued behind the stop sentinel."""
+        while True:
+            try:
+                item = self._q.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP and not item[1].done():
+                item[1].set_exception(BatcherStopped(f"micro-batcher {self.name!r} stopped"))
+
+    def _observe(self, n: int) -> None:
+        self.batches += 1
+        self.items += n
+        for i, upper in enumerate(self._buckets):
+            if n <= upper:
+                self._hist[i] += 1
+                return
+        self._hist[-1] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "window_ms": self.window_sec * 1000.0,
+            "max_batch": self.max_batch,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch": (self.items / self.batches) if self.batches else 0.0,
+            "batch_size_hist": {f"le_{b}": c for b, c in zip(self._buckets, self._hist)},
+        }
+# ===== END: microbatch.py =====
@@ -0,0 +1,118 @@
+# ===== BEGIN: prefork.py =====
+"""
+Pre-fork production launcher for the fraud API (Linux/macOS).
+
+The parent process imports the app, builds the serving bundle (model, rules,
+explainer, warm-up) and binds the listening socket, then forks N workers that
+each run a uvicorn server on that shared socket. The unpickled model pages are
+inherited copy-on-write, so N workers cost roughly one model in memory.
+
+Per worker:
+- XGBoost `nthread` is pinned to `nthread` (default cpu_count // workers) so N
+  workers do not oversubscribe the cores. The parent scores its warm-up batch
+  single-threaded, so no OpenMP thread pool exists at fork time.
+- log lines go to the shared daily JSONL through locked appends (log_writer.py)
+- its own idempotency cache and metrics
+- ctx.* from one shared store in a ctx-owner process started before the fork
+  (context_store.SharedContextOwner), so an account's history is complete
+  whichever worker a request lands on; the owner restores and snapshots it
+
+The parent only supervises: a worker that dies is re-forked from the preloaded
+state, SIGTERM is forwarded to all workers, and the launcher exits once every
+worker is gone. /reload reaches one worker only; use FRAUD_RELOAD_WATCH_SEC so
+each worker picks up a new PROD pointer by itself.
+"""
+from __future__ import annotations
+
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict
+
+def _bind(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+def _run_worker(api, sock: socket.socket, index: int, workers: int, nthread: int, log_level: str) -> None:
+    import uvicorn
+
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, signal.SIG_DFL)  # uvicorn installs its own graceful handlers
+    api.configure_worker(index, workers, nthread)
+    server = uvicorn.Server(uvicorn.Config(api.app, log_level=log_level, lifespan="on"))
+    server.run(sockets=[sock])
+
+def serve(workers: int, host: str = "127.0.0.1", port: int = 8001, nthread: int = 0, log_level: str = "info") -> None:
+    if not hasattr(os, "fork"):
+        raise SystemExit("Multi-worker mode needs os.fork (Linux/macOS); run without --workers on Windows.")
+    workers = max(1, workers)
+    nthread = nthread or max(1, (os.cpu_count() or 1) // workers)
+    os.environ["FRAUD_XGB_NTHREAD"] = "1"  # parent warm-up stays single-threaded (read at app import)
+
+    import uvicorn  # noqa: F401  # fail here, not in every forked worker
+
+    from fraud_detection_system.api import app as api
+
+    t0 = time.perf_counter()
+    bundle = api.preload()
+    ctx_owner = api.start_shared_context(bundle.rules)
+    sock = _bind(host, port)
+    print(
+        f"[prefork] bundle {bundle.version} loaded in {time.perf_counter() - t0:.2f}s; "
+        f"{workers} worker(s) x nthread={nthread} on http://{host}:{port}",
+        flush=True,
+    )
+
+    children: Dict[int, int] = {}  # pid -> worker index
+    stopping = False
+
+    def spawn(index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(api, sock, index, workers, nthread, log_level)
+            except BaseException as e:  # never return into the parent's loop
+                print(f"[prefork] worker {index} failed: {e!r}", file=sys.stderr, flush=True)
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = index
+
+    def on_signal(signum, _frame) -> None:
+        nonlocal stopping
+        stopping = True
+        if signum == signal.SIGTERM:  # SIGINT from a terminal already reached the whole group
+            for pid in list(children):
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+    signal.signal(signal.SIGTERM, on_signal)
+    signal.signal(signal.SIGINT, on_signal)
+    for i in range(workers):
+        spawn(i)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        index = children.pop(pid, None)
+        if index is None or stopping:
+            continue
+        print(f"[prefork] worker {index} (pid {pid}) exited with status {status}; restarting", file=sys.stderr, flush=True)
+        time.sleep(1.0)
+        if not stopping:
+            spawn(index)
+    sock.close()
+    if ctx_owner is not None:
+        ctx_owner.close()  # final ctx snapshot, after every worker has stopped
+# ===== END: prefork.py =====
@@ -0,0 +1,66 @@
+# ===== BEGIN: reload_watcher.py =====
+"""
+Polling watcher that triggers a model reload when its inputs change.
+
+Every `interval_sec` the watcher stats the paths returned by `paths_fn`
+(PROD_POINTER.txt, the models dir, the candidate dir and its files, the rules
+file) and builds a signature of (path, mtime_ns, size). A change only fires
+`on_change` once the new signature has been seen on two consecutive polls, so a
+model file that is still being copied is not loaded half-written. If
+`on_change` raises, the signature is still accepted: the old bundle keeps
+serving and the next edit triggers a new attempt.
+"""
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Tuple
+
+_Sig = Tuple[Tuple[str, Optional[int], Optional[int]], ...]
+
+def path_signature(paths: Iterable[Path]) -> _Sig:
+    sig = []
+    for p in paths:
+        try:
+            st = p.stat()
+            sig.append((str(p), st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append((str(p), None, None))  # missing counts as a state too
+    return tuple(sig)
+
+class ReloadWatcher(threading.Thread):
+    """Daemon that calls on_change() when the watched files settle into a new state."""
+
+    def __init__(self, paths_fn: Callable[[], Iterable[Path]], on_change: Callable[[], object], interval_sec: float):
+        super().__init__(name="fraud-reload-watcher", daemon=True)
+        self.paths_fn, self.on_change, self.interval_sec = paths_fn, on_change, interval_sec
+        self._stop_evt = threading.Event()
+        self._current: _Sig = path_signature(self.paths_fn())
+        self._pending: Optional[_Sig] = None
+        self.triggered = 0
+        self.errors = 0
+
+    def poll(self) -> bool:
+        """One check; returns True when on_change() was called."""
+        sig = path_signature(self.paths_fn())
+        if sig == self._current:
+            self._pending = None
+            return False
+        if sig != self._pending:
+            self._pending = sig  # changed since last poll -> wait until it settles
+            return False
+        self._current, self._pending = sig, None
+        self.triggered += 1
+        try:
+            self.on_change()
+        except Exception:
+            self.errors += 1
+        return True
+
+    def run(self) -> None:
+        while not self._stop_evt.wait(self.interval_sec):
+            self.poll()
+
+    def stop(self) -> None:
+        self._stop_evt.set()
+# ===== END: reload_watcher.py =====
@@ -1,5 +1,10 @@
 # ===== BEGIN: run_api.py =====
+"""
+Dev:         python run_api.py                    (single process, auto-reload)
+Production:  python run_api.py --workers 4        (preload + fork, see prefork.py)
+"""
 from pathlib import Path
+import argparse
 import sys
 
 # Ensure project root is on sys.path (Windows-safe for import string)
@@ -8,14 +13,27 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 if __name__ == "__main__":
-    import uvicorn
-    # Use import STRING so --reload works
-    uvicorn.run(
-        "fraud_detection_system.api.app:app",
-        host="127.0.0.1",
-        port=8001,
-        reload=True,
-        reload_dirs=[str(ROOT / "fraud_detection_system" / "api")],
-        log_level="info",
-    )
+    ap = argparse.ArgumentParser(description="Run the fraud scoring API.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8001)
+    ap.add_argument("--workers", type=int, default=0, help="pre-fork N workers sharing one preloaded bundle (0 = dev mode)")
+    ap.add_argument("--nthread", type=int, default=0, help="XGBoost threads per worker (default: cpu_count // workers)")
+    ap.add_argument("--log-level", default="info")
+    args = ap.parse_args()
+
+    if args.workers > 0:
+        from fraud_detection_system.api.prefork import serve
+
+        serve(args.workers, host=args.host, port=args.port, nthread=args.nthread, log_level=args.log_level)
+    else:
+        import uvicorn
+        # Use import STRING so --reload works
+        uvicorn.run(
+            "fraud_detection_system.api.app:app",
+            host=args.host,
+            port=args.port,
+            reload=True,
+            reload_dirs=[str(ROOT / "fraud_detection_system" / "api")],
+            log_level=args.log_level,
+        )
 # ===== END: run_api.py =====
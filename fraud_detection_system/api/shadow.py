@@ -0,0 +1,110 @@
+# ===== BEGIN: shadow.py =====
+"""
+Off-request-path shadow scoring.
+
+The request thread hands a job (tx + PROD outcome) to submit(), which never
+blocks: when the bounded queue is full the job is shed and counted, so PROD
+latency does not depend on the candidate. Worker threads pull jobs, coalesce
+whatever else is already queued (up to max_batch) and pass the group to
+`handler`, which scores the candidate once for the group and writes the shadow
+log lines.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+_STOP = object()
+
+class ShadowWorkerPool:
+    def __init__(
+        self,
+        handler: Callable[[List[Dict[str, Any]]], None],
+        workers: int = 1,
+        max_queue: int = 1000,
+        max_batch: int = 256,
+    ):
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.max_batch = max(1, max_batch)
+        self._q: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.scored = 0
+        self.shed = 0
+        self.errors = 0
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, name=f"fraud-shadow-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Finish queued jobs, then stop the workers."""
+        for _ in self._threads:
+            self._q.put(_STOP)
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._threads)
+
+    def submit(self, jobs: List[Dict[str, Any]]) -> int:
+        """Queue jobs without blocking. Returns how many were accepted (the rest are shed)."""
+        accepted = 0
+        for job in jobs:
+            try:
+                self._q.put_nowait(job)
+                accepted += 1
+            except queue.Full:
+                break
+        with self._lock:
+            self.submitted += accepted
+            self.shed += len(jobs) - accepted
+        return accepted
+
+    def _run(self) -> None:
+        while True:
+            first = self._q.get()
+            if first is _STOP:
+                return
+            group = [first]
+            stop_after = False
+            while len(group) < self.max_batch:
+                try:
+                    item = self._q.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop_after = True
+                    break
+                group.append(item)
+            try:
+                self.handler(group)
+                with self._lock:
+                    self.scored += len(group)
+            except Exception:
+                with self._lock:
+                    self.errors += len(group)
+            if stop_after:
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "queue_depth": self._q.qsize(),
+            "queue_max": self._q.maxsize,
+            "submitted": self.submitted,
+            "scored": self.scored,
+            "shed": self.shed,
+            "errors": self.errors,
+        }
+# ===== END: shadow.py =====
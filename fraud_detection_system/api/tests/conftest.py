@@ -0,0 +1,11 @@
+# ===== BEGIN: conftest.py =====
+import pytest
+
+import fraud_detection_system.api.app as api
+
+@pytest.fixture(autouse=True)
+def _isolated_state(tmp_path, monkeypatch):
+    """Request logs and the ctx snapshot go to tmp_path, never to api/logs or api/state."""
+    monkeypatch.setattr(api, "LOGS_DIR", tmp_path / "logs")
+    monkeypatch.setattr(api, "CTX_SNAPSHOT_PATH", tmp_path / "state" / "ctx_snapshot.json")
+# ===== END: conftest.py =====
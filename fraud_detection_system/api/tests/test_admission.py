@@ -0,0 +1,57 @@
+# ===== BEGIN: test_admission.py =====
+import json
+
+from fastapi.testclient import TestClient
+
+import fraud_detection_system.api.app as api
+from fraud_detection_system.api.admission import DEGRADED, FULL, SHED, AdmissionController
+
+TX = {"amount": 99.0, "account_age_days": 7, "country": "US", "device_id": "T1", "hour_of_day": 22}
+
+def test_verdicts_follow_limits_and_policy():
+    c = AdmissionController(max_inflight=1, shed_inflight=2)
+    assert [c.enter(), c.enter(), c.enter()] == [FULL, DEGRADED, SHED]
+    c.leave()
+    c.leave()
+    assert c.enter() == FULL
+    s = c.stats()
+    assert (s["admitted"], s["degraded"], s["shed"], s["inflight"], s["peak_inflight"]) == (3, 1, 1, 1, 2)
+    strict = AdmissionController(max_inflight=1, policy="shed")
+    assert [strict.enter(), strict.enter()] == [FULL, SHED]
+    assert not AdmissionController().enabled
+
+def test_over_budget_request_is_scored_rules_only(tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "LOGS_DIR", tmp_path)
+    monkeypatch.setattr(api, "_ADMISSION", AdmissionController(budget_ms=1e-6))
+    with TestClient(api.app) as c:
+        r = c.post("/score", json=TX).json()
+        assert r["degraded"] is True and r["proba"] is None and r["top_features"] is None
+        rb = c.post("/score_batch", json={"transactions": [TX, TX]}).json()
+        assert all(x["degraded"] for x in rb["results"])
+        adm = c.get("/health").json()["admission"]
+        assert adm["degraded"] == 2 and adm["over_budget"] == 2
+        assert 'fraud_admission_total{result="degraded"} 2' in c.get("/metrics").text
+    lines = [json.loads(x) for f in tmp_path.glob("*.jsonl") for x in f.read_text(encoding="utf-8").splitlines()]
+    assert len(lines) == 3 and all(x["degraded"] and x["proba"] is None for x in lines)
+
+def test_shed_answers_503_before_the_handler(tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "LOGS_DIR", tmp_path)
+    ctl = AdmissionController(shed_inflight=1)
+    ctl.inflight = 1  # a request already in flight
+    monkeypatch.setattr(api, "_ADMISSION", ctl)
+    with TestClient(api.app) as c:
+        r = c.post("/score", json=TX)
+        assert r.status_code == 503 and r.headers["retry-after"] == "1"
+        assert c.get("/health").status_code == 200  # only scoring paths are guarded
+    assert ctl.stats()["shed"] == 1 and not list(tmp_path.glob("*.jsonl"))
+
+def test_over_budget_shed_leaves_ctx_untouched(tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "LOGS_DIR", tmp_path)
+    monkeypatch.setattr(api, "_ADMISSION", AdmissionController(budget_ms=1e-6, policy="shed"))
+    seen = []
+    monkeypatch.setattr(api, "_observe_ctx", lambda tx: seen.append(tx) or {})
+    with TestClient(api.app) as c:
+        assert c.post("/score", json=TX).status_code == 503
+        assert c.post("/score_batch", json={"transactions": [TX, TX]}).status_code == 503
+    assert seen == [] and not list(tmp_path.glob("*.jsonl"))
+# ===== END: test_admission.py =====
@@ -27,4 +27,106 @@ def test_score_shape():
         assert k in data
     assert isinstance(data["proba"], float)
     assert isinstance(data["rules_hit"], list)
-# ===== END: test_app.py =====
\ No newline at end of file
+
+def test_score_batch_matches_single():
+    txs = [
+        {"amount": 99.0, "account_age_days": 7, "country": "US", "device_id": "T1", "hour_of_day": 22},
+        {"amount": 12000.0, "account_age_days": 3, "country": "gb", "device_id": "T2", "hour_of_day": 2},
+    ]
+    with TestClient(app) as c:
+        r = c.post("/score_batch", json={"transactions": txs})
+        assert r.status_code == 200
+        data = r.json()
+        assert data["count"] == 2 and len(data["results"]) == 2
+        assert "latency_ms" in data
+        for tx, res in zip(txs, data["results"]):
+            single = c.post("/score", json=tx).json()
+            assert abs(single["proba"] - res["proba"]) < 1e-6
+            assert single["decision"] == res["decision"]
+
+def test_rules_compiled_and_whitelisted(tmp_path):
+    from fraud_detection_system.api.app import _apply_rules, _load_rules
+    rules_file = tmp_path / "rules.yml"
+    rules_file.write_text(
+        "- {name: big_new, condition: 'amount >= 10000 and account_age_days < 30'}\n"
+        "- {name: sneaky, condition: \"__import__('os').getcwd()\"}\n"
+        "- {name: odd_hour, condition: 'hour_of_day in (0, 1, 2)'}\n",
+        encoding="utf-8",
+    )
+    rules = _load_rules(rules_file)
+    assert [r.name for r in rules] == ["big_new", "odd_hour"]
+    tx = {"amount": 12000.0, "account_age_days": 3, "hour_of_day": 2}
+    assert _apply_rules(tx, rules) == ["big_new", "odd_hour"]
+    assert _apply_rules({"amount": 1.0}, rules) == []
+
+def test_structured_rules_scalar_and_vector_agree():
+    from fraud_detection_system.api.app import RULES_PATH, _apply_rules, _apply_rules_batch, _load_rules
+    rules = _load_rules(RULES_PATH)
+    assert len(rules) >= 4 and not rules.errors
+    txs = [
+        {"amount": 12000.0, "account_age_days": 3, "country": "GB", "device_id": "T1", "hour_of_day": 2},
+        {"amount": 50.0, "account_age_days": 900, "country": "US", "device_id": "T2", "hour_of_day": 12},
+    ]
+    scalar = [_apply_rules(tx, rules) for tx in txs]
+    assert scalar == _apply_rules_batch(txs, rules)
+    assert "R001_HIGH_AMOUNT_NEW_ACCOUNT" in scalar[0] and scalar[1] == []
+    # ctx-driven rules only hit when the context is supplied
+    ctx = {"home_country": "US", "device_is_new": True}
+    assert "R003_CROSS_BORDER_ODD_HOURS" not in scalar[0]
+    assert {"R003_CROSS_BORDER_ODD_HOURS", "R004_HIGH_AMOUNT_NEW_DEVICE"} <= set(_apply_rules(txs[0], rules, ctx))
+
+def test_vector_rules_skip_only_null_rows():
+    from fraud_detection_system.api.app import _apply_rules, _apply_rules_batch
+    from fraud_detection_system.src.rules_engine import compile_ruleset
+    rules = compile_ruleset({"rules": [
+        {"id": "fast", "when": {"all": ["ctx.txn_count_1h >= 3"]}},
+        {"id": "big_fast", "when": {"all": ["tx.amount > 100", "ctx.txn_count_1h * 2 >= 6"]}},
+        {"id": "label", "when": {"all": ["ctx.tag > 1"]}},
+    ]}, on_error="raise")
+    txs = [{"amount": a} for a in (500.0, 500.0, 50.0, 500.0)]
+    ctxs = [{"txn_count_1h": c, "tag": t} for c, t in ((5, 2), (None, "x"), (4, None), (1, 3))]
+    scalar = [_apply_rules(tx, rules, ctx) for tx, ctx in zip(txs, ctxs)]
+    assert scalar == [["fast", "big_fast", "label"], [], ["fast"], ["label"]]
+    assert _apply_rules_batch(txs, rules, ctxs) == scalar
+
+def test_null_checks_and_conditional_expressions():
+    from fraud_detection_system.api.app import _apply_rules, _apply_rules_batch
+    from fraud_detection_system.src.rules_engine import compile_ruleset
+    rules = compile_ruleset([
+        {"name": "no_home", "condition": "device_id is not None and ctx_home is None"},
+        {"name": "scaled", "condition": "(amount * 3 if account_age_days < 30 else amount) >= 900"},
+        {"name": "bad_is", "condition": "amount is 5"},
+    ])
+    assert [r.id for r in rules] == ["no_home", "scaled"] and "bad_is" in rules.errors
+    txs = [
+        {"device_id": "D1", "ctx_home": None, "amount": 400.0, "account_age_days": 3},
+        {"device_id": None, "ctx_home": None, "amount": 400.0, "account_age_days": 90},
+        {"device_id": "D3", "ctx_home": "US", "amount": 1000.0, "account_age_days": None},
+    ]
+    scalar = [_apply_rules(tx, rules) for tx in txs]
+    assert scalar == [["no_home", "scaled"], [], []]
+    assert _apply_rules_batch(txs, rules) == scalar
+    assert _apply_rules({"device_id": "D4", "amount": 1.0, "account_age_days": 1}, rules) == []  # ctx_home missing
+
+def test_review_rule_hit_is_not_a_flag(monkeypatch):
+    import fraud_detection_system.api.app as api
+    from fraud_detection_system.api.admission import AdmissionController
+    from fraud_detection_system.src.rules_engine import compile_ruleset
+    rules = compile_ruleset({"rules": [
+        {"id": "big", "when": {"all": ["tx.amount > 100"]}, "effect": {"action": "review", "score_delta": 0.3}},
+        {"id": "huge", "when": {"all": ["tx.amount > 10000"]}, "effect": {"action": "flag"}},
+    ]}, on_error="raise")
+    txs = [{"amount": 500.0}, {"amount": 20000.0}, {"amount": 5.0}]
+    hits = [api._apply_rules(tx, rules) for tx in txs]
+    assert [api._decide(0.1, 0.5, h) for h in hits] == ["review", "flag", "allow"]
+    assert api._decide(0.25, 0.5, hits[0]) == "flag"  # 0.25 + score_delta 0.3 reaches the threshold
+    assert [api._decide(0.1, 0.5, h) for h in api._apply_rules_batch(txs, rules)] == ["review", "flag", "allow"]
+    # rules_v1.yml is all `action: review`: a rules-only (degraded) hit is a review, not a flag
+    monkeypatch.setattr(api, "_ADMISSION", AdmissionController(budget_ms=1e-6))
+    tx = {"amount": 12000.0, "account_age_days": 3, "country": "US", "device_id": "T9", "hour_of_day": 12}
+    with TestClient(app) as c:
+        r = c.post("/score", json=tx).json()
+        assert "R001_HIGH_AMOUNT_NEW_ACCOUNT" in r["rules_hit"] and r["decision"] == "review"
+        rb = c.post("/score_batch", json={"transactions": [tx]}).json()
+        assert rb["results"][0]["decision"] == "review"
+# ===== END: test_app.py =====
@@ -0,0 +1,58 @@
+# ===== BEGIN: test_context_store.py =====
+from fraud_detection_system.api.context_store import ContextStore, SharedContextOwner, connect_shared
+
+def _tx(amount, device="D1", country="US", account="A1"):
+    return {"account_id": account, "amount": amount, "device_id": device, "country": country}
+
+def test_cold_account_has_no_ctx():
+    st = ContextStore()
+    ctx = st.observe(_tx(10.0), now=1000.0)
+    assert ctx == {"velocity_spike": None, "device_is_new": None, "home_country": None}
+
+def test_device_country_and_velocity():
+    st = ContextStore(window_minutes=30, baseline_days=14, multiplier=3.5)
+    day = 86400.0
+    for i in range(5):
+        st.observe(_tx(100.0), now=i * day)
+    ctx = st.observe(_tx(50.0, device="D2", country="GB"), now=5 * day)
+    assert ctx["device_is_new"] is True
+    assert ctx["home_country"] == "US"
+    assert ctx["velocity_spike"] is False
+    # burst inside the 30-minute window vs a ~100 baseline
+    ctx = st.observe(_tx(400.0), now=5 * day + 60)
+    assert ctx["velocity_spike"] is True
+    assert ctx["device_is_new"] is False
+
+def test_lru_ttl_and_snapshot_roundtrip(tmp_path):
+    st = ContextStore(max_accounts=2, ttl_sec=100.0)
+    st.observe(_tx(1.0, account="A"), now=0.0)
+    st.observe(_tx(1.0, account="B"), now=1.0)
+    st.observe(_tx(1.0, account="C"), now=2.0)
+    assert len(st) == 2 and st.evicted == 1
+    st.observe(_tx(1.0, account="D"), now=500.0)  # B and C idle > ttl
+    assert len(st) == 1 and st.expired == 2
+
+    path = tmp_path / "ctx.json"
+    assert st.snapshot(path) == 1
+    restored = ContextStore(max_accounts=2, ttl_sec=100.0)
+    assert restored.restore(path, now=510.0) == 1
+    assert restored.observe(_tx(1.0, account="D"), now=520.0)["home_country"] == "US"
+
+def test_shared_store_sees_every_worker_and_snapshots_on_close(tmp_path):
+    path = tmp_path / "ctx.json"
+    owner = SharedContextOwner({"max_accounts": 10}, path, snapshot_sec=0)
+    try:
+        w0, w1 = connect_shared(owner.address, owner.authkey), connect_shared(owner.address, owner.authkey)
+        w0.observe(_tx(10.0, device="D1"))
+        ctx = w1.observe(_tx(10.0, device="D2"))  # another worker, same account
+        assert ctx["home_country"] == "US" and ctx["device_is_new"] is True
+        assert w0.stats()["accounts"] == 1
+    finally:
+        owner.close()
+    restored = SharedContextOwner({"max_accounts": 10}, path, snapshot_sec=0)
+    try:
+        ctx = connect_shared(restored.address, restored.authkey).observe(_tx(10.0, device="D2"))
+        assert ctx["device_is_new"] is False
+    finally:
+        restored.close()
+# ===== END: test_context_store.py =====
@@ -0,0 +1,46 @@
+# ===== BEGIN: test_explain.py =====
+import math
+
+from fastapi.testclient import TestClient
+
+import fraud_detection_system.api.app as api
+from fraud_detection_system.api.explain import CONTRIBS
+
+TX = {"amount": 99.0, "account_age_days": 7, "country": "US", "device_id": "T1", "hour_of_day": 22}
+
+def _point_prod_at(tmp_path, monkeypatch, name):
+    pointer = tmp_path / "PROD_POINTER.txt"
+    pointer.write_text(str(api.MODELS_DIR / name), encoding="utf-8")
+    monkeypatch.setattr(api, "PROD_POINTER", pointer)
+    monkeypatch.setattr(api, "LOGS_DIR", tmp_path)
+
+def test_pred_contribs_add_up_to_margin(tmp_path, monkeypatch):
+    _point_prod_at(tmp_path, monkeypatch, "fraud_20250930_164145")
+    slot = api._build_bundle().prod
+    a = {"amount": 15000.0, "account_age_days": 2, "hour_of_day": 3}
+    b = {"amount": 20.0, "account_age_days": 900, "hour_of_day": 14}
+    k = len(slot.features)
+    ea, eb = slot.explainer.explain([a, b], k=k)
+    pa, pb = slot.fast.predict_many([a, b])
+    logit = lambda p: math.log(p / (1 - p))
+    # attributions + constant bias == margin, so differences must match
+    diff = sum(x["shap_value"] for x in ea) - sum(x["shap_value"] for x in eb)
+    assert abs(diff - (logit(pa) - logit(pb))) < 1e-3
+
+def test_explain_is_opt_in(tmp_path, monkeypatch):
+    _point_prod_at(tmp_path, monkeypatch, "fraud_20250930_164145")
+    with TestClient(api.app) as c:
+        assert c.post("/score", json=TX).json()["top_features"] is None
+        assert c.get("/health").json()["explain"]["prod"]["calls"] == 0
+        tops = c.post("/score?explain=true", json=TX).json()["top_features"]
+        assert len(tops) == 5 and {"feature", "shap_value"} <= set(tops[0])
+        r = c.post("/explain", json=TX).json()
+        assert r["backend"] == CONTRIBS and r["top_features"] == tops
+
+def test_explain_unavailable_backend_returns_none(tmp_path, monkeypatch):
+    _point_prod_at(tmp_path, monkeypatch, "CAND_20251014")  # pipeline -> shap backend
+    with TestClient(api.app) as c:
+        r = c.post("/score_batch?explain=true", json={"transactions": [TX, TX]})
+        assert r.status_code == 200
+        assert all(x["top_features"] is None for x in r.json()["results"])
+# ===== END: test_explain.py =====
@@ -0,0 +1,32 @@
+# ===== BEGIN: test_fastpath.py =====
+import json
+
+import joblib
+import pandas as pd
+
+from fraud_detection_system.api.app import MODELS_DIR, _numeric_features
+from fraud_detection_system.api.fastpath import build_row_scorer
+
+def _bundle(name):
+    d = MODELS_DIR / name
+    fl = json.loads((d / "feature_list.json").read_text(encoding="utf-8"))
+    num = fl.get("numeric") or fl.get("numeric_features") or []
+    cat = fl.get("categorical") or fl.get("categorical_features") or []
+    return joblib.load(d / "xgb_model.joblib"), [*num, *cat], cat
+
+def test_plain_booster_fast_path_matches_predict_proba():
+    model, features, cat = _bundle("fraud_20250930_164145")
+    fast = build_row_scorer(model, features, _numeric_features(features, cat))
+    assert fast is not None
+    txs = [
+        {"amount": 99.0, "account_age_days": 7, "hour_of_day": 22},
+        {"amount": 15000.0, "account_age_days": 2, "hour_of_day": 3, "rolling_amount_last_1h": 900.0},
+    ]
+    expected = model.predict_proba(pd.DataFrame([{f: tx.get(f, 0) for f in features} for tx in txs]))[:, 1]
+    assert [round(p, 6) for p in fast.predict_many(txs)] == [round(float(p), 6) for p in expected]
+    assert round(fast.predict(txs[1]), 6) == round(float(expected[1]), 6)
+
+def test_pipeline_bundle_stays_on_dataframe_path():
+    model, features, cat = _bundle("CAND_20251014")
+    assert build_row_scorer(model, features, _numeric_features(features, cat)) is None
+# ===== END: test_fastpath.py =====
@@ -0,0 +1,57 @@
+# ===== BEGIN: test_idempotency.py =====
+import json
+import time
+
+from fastapi.testclient import TestClient
+
+import fraud_detection_system.api.app as api
+from fraud_detection_system.api.idempotency import IdempotencyCache, idempotency_key
+
+TX = {"amount": 99.0, "account_age_days": 7, "country": "US", "device_id": "T1", "hour_of_day": 22}
+
+def test_key_prefers_transaction_id_and_ignores_key_order():
+    assert idempotency_key({**TX, "transaction_id": "abc"}) == "id:abc"
+    reordered = dict(reversed(list(TX.items())))
+    assert idempotency_key(TX) == idempotency_key(reordered)
+    assert idempotency_key(TX) != idempotency_key({**TX, "amount": 100.0})
+
+def test_cache_evicts_lru_and_expires():
+    c = IdempotencyCache(max_items=2, ttl_sec=60)
+    c.put("a", 1)
+    c.put("b", 2)
+    assert c.get("a") == 1  # a is now most recent
+    c.put("c", 3)
+    assert c.get("b") is None and c.get("a") == 1 and c.get("c") == 3
+    short = IdempotencyCache(max_items=2, ttl_sec=0.01)
+    short.put("a", 1)
+    time.sleep(0.02)
+    assert short.get("a") is None
+    assert short.stats()["expired"] == 1 and c.stats()["evicted"] == 1
+
+def test_retry_is_answered_from_cache_and_logged_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "LOGS_DIR", tmp_path)
+    monkeypatch.setattr(api, "IDEMPOTENCY_ENABLED", True)
+    tx = {**TX, "transaction_id": "gw-123"}
+    with TestClient(api.app) as c:
+        first = c.post("/score", json=tx).json()
+        retry = c.post("/score", json=tx).json()
+        assert retry == first
+        assert c.get("/health").json()["idempotency"]["hits"] == 1
+        assert 'fraud_idempotency_lookups_total{result="hit"} 1' in c.get("/metrics").text
+    lines = [json.loads(x) for f in tmp_path.glob("*.jsonl") for x in f.read_text(encoding="utf-8").splitlines()]
+    assert [bool(x.get("cache_hit")) for x in lines] == [False, True]
+    assert lines[1]["idempotency_key"] == "id:gw-123" and lines[1]["decision"] == first["decision"]
+
+def test_identical_payloads_without_transaction_id_still_reach_ctx(monkeypatch):
+    monkeypatch.setattr(api, "IDEMPOTENCY_ENABLED", True)
+    tx = {**TX, "account_id": "burst-1", "amount": 1.0}
+    with TestClient(api.app) as c:
+        first = c.post("/score", json=tx).json()
+        for _ in range(5):
+            assert c.post("/score", json=tx).json()["decision"] == first["decision"]
+        assert len(api._CTX._accounts["burst-1"].events) == 6  # every charge counted by velocity
+        retry = {**TX, "account_id": "retry-1", "transaction_id": "gw-9"}
+        for _ in range(3):
+            c.post("/score", json=retry)
+        assert len(api._CTX._accounts["retry-1"].events) == 1  # a client id is a true retry
+# ===== END: test_idempotency.py =====
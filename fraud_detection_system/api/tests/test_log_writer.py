@@ -0,0 +1,57 @@
+# ===== BEGIN: test_log_writer.py =====
+import json
+
+import pytest
+
+from fraud_detection_system.api.log_writer import AsyncJsonlWriter
+
+def _lines(path):
+    return [json.loads(x) for x in path.read_text(encoding="utf-8").splitlines()]
+
+def test_writer_batches_rotates_and_flushes_on_stop(tmp_path):
+    w = AsyncJsonlWriter(tmp_path)
+    w.start()
+    for i in range(50):
+        w.write({"i": i}, day="20250101")
+    w.write({"shadow": True}, suffix="_shadow", day="20250101")
+    w.write({"i": 50}, day="20250102")  # local midnight passed
+    w.stop()
+    assert [e["i"] for e in _lines(tmp_path / "20250101.jsonl")] == list(range(50))
+    assert _lines(tmp_path / "20250101_shadow.jsonl") == [{"shadow": True}]
+    assert _lines(tmp_path / "20250102.jsonl") == [{"i": 50}]
+    assert w.stats()["written"] == 52 and w.stats()["dropped"] == 0
+
+def test_drop_and_sample_policies_when_full(tmp_path):
+    # not started -> nothing drains, so the queue stays full
+    w = AsyncJsonlWriter(tmp_path, max_queue=2, policy="drop")
+    assert [w.write({"i": i}) for i in range(5)] == [True, True, False, False, False]
+    assert w.stats()["dropped"] == 3 and w.stats()["queue_depth"] == 2
+
+    s = AsyncJsonlWriter(tmp_path, max_queue=1, policy="sample", sample_n=1000)
+    s.write({"i": 0})
+    assert not any(s.write({"i": i}) for i in range(1, 500))
+    assert s.stats()["dropped"] == 499
+
+def _write_many(logs_dir, worker):
+    w = AsyncJsonlWriter(logs_dir, shared=True, max_batch=64)
+    w.start()
+    for i in range(200):
+        w.write({"w": worker, "i": i, "pad": "x" * 9000}, day="20250101")  # batches far exceed one 8 KiB buffered write
+    w.stop()
+
+def test_shared_writers_in_several_processes_never_split_lines(tmp_path):
+    import multiprocessing as mp
+
+    if "fork" not in mp.get_all_start_methods():
+        pytest.skip("needs fork")
+    ctx = mp.get_context("fork")
+    procs = [ctx.Process(target=_write_many, args=(tmp_path, k)) for k in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+    lines = _lines(tmp_path / "20250101.jsonl")  # every line parses
+    assert len(lines) == 800
+    for k in range(4):
+        assert [e["i"] for e in lines if e["w"] == k] == list(range(200))
+# ===== END: test_log_writer.py =====
@@ -0,0 +1,38 @@
+# ===== BEGIN: test_metrics.py =====
+import json
+
+from fastapi.testclient import TestClient
+
+import fraud_detection_system.api.app as api
+from fraud_detection_system.api.metrics import StageMetrics, StageTimer
+
+def test_histogram_renders_cumulative_prometheus_buckets():
+    m = StageMetrics()
+    m.observe("score", "prod", {"predict": 0.00015, "rules": 0.00003})
+    m.observe("score", "prod", {"predict": 0.004})
+    m.count_request("score", "prod", "allow", 2)
+    text = m.render_prometheus()
+    assert 'fraud_stage_latency_seconds_bucket{endpoint="score",arm="prod",stage="predict",le="0.0002"} 1' in text
+    assert 'fraud_stage_latency_seconds_bucket{endpoint="score",arm="prod",stage="predict",le="0.005"} 2' in text
+    assert 'fraud_stage_latency_seconds_count{endpoint="score",arm="prod",stage="rules"} 1' in text
+    assert 'fraud_requests_total{endpoint="score",arm="prod",decision="allow"} 2' in text
+
+def test_timer_accumulates_repeated_stages():
+    t = StageTimer()
+    t.mark("frame")
+    t.mark("frame")
+    assert list(t.stages) == ["frame"] and t.total() >= t.stages["frame"]
+
+def test_score_records_stages_in_metrics_and_log(tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "LOGS_DIR", tmp_path)
+    tx = {"amount": 99.0, "account_age_days": 7, "country": "US", "device_id": "T1", "hour_of_day": 22}
+    with TestClient(api.app) as c:
+        assert c.post("/score", json=tx).status_code == 200
+        text = c.get("/metrics").text
+    for stage in ("parse", "ctx", "rules", "predict", "log", "total"):
+        assert f'endpoint="score",arm="prod",stage="{stage}"' in text
+    lines = [json.loads(x) for f in tmp_path.glob("*.jsonl") for x in f.read_text(encoding="utf-8").splitlines()]
+    stages = lines[-1]["stages_ms"]
+    assert {"parse", "ctx", "rules", "predict"} <= set(stages)
+    assert all(isinstance(v, float) for v in stages.values())
+# ===== END: test_metrics.py =====
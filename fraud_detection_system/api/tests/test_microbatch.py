@@ -0,0 +1,89 @@
+# ===== BEGIN: test_microbatch.py =====
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import fraud_detection_system.api.app as api
+from fraud_detection_system.api.microbatch import BatcherStopped, MicroBatcher
+
+def test_concurrent_calls_share_batches():
+    calls = []
+
+    def predict_many(txs):
+        calls.append(len(txs))
+        return [tx["amount"] / 100.0 for tx in txs]
+
+    mb = MicroBatcher(predict_many, window_ms=50, max_batch=8)
+    mb.start()
+    results = {}
+
+    def worker(i):
+        results[i] = mb.predict({"amount": float(i)})
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    mb.stop()
+    assert results == {i: i / 100.0 for i in range(16)}
+    assert sum(calls) == 16 and len(calls) < 16 and max(calls) <= 8
+    assert mb.stats()["items"] == 16
+
+def test_failure_reaches_every_caller():
+    def boom(txs):
+        raise RuntimeError("model down")
+
+    mb = MicroBatcher(boom, window_ms=1)
+    mb.start()
+    with pytest.raises(RuntimeError):
+        mb.predict({"amount": 1.0})
+    mb.stop()
+
+def test_stop_fails_queued_callers_and_later_calls_at_once():
+    release = threading.Event()
+
+    def stuck(txs):
+        release.wait()
+        return [0.5] * len(txs)
+
+    mb = MicroBatcher(stuck, window_ms=0, max_batch=1)
+    mb.start()
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(mb.predict({"amount": 1.0}, timeout=5))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    while mb._q.qsize() < 3:  # one tx in the stuck batch, three queued behind it
+        time.sleep(0.001)
+    t0 = time.perf_counter()
+    mb.stop(timeout=0.1)
+    with pytest.raises(BatcherStopped):
+        mb.predict({"amount": 1.0})
+    release.set()
+    for t in threads:
+        t.join()
+    mb_threads = [t for t in threading.enumerate() if t.name == "fraud-microbatch-prod"]
+    for t in mb_threads:
+        t.join(2)
+    assert time.perf_counter() - t0 < 2.0 and not any(t.is_alive() for t in mb_threads)
+    assert results == [0.5] and len(errors) == 3 and all(isinstance(e, BatcherStopped) for e in errors)
+
+def test_score_with_microbatch_matches_direct(monkeypatch):
+    tx = {"amount": 99.0, "account_age_days": 7, "country": "US", "device_id": "T1", "hour_of_day": 22}
+    with TestClient(api.app) as c:
+        direct = c.post("/score", json=tx).json()
+    monkeypatch.setattr(api, "MICROBATCH_ENABLED", True)
+    with TestClient(api.app) as c:
+        batched = c.post("/score", json=tx).json()
+        assert c.get("/health").json()["microbatch"]["prod"]["items"] == 1
+    assert abs(direct["proba"] - batched["proba"]) < 1e-6
+# ===== END: test_microbatch.py =====
@@ -0,0 +1,57 @@
+# ===== BEGIN: test_reload.py =====
+from fastapi.testclient import TestClient
+
+import fraud_detection_system.api.app as api
+from fraud_detection_system.api.reload_watcher import ReloadWatcher
+
+TX = {"amount": 99.0, "account_age_days": 7, "country": "US", "device_id": "T1", "hour_of_day": 22}
+
+def test_reload_swaps_bundle_from_pointer(tmp_path, monkeypatch):
+    pointer = tmp_path / "PROD_POINTER.txt"
+    pointer.write_text(str(api.MODELS_DIR / "fraud_20250930_164145"), encoding="utf-8")
+    monkeypatch.setattr(api, "PROD_POINTER", pointer)
+    monkeypatch.setattr(api, "LOGS_DIR", tmp_path)
+    with TestClient(api.app) as c:
+        before = c.get("/health").json()
+        assert before["prod_source"] == "pointer" and before["prod_dir"].endswith("fraud_20250930_164145")
+        held = api._BUNDLE
+
+        pointer.write_text(str(api.MODELS_DIR / "CAND_20251014"), encoding="utf-8")
+        r = c.post("/reload")
+        assert r.status_code == 200 and r.json()["changed"] is True
+
+        after = c.get("/health").json()
+        assert after["prod_dir"].endswith("CAND_20251014")
+        assert after["bundle_version"] != before["bundle_version"]
+        assert after["reload"]["reloads"] >= 1
+        assert c.post("/score", json=TX).status_code == 200
+        # the old bundle object is untouched (requests that grabbed it finish on it)
+        assert str(held.prod.path).endswith("fraud_20250930_164145")
+
+def test_failed_reload_keeps_serving(tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "LOGS_DIR", tmp_path)
+    with TestClient(api.app) as c:
+        version = c.get("/health").json()["bundle_version"]
+
+        def boom():
+            raise FileNotFoundError("no model dirs")
+
+        monkeypatch.setattr(api, "_resolve_prod_dir", boom)
+        assert c.post("/reload").status_code == 500
+        data = c.get("/health").json()
+        assert data["bundle_version"] == version
+        assert "no model dirs" in data["reload"]["last_error"]
+        assert c.post("/score", json=TX).status_code == 200
+
+def test_watcher_fires_once_change_settles(tmp_path):
+    f = tmp_path / "PROD_POINTER.txt"
+    f.write_text("a", encoding="utf-8")
+    calls = []
+    w = ReloadWatcher(lambda: [f], lambda: calls.append(1), interval_sec=60)
+    assert w.poll() is False
+    f.write_text("bb", encoding="utf-8")
+    assert w.poll() is False      # first sighting of the new state
+    assert w.poll() is True       # unchanged since -> reload
+    assert w.poll() is False
+    assert calls == [1]
+# ===== END: test_reload.py =====
@@ -0,0 +1,41 @@
+# ===== BEGIN: test_shadow.py =====
+import json
+import threading
+
+from fastapi.testclient import TestClient
+
+import fraud_detection_system.api.app as api
+from fraud_detection_system.api.shadow import ShadowWorkerPool
+
+def test_pool_sheds_when_full_and_coalesces():
+    gate = threading.Event()
+    groups = []
+
+    def handler(jobs):
+        gate.wait(5)
+        groups.append(len(jobs))
+
+    pool = ShadowWorkerPool(handler, workers=1, max_queue=3, max_batch=10)
+    pool.start()
+    pool.submit([{"n": 0}])            # picked up by the worker, which then blocks
+    while pool.stats()["queue_depth"]:
+        pass
+    assert pool.submit([{"n": i} for i in range(1, 6)]) == 3
+    assert pool.stats()["shed"] == 2
+    gate.set()
+    pool.stop()
+    assert groups == [1, 3]
+    assert pool.stats()["scored"] == 4
+
+def test_shadow_mode_logs_candidate_off_request_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "TRAFFIC_MODE", "shadow")
+    monkeypatch.setattr(api, "CAND_DIR_ENV", str(api.MODELS_DIR / "CAND_20251014"))
+    monkeypatch.setattr(api, "LOGS_DIR", tmp_path)
+    tx = {"amount": 99.0, "account_age_days": 7, "country": "US", "device_id": "T1", "hour_of_day": 22}
+    with TestClient(api.app) as c:
+        assert c.post("/score", json=tx).status_code == 200
+        assert c.get("/health").json()["shadow"]["running"] is True
+    lines = [json.loads(x) for f in tmp_path.glob("*_shadow.jsonl") for x in f.read_text(encoding="utf-8").splitlines()]
+    assert len(lines) == 1
+    assert set(lines[0]) >= {"payload", "prod", "cand", "latency_ms", "model_ts"}
+# ===== END: test_shadow.py =====
@@ -0,0 +1,90 @@
+# ===== BEGIN: test_startup.py =====
+from fastapi.testclient import TestClient
+
+import fraud_detection_system.api.app as api
+
+TX = {"amount": 99.0, "account_age_days": 7, "country": "US", "device_id": "T1", "hour_of_day": 22}
+
+def test_import_defers_heavy_modules():
+    import subprocess
+    import sys
+
+    code = "import sys, fraud_detection_system.api.app; print(sorted(m for m in ('pandas', 'joblib', 'shap', 'yaml', 'xgboost') if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=api.ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+def test_live_before_ready_then_ready(tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "LOGS_DIR", tmp_path)
+    with TestClient(api.app) as c:
+        assert c.get("/livez").status_code == 200
+        assert c.post("/score", json=TX).status_code == 200  # waits for the loader
+        r = c.get("/ready")
+        assert r.status_code == 200
+        startup = r.json()["startup"]
+        assert startup["bundle_ms"] > 0 and startup["time_to_ready_ms"] >= startup["bundle_ms"]
+
+def test_failed_startup_load_is_live_but_not_ready(tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "LOGS_DIR", tmp_path)
+
+    def boom():
+        raise FileNotFoundError("no model dirs")
+
+    monkeypatch.setattr(api, "_resolve_prod_dir", boom)
+    with TestClient(api.app) as c:
+        assert c.get("/livez").status_code == 200
+        r = c.post("/score", json=TX)
+        assert r.status_code == 503 and "no model dirs" in r.json()["detail"]
+        assert c.get("/ready").status_code == 503
+
+def test_warm_up_runs_before_ready(tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "LOGS_DIR", tmp_path)
+    monkeypatch.setattr(api, "WARMUP_ROWS", 8)
+    with TestClient(api.app) as c:
+        h = c.get("/health").json()  # waits for the loader
+        assert h["warmup"]["rows"] == 8
+        assert {"rules", "predict_one", "predict_batch", "schema"} <= set(h["warmup"]["prod"])
+        assert h["explain"]["prod"]["calls"] == 0  # warm-up is not a request
+
+def test_warm_up_can_be_disabled(tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "LOGS_DIR", tmp_path)
+    monkeypatch.setattr(api, "WARMUP_ENABLED", False)
+    with TestClient(api.app) as c:
+        assert c.post("/score", json=TX).status_code == 200
+        assert c.get("/health").json()["warmup"] == {}
+
+def test_preloaded_bundle_is_reused_by_worker_startup(tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "LOGS_DIR", tmp_path)
+    monkeypatch.setattr(api, "_PRELOADED", False)
+    monkeypatch.setattr(api, "WORKER_INDEX", 0)
+    monkeypatch.setattr(api, "WORKERS", 1)
+    monkeypatch.setattr(api, "XGB_NTHREAD", 0)
+    bundle = api.preload()  # parent, before fork
+
+    def no_second_load():
+        raise AssertionError("worker must not rebuild the preloaded bundle")
+
+    monkeypatch.setattr(api, "_load_model_bundle", no_second_load)
+    api.configure_worker(1, 2, 1)  # child
+    with TestClient(api.app) as c:
+        h = c.get("/health").json()
+        assert h["ready"] and h["bundle_version"] == bundle.version
+        assert h["worker"]["index"] == 1 and h["log_writer"]["shared"] is True
+
+def test_workers_share_one_ctx_store(monkeypatch):
+    from fraud_detection_system.api.context_store import connect_shared
+
+    monkeypatch.setattr(api, "_CTX_SHARED", None)
+    owner = api.start_shared_context(api.load_ruleset(api.RULES_PATH))
+    try:
+        for worker in range(2):  # two lifespans on one store, as two forked workers would be
+            with TestClient(api.app) as c:
+                assert c.post("/score", json={**TX, "account_id": "shared-1", "device_id": f"W{worker}"}).status_code == 200
+                ctx = c.get("/health").json()["ctx_store"]
+                assert ctx["shared"] and ctx["accounts"] == 1 and ctx["errors"] == 0
+        assert not api.CTX_SNAPSHOT_PATH.exists()  # workers leave the snapshot to the owner
+        ctx = connect_shared(*api._CTX_SHARED).observe({**TX, "account_id": "shared-1", "device_id": "W1"})
+        assert ctx["device_is_new"] is False and ctx["home_country"] == "US"
+    finally:
+        owner.close()
+    assert api.CTX_SNAPSHOT_PATH.exists()
+# ===== END: test_startup.py =====
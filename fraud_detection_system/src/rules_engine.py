@@ -1,32 +1,441 @@
-import pandas as pd, yaml
+# ===== BEGIN: rules_engine.py =====
+"""
+One compiler for the fraud ruleset, two evaluators.
+
+Accepted YAML layouts:
+  - structured (rules/rules_v1.yml): {defaults, rules: [{id, enabled, params,
+    when: {all|any: [cond, ...]}, effect: {action, score_delta, severity, reasons}}]}
+  - legacy flat list: [{name, condition, action?}, ...] (bare names = tx fields)
+
+Each condition string is parsed once into a normalized expression (the
+intermediate form): `tx.f` / `ctx.f` become field references, `params.p` and
+true/false/null are folded into constants, and anything outside a small
+comparison/boolean/arithmetic whitelist is rejected. From that one form:
+  - CompiledRuleset.evaluate_one(tx, ctx)  -> scalar, one code object per rule (API /score)
+  - CompiledRuleset.evaluate_columns(cols) -> NumPy masks per rule (batch / backtests)
+
+A condition that references a missing or null field never hits, on both paths,
+except for a field whose only uses are `is None` / `is not None` checks: that
+one only has to be present. `a if cond else b` is evaluated with np.where on
+the vector path.
+The hits of one transaction come back as RuleHits: the rule ids plus their
+combined effect (any "flag" rule, any "review" rule, summed score_delta), the
+same aggregation RulesEngine.evaluate does into rule_flag / rule_review /
+rule_score_delta. Legacy flat rules without an action flag on hit.
+"""
+from __future__ import annotations
+
+import ast
+import operator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:  # pandas/yaml are imported on first use (API cold start)
+    import pandas as pd
+
+_NAMESPACES = ("tx", "ctx")
+_LITERALS = {"true": True, "false": False, "null": None, "True": True, "False": False, "None": None}
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn,
+    ast.Is, ast.IsNot, ast.IfExp, ast.Name, ast.Attribute, ast.Load, ast.Constant, ast.Tuple, ast.List, ast.Set,
+)
+
+Ref = Tuple[str, str]  # (namespace, field)
+
+class RuleCompileError(ValueError):
+    pass
+
+# ---------- Parsing to the normalized form ----------
+def _as_constant(value: Any) -> ast.Constant:
+    if isinstance(value, (list, tuple, set)):
+        value = tuple(value)
+    return ast.Constant(value=value)
+
+class _Normalizer(ast.NodeTransformer):
+    """tx.f/ctx.f -> tx['f']/ctx['f'], params.p -> constant, bare names -> tx fields (legacy)."""
+
+    def __init__(self, params: Mapping[str, Any]):
+        self.params = params
+        self.refs: List[Ref] = []
+        self.null_checks: List[Ref] = []  # fields used as `<field> is [not] None`
+
+    def _field(self, ns: str, name: str) -> ast.Subscript:
+        self.refs.append((ns, name))
+        return ast.Subscript(value=ast.Name(id=ns, ctx=ast.Load()), slice=ast.Constant(value=name), ctx=ast.Load())
+
+    def visit_Attribute(self, node: ast.Attribute):
+        if not isinstance(node.value, ast.Name):
+            raise RuleCompileError("Only tx.<field>, ctx.<field> and params.<name> are allowed")
+        ns = node.value.id
+        if ns == "params":
+            if node.attr not in self.params:
+                raise RuleCompileError(f"Unknown param: {node.attr}")
+            return _as_constant(self.params[node.attr])
+        if ns in _NAMESPACES:
+            return self._field(ns, node.attr)
+        raise RuleCompileError(f"Unknown namespace: {ns}")
+
+    def visit_Name(self, node: ast.Name):
+        if node.id in _LITERALS:
+            return ast.Constant(value=_LITERALS[node.id])
+        return self._field("tx", node.id)
+
+    def visit_Compare(self, node: ast.Compare):
+        self.generic_visit(node)
+        for op, right in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.In, ast.NotIn)):
+                if isinstance(right, (ast.Tuple, ast.List, ast.Set)) and all(isinstance(e, ast.Constant) for e in right.elts):
+                    continue
+                if isinstance(right, ast.Constant) and isinstance(right.value, tuple):
+                    continue
+                raise RuleCompileError("Right side of 'in' must be a literal list or a params list")
+        if any(isinstance(op, (ast.Is, ast.IsNot)) for op in node.ops):
+            right = node.comparators[0]
+            if len(node.ops) != 1 or not (isinstance(right, ast.Constant) and right.value is None):
+                raise RuleCompileError("'is' / 'is not' may only compare with None")
+            if isinstance(node.left, ast.Subscript):
+                self.null_checks.append((node.left.value.id, node.left.slice.value))
+        return node
+
+def _parse_condition(src: str, params: Mapping[str, Any]) -> Tuple[ast.Expression, Tuple[Ref, ...], Tuple[Ref, ...]]:
+    try:
+        tree = ast.parse(src.strip(), mode="eval")
+    except SyntaxError as e:
+        raise RuleCompileError(f"Invalid condition {src!r}: {e}") from None
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise RuleCompileError(f"Disallowed element in condition {src!r}: {type(node).__name__}")
+    norm = _Normalizer(params)
+    tree = ast.fix_missing_locations(norm.visit(tree))
+    # a field that is only null-checked must not get a not-null guard
+    nullable = tuple(r for r in dict.fromkeys(norm.null_checks) if norm.refs.count(r) == norm.null_checks.count(r))
+    return tree, tuple(dict.fromkeys(norm.refs)), nullable
+
+# ---------- Intermediate form ----------
+@dataclass(frozen=True)
+class Condition:
+    source: str
+    expr: ast.Expression
+    refs: Tuple[Ref, ...]
+    nullable: Tuple[Ref, ...] = ()  # refs only used in `is [not] None`: present, may be null
+
+@dataclass(frozen=True)
+class Rule:
+    id: str
+    mode: str  # "all" | "any"
+    conditions: Tuple[Condition, ...]
+    action: Optional[str] = None
+    score_delta: float = 0.0
+    severity: Optional[str] = None
+    reasons: Tuple[str, ...] = ()
+    description: str = ""
+    params: Dict[str, Any] = field(default_factory=dict, compare=False)
+    code: Any = field(default=None, compare=False, repr=False)
+
+    @property
+    def name(self) -> str:
+        return self.id
+
+class RuleHits(list):
+    """Ids of the rules one transaction hit (a list), plus their combined effect."""
+
+    def __init__(self, rules: Tuple[Rule, ...] = ()):
+        super().__init__(r.id for r in rules)
+        self.flag = any(r.action == "flag" for r in rules)
+        self.review = any(r.action == "review" for r in rules)
+        self.score_delta = float(sum(r.score_delta for r in rules))
+
+def _not_null(ns: str, key: str) -> ast.Compare:
+    # `<ns>.get(key) is not None` -- generated after whitelisting, scalar backend only
+    getter = ast.Attribute(value=ast.Name(id=ns, ctx=ast.Load()), attr="get", ctx=ast.Load())
+    call = ast.Call(func=getter, args=[ast.Constant(value=key)], keywords=[])
+    return ast.Compare(left=call, ops=[ast.IsNot()], comparators=[ast.Constant(value=None)])
+
+def _present(ns: str, key: str) -> ast.Compare:
+    # `key in <ns>` -- the guard for a field that is only null-checked
+    return ast.Compare(left=ast.Constant(value=key), ops=[ast.In()], comparators=[ast.Name(id=ns, ctx=ast.Load())])
+
+def _scalar_code(rule_id: str, mode: str, conds: List[Condition]):
+    """One code object per rule: each condition guarded by not-null checks on its fields."""
+    parts = []
+    for c in conds:
+        guards = [(_present if (ns, key) in c.nullable else _not_null)(ns, key) for ns, key in c.refs]
+        parts.append(ast.BoolOp(op=ast.And(), values=[*guards, c.expr.body]) if guards else c.expr.body)
+    body = parts[0] if len(parts) == 1 else ast.BoolOp(op=ast.Or() if mode == "any" else ast.And(), values=parts)
+    tree = ast.fix_missing_locations(ast.Expression(body=body))
+    return compile(tree, f"<rule:{rule_id}>", "eval")
+
+def _compile_rule(rule_id: str, mode: str, sources: List[str], params: Mapping[str, Any], **effect: Any) -> Rule:
+    conds = []
+    for src in sources:
+        expr, refs, nullable = _parse_condition(str(src), params)
+        conds.append(Condition(source=str(src), expr=expr, refs=refs, nullable=nullable))
+    if not conds:
+        raise RuleCompileError(f"Rule {rule_id} has no conditions")
+    return Rule(
+        id=rule_id, mode=mode, conditions=tuple(conds), params=dict(params),
+        code=_scalar_code(rule_id, mode, conds), **effect,
+    )
+
+def compile_ruleset(obj: Any, on_error: str = "skip") -> "CompiledRuleset":
+    """
+    Compile a parsed YAML object (structured or legacy). Disabled rules are dropped.
+    on_error="skip" drops rules that fail to compile (reported in .errors); "raise" re-raises.
+    """
+    rules: List[Rule] = []
+    errors: Dict[str, str] = {}
+    meta: Dict[str, Any] = {}
+
+    def _add(rule_id: str, build: Callable[[], Rule]) -> None:
+        try:
+            rules.append(build())
+        except RuleCompileError as e:
+            if on_error == "raise":
+                raise
+            errors[rule_id] = str(e)
+
+    if isinstance(obj, dict):
+        meta = dict(obj.get("meta") or {})
+        defaults = obj.get("defaults") or {}
+        for i, r in enumerate(obj.get("rules") or []):
+            if not isinstance(r, dict) or not r.get("enabled", True):
+                continue
+            rule_id = str(r.get("id") or r.get("name") or f"rule_{i}")
+            when = r.get("when") or {}
+            if "condition" in r and not when:
+                mode, sources = "all", [r["condition"]]
+            else:
+                mode = "any" if "any" in when else "all"
+                sources = list(when.get(mode) or [])
+            effect = {**defaults, **(r.get("effect") or {})}
+            _add(rule_id, lambda: _compile_rule(
+                rule_id, mode, sources, r.get("params") or {},
+                action=effect.get("action"),
+                score_delta=float(effect.get("score_delta") or 0.0),
+                severity=effect.get("severity"),
+                reasons=tuple(effect.get("reasons") or ()),
+                description=str(r.get("description") or ""),
+            ))
+    elif isinstance(obj, list):
+        for i, r in enumerate(obj):
+            if not (isinstance(r, dict) and "condition" in r and "name" in r) or not r.get("enabled", True):
+                continue
+            rule_id = str(r["name"])
+            _add(rule_id, lambda: _compile_rule(
+                rule_id, "all", [r["condition"]], r.get("params") or {},
+                action=r.get("action") or "flag", score_delta=float(r.get("score_delta") or 0.0),
+            ))
+    return CompiledRuleset(rules=tuple(rules), errors=errors, meta=meta)
+
+def load_ruleset(path, on_error: str = "skip") -> "CompiledRuleset":
+    path = Path(path)
+    if not path.exists():
+        return CompiledRuleset()
+    import yaml
+
+    with path.open("r", encoding="utf-8") as f:
+        obj = yaml.safe_load(f)
+    return compile_ruleset(obj, on_error=on_error)
+
+# ---------- Evaluators ----------
+_EVAL_GLOBALS: Dict[str, Any] = {"__builtins__": {}}
+_EMPTY: Dict[str, Any] = {}
+
+# operator.* (not np.equal & co.) so string/object columns compare on every NumPy version
+_CMP = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt, ast.LtE: operator.le,
+    ast.Gt: operator.gt, ast.GtE: operator.ge,
+}
+_BIN = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod,
+}
+
+class _MissingColumn(KeyError):
+    pass
+
+def _isna(v: Any) -> Any:
+    import pandas as pd
+
+    return pd.isna(v)
+
+def _vec(node: ast.AST, col: Callable[[str, str], np.ndarray]) -> Any:
+    """Evaluate a normalized expression over column arrays (NumPy broadcasting)."""
+    if isinstance(node, ast.Expression):
+        return _vec(node.body, col)
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, (ast.Tuple, ast.List, ast.Set)):
+        return tuple(e.value for e in node.elts)
+    if isinstance(node, ast.Subscript):
+        return col(node.value.id, node.slice.value)
+    if isinstance(node, ast.BoolOp):
+        fn = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        out = _vec(node.values[0], col)
+        for v in node.values[1:]:
+            out = fn(out, _vec(v, col))
+        return out
+    if isinstance(node, ast.UnaryOp):
+        v = _vec(node.operand, col)
+        if isinstance(node.op, ast.Not):
+            return np.logical_not(v)
+        return np.negative(v) if isinstance(node.op, ast.USub) else v
+    if isinstance(node, ast.BinOp):
+        return _BIN[type(node.op)](_vec(node.left, col), _vec(node.right, col))
+    if isinstance(node, ast.IfExp):
+        return np.where(np.asarray(_vec(node.test, col), dtype=bool), _vec(node.body, col), _vec(node.orelse, col))
+    if isinstance(node, ast.Compare):
+        left = _vec(node.left, col)
+        out = True
+        for op, comp in zip(node.ops, node.comparators):
+            right = _vec(comp, col)
+            if isinstance(op, (ast.In, ast.NotIn)):
+                res = np.isin(left, list(right))
+                res = np.logical_not(res) if isinstance(op, ast.NotIn) else res
+            elif isinstance(op, (ast.Is, ast.IsNot)):  # right is None (checked at compile time)
+                res = _isna(left)
+                res = np.logical_not(res) if isinstance(op, ast.IsNot) else res
+            else:
+                res = _CMP[type(op)](left, right)
+            out = np.logical_and(out, res)
+            left = right
+        return out
+    raise RuleCompileError(f"Unsupported node in vector evaluator: {type(node).__name__}")
+
+@dataclass(frozen=True)
+class CompiledRuleset:
+    rules: Tuple[Rule, ...] = ()
+    errors: Dict[str, str] = field(default_factory=dict)
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def __iter__(self):
+        return iter(self.rules)
+
+    @property
+    def version(self) -> Optional[str]:
+        v = self.meta.get("version")
+        return str(v) if v is not None else None
+
+    def ctx_fields(self) -> Tuple[str, ...]:
+        """ctx.* fields referenced by any rule."""
+        return tuple(dict.fromkeys(k for r in self.rules for c in r.conditions for ns, k in c.refs if ns == "ctx"))
+
+    def params_for_ctx(self, ctx_field: str) -> Dict[str, Any]:
+        """params of the first rule that reads ctx.<ctx_field> (e.g. velocity window/multiplier)."""
+        for r in self.rules:
+            if any(ref == ("ctx", ctx_field) for c in r.conditions for ref in c.refs):
+                return dict(r.params)
+        return {}
+
+    # --- scalar path (one transaction) ---
+    def evaluate_one(self, tx: Mapping[str, Any], ctx: Optional[Mapping[str, Any]] = None) -> RuleHits:
+        """Rules hit by one transaction (one eval of a prebuilt code object per rule)."""
+        scope = {"tx": tx, "ctx": ctx if ctx is not None else _EMPTY}
+        hits: List[Rule] = []
+        for rule in self.rules:
+            try:
+                if eval(rule.code, _EVAL_GLOBALS, scope):
+                    hits.append(rule)
+            except Exception:
+                continue
+        return RuleHits(tuple(hits))
+
+    # --- vector path (many transactions) ---
+    def evaluate_columns(self, cols: Mapping[str, Any], n: int) -> Dict[str, np.ndarray]:
+        """
+        Boolean mask (length n) per rule over column arrays. tx.f reads column `f`;
+        ctx.f reads `ctx_f` (falling back to `f`). Missing columns never hit.
+        """
+        import pandas as pd
+
+        cache: Dict[Ref, Tuple[np.ndarray, np.ndarray]] = {}
+
+        def resolve(ref: Ref) -> Tuple[np.ndarray, np.ndarray]:
+            if ref not in cache:
+                ns, key = ref
+                names = [f"ctx_{key}", key] if ns == "ctx" else [key]
+                name = next((c for c in names if c in cols), None)
+                if name is None:
+                    raise _MissingColumn(key)
+                arr = np.asarray(cols[name])
+                cache[ref] = (arr, ~pd.isna(arr))
+            return cache[ref]
+
+        def condition(c: Condition) -> np.ndarray:
+            m = np.zeros(n, dtype=bool)
+            try:
+                valid = np.ones(n, dtype=bool)
+                for ref in c.refs:
+                    if ref in c.nullable:
+                        resolve(ref)  # must exist, may be null
+                    else:
+                        valid &= resolve(ref)[1]
+            except _MissingColumn:
+                return m
+            # only the non-null rows: a None in an object column must not fail the others
+            rows = slice(None) if valid.all() else np.flatnonzero(valid)
+            try:
+                sub = _vec(c.expr, lambda ns, key: resolve((ns, key))[0][rows])
+                m[rows] = np.broadcast_to(np.asarray(sub, dtype=bool), m[rows].shape)
+            except (TypeError, ValueError):
+                # mixed types among non-null values: row by row, as evaluate_one would
+                code = compile(c.expr, f"<cond:{c.source}>", "eval")
+                for i in np.flatnonzero(valid):
+                    scope = {"tx": {}, "ctx": {}}
+                    for ns, key in c.refs:
+                        scope[ns][key] = resolve((ns, key))[0][i]
+                    try:
+                        m[i] = bool(eval(code, _EVAL_GLOBALS, scope))
+                    except Exception:
+                        pass
+            return m
+
+        out: Dict[str, np.ndarray] = {}
+        for rule in self.rules:
+            masks = [condition(c) for c in rule.conditions]
+            fn = np.logical_or if rule.mode == "any" else np.logical_and
+            out[rule.id] = fn.reduce(masks) if len(masks) > 1 else masks[0]
+        return out
+
+    def hits_for_rows(self, cols: Mapping[str, Any], n: int) -> List[RuleHits]:
+        """Per-row RuleHits from the vector path (used by batch scoring)."""
+        masks = self.evaluate_columns(cols, n)
+        hits: List[List[Rule]] = [[] for _ in range(n)]
+        for rule in self.rules:
+            for i in np.flatnonzero(masks[rule.id]):
+                hits[i].append(rule)
+        return [RuleHits(tuple(h)) for h in hits]
 
 class RulesEngine:
     def __init__(self, rules_path):
-        with open(rules_path, "r", encoding="utf-8") as f:
-            self.rules = yaml.safe_load(f) or []
+        self.ruleset = load_ruleset(rules_path)
+        self.rules = list(self.ruleset.rules)
 
     def evaluate(self, df: pd.DataFrame) -> pd.DataFrame:
         out = df.copy()
-        def norm(expr: str) -> str:
-            # keep as-is; placeholders for future normalization if needed
-            return expr
-        for i, r in enumerate(self.rules):
-            name = r.get("name", f"rule_{i}")
-            cond = norm(r["condition"])
-            try:
-                mask = out.eval(cond, engine="python", parser="pandas")
-            except Exception:
-                mask = pd.Series(False, index=out.index)
-            out[f"rule__{name}"] = mask.astype(int)
+        masks = self.ruleset.evaluate_columns({c: out[c].to_numpy() for c in out.columns}, len(out))
+        flag = np.zeros(len(out), dtype=bool)
+        review = np.zeros(len(out), dtype=bool)
+        delta = np.zeros(len(out), dtype=float)
+        for rule in self.ruleset.rules:
+            m = masks[rule.id]
+            out[f"rule__{rule.id}"] = m.astype(int)
+            if rule.action == "flag":
+                flag |= m
+            if rule.action == "review":
+                review |= m
+            delta += m * rule.score_delta
         # aggregate to flags/review
-        out["rule_flag"] = 0
-        out["rule_review"] = 0
-        for i, r in enumerate(self.rules):
-            name = r.get("name", f"rule_{i}")
-            col = f"rule__{name}"
-            if r.get("action") == "flag":
-                out["rule_flag"] = out["rule_flag"] | out[col]
-            if r.get("action") == "review":
-                out["rule_review"] = out["rule_review"] | out[col]
+        out["rule_flag"] = flag.astype(int)
+        out["rule_review"] = review.astype(int)
+        out["rule_score_delta"] = delta
         return out
-# ===== END: rules_engine.py =====
\ No newline at end of file
+# ===== END: rules_engine.py =====
@@ -0,0 +1,343 @@
+"""
+Seeded, vectorized synthetic data at scale (1e4 .. 1e8 rows) for the credit
+and fraud pipelines.
+
+Kinds:
+  loans         loans.csv schema: borrower_id, loan_amount, annual_income,
+                delinq_2yrs, revol_util ("12.5%"), loan_status, grade, state,
+                vintage_year. Bad statuses follow a PD driven by grade, DTI,
+                delinquencies and utilisation.
+  transactions  raw/transactions.csv schema + the is_chargeback fraud label.
+                Per user: home country, preferred hour, spend level, a main
+                device and a few secondary ones. Compromised users end with a
+                burst of fraud (new device, often foreign, larger amounts,
+                night hours, minutes apart). Rows are ordered by user, then time.
+  logs          fraud API decision logs, one <YYYYMMDD>.jsonl per day (same
+                line schema as api/app.py /score), time-ordered within a day.
+
+Rows are produced and written one chunk at a time (--chunk-rows), so memory
+stays bounded whatever --rows is (about 0.6 GB peak at the default 5e5). Parquet output is one file with a row group
+per chunk; CSV is appended chunk by chunk. Chunk i draws from
+default_rng([seed, kind, i]): the same --seed / --rows / --chunk-rows always
+give the same files.
+
+Usage:
+  python scripts/generate_synthetic_data.py --kinds loans transactions --rows 1e6
+  python scripts/generate_synthetic_data.py --kinds logs --rows 1e7 --days 7 --out-dir /data/synth
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+# ---------- CONFIG ----------
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_OUT = {
+    "loans": REPO_ROOT / "credit_scoring_system" / "data" / "synthetic",
+    "transactions": REPO_ROOT / "fraud_detection_system" / "data" / "synthetic",
+    "logs": REPO_ROOT / "fraud_detection_system" / "data" / "synthetic" / "logs",
+}
+KIND_IDS = {"loans": 1, "transactions": 2, "logs": 3}
+
+GRADES = np.array(list("ABCDEFG"))
+GRADE_P = np.array([0.17, 0.29, 0.27, 0.15, 0.08, 0.03, 0.01])
+STATES = np.array(["CA", "TX", "NY", "FL", "IL", "PA", "OH", "GA", "NC", "MI", "NJ", "VA", "WA", "AZ", "MA",
+                   "TN", "IN", "MO", "MD", "WI", "CO", "MN", "SC", "AL", "LA", "KY", "OR", "OK", "CT", "UT"])
+GOOD_STATUS = np.array(["Current", "Fully Paid"])
+BAD_STATUS = np.array(["Charged Off", "Default"])
+COUNTRIES = np.array(["US", "GB", "CA", "DE", "FR", "IN", "BR", "NG", "MX", "ES"])
+COUNTRY_P = np.array([0.72, 0.06, 0.05, 0.04, 0.03, 0.03, 0.02, 0.02, 0.02, 0.01])
+ODD_HOURS = np.array([0, 1, 2, 3, 4, 5, 23])
+
+TX_PER_USER = 20          # mean transactions per user over the period
+COMPROMISED_USERS = 0.02  # share of users whose history ends in a fraud burst
+MODEL_TS = "20251109_205733"
+
+
+# ---------- HELPERS ----------
+def _ids(prefix: str, start: int, n: int, width: int) -> np.ndarray:
+    return np.char.add(prefix, np.char.zfill(np.arange(start, start + n).astype(str), width))
+
+def _chunks(rows: int, chunk_rows: int) -> Iterator[tuple[int, int, int]]:
+    """(chunk index, row offset, rows in chunk)."""
+    for i, off in enumerate(range(0, rows, chunk_rows)):
+        yield i, off, min(chunk_rows, rows - off)
+
+def _rng(seed: int, kind: str, chunk: int, sub: int = 0) -> np.random.Generator:
+    return np.random.default_rng([seed, KIND_IDS[kind], chunk, sub])
+
+
+class ChunkWriter:
+    """Append DataFrame chunks to one Parquet (row group per chunk) or CSV file."""
+
+    def __init__(self, path: Path, fmt: str):
+        self.path = path
+        self.fmt = fmt
+        self.rows = 0
+        self._pq = None
+        self._schema = None
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists():
+            path.unlink()
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._pq is None:
+                self._schema = table.schema
+                self._pq = pq.ParquetWriter(self.path, self._schema, compression="snappy")
+            self._pq.write_table(table.cast(self._schema))
+        else:
+            df.to_csv(self.path, mode="a", header=self.rows == 0, index=False, date_format="%Y-%m-%dT%H:%M:%S")
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self._pq is not None:
+            self._pq.close()
+
+
+# ---------- LOANS ----------
+def loans_chunk(rng: np.random.Generator, offset: int, n: int) -> pd.DataFrame:
+    grade_idx = rng.choice(len(GRADES), n, p=GRADE_P)
+    income = np.round(rng.lognormal(11.05, 0.55, n), -2)
+    # loan size scales loosely with income; a few jumbo loans
+    loan = np.clip(np.round(income * rng.uniform(0.05, 0.45, n), -2), 1_000, 40_000)
+    jumbo = rng.random(n) < 0.002
+    loan[jumbo] = np.round(rng.uniform(100_000, 500_000, jumbo.sum()), -3)
+    delinq = rng.poisson(0.15 + 0.12 * grade_idx)
+    util = np.clip(rng.normal(35 + 7 * grade_idx, 20, n), 0, 150)
+    vintage = rng.integers(2007, 2025, n)
+
+    logit = -4.3 + 0.45 * grade_idx + 0.35 * delinq + 0.012 * util + 1.6 * (loan / income) + 0.05 * (vintage - 2016)
+    bad = rng.random(n) < 1.0 / (1.0 + np.exp(-logit))
+    status = np.where(bad, rng.choice(BAD_STATUS, n), rng.choice(GOOD_STATUS, n, p=[0.6, 0.4]))
+
+    revol = np.char.add(np.char.mod("%.1f", np.round(util, 1)), "%")
+    revol = np.where(rng.random(n) < 0.01, "", revol)  # missing utilisation, as in raw bureau files
+    return pd.DataFrame({
+        "borrower_id": _ids("B", offset, n, 9),
+        "loan_amount": loan.astype(np.int64),
+        "annual_income": income.astype(np.int64),
+        "delinq_2yrs": delinq,
+        "revol_util": revol,
+        "loan_status": status,
+        "grade": GRADES[grade_idx],
+        "state": rng.choice(STATES, n),
+        "vintage_year": vintage,
+    })
+
+
+# ---------- TRANSACTIONS ----------
+def transactions_chunk(
+    rng: np.random.Generator, tx_offset: int, user_offset: int, n: int, start: np.datetime64, days: int
+) -> tuple[pd.DataFrame, int]:
+    """n transactions from fresh users starting at user_offset; returns (frame, users used)."""
+    # transactions per user ~ 1 + negative binomial (mean TX_PER_USER, long tail)
+    n_users = max(1, int(n / TX_PER_USER * 1.3) + 10)
+    counts = 1 + rng.negative_binomial(2, 2 / (2 + TX_PER_USER - 1), n_users)
+    cum = np.cumsum(counts)
+    k = int(np.searchsorted(cum, n))  # users 0..k cover n rows
+    if k >= n_users:
+        counts[-1] += n - cum[-1]
+        k = n_users - 1
+    counts = counts[: k + 1].copy()
+    counts[-1] -= int(counts.sum()) - n
+    n_users = len(counts)
+
+    # per-user profile
+    home = rng.choice(len(COUNTRIES), n_users, p=COUNTRY_P)
+    pref_hour = np.where(rng.random(n_users) < 0.85, rng.normal(14, 3, n_users), rng.normal(21, 2, n_users))
+    spend_mu = rng.normal(3.9, 0.6, n_users)
+    n_devices = 1 + rng.poisson(0.4, n_users)
+    age0 = rng.exponential(700, n_users).astype(np.int64)
+    compromised = (rng.random(n_users) < COMPROMISED_USERS) & (counts >= 3)
+    n_fraud = np.where(compromised, np.minimum(counts - 1, 1 + rng.poisson(2, n_users)), 0)
+
+    user = np.repeat(np.arange(n_users), counts)
+    pos = np.arange(n) - np.repeat(np.cumsum(counts) - counts, counts)  # index within the user's history
+    fraud = pos >= np.repeat(counts - n_fraud, counts)
+    nf = int(fraud.sum())
+
+    # normal activity: any day of the period, around the user's preferred hour
+    day = rng.integers(0, days, n)
+    hour = np.mod(np.round(rng.normal(pref_hour[user], 3.0)), 24).astype(np.int64)
+    secs = day * 86_400 + hour * 3_600 + rng.integers(0, 3_600, n)
+    # fraud burst: one night per compromised user, transactions minutes apart
+    burst_day = rng.integers(0, days, n_users)
+    burst_hour = rng.choice(ODD_HOURS, n_users)
+    burst_at = burst_day * 86_400 + burst_hour * 3_600
+    secs[fraud] = burst_at[user[fraud]] + rng.integers(0, 1_800, nf)
+    secs = np.minimum(secs, days * 86_400 - 1)
+
+    device_idx = np.where(rng.random(n) < 0.8, 0, rng.integers(0, n_devices[user]))
+    device = np.char.add(np.char.add("D", np.char.zfill((user_offset + user).astype(str), 9)),
+                         np.char.add("_", device_idx.astype(str)))
+    device[fraud] = np.char.add("DX", rng.integers(0, 10**9, nf).astype(str))
+
+    country_idx = np.where(rng.random(n) < 0.97, home[user], rng.choice(len(COUNTRIES), n, p=COUNTRY_P))
+    foreign = fraud & (rng.random(n) < 0.6)
+    country_idx[foreign] = (home[user[foreign]] + rng.integers(1, len(COUNTRIES), int(foreign.sum()))) % len(COUNTRIES)
+
+    amount = rng.lognormal(spend_mu[user], 0.8)
+    amount[fraud] = rng.lognormal(spend_mu[user[fraud]] + 1.6, 0.7)
+
+    n_merchants = max(10, n // 200)
+    merchant = (n_merchants * rng.random(n) ** 2.5).astype(np.int64)  # a few merchants get most traffic
+    merchant[fraud] = rng.integers(0, max(1, n_merchants // 100), nf)  # fraud concentrates on a few
+
+    order = np.lexsort((secs, user))
+    ts = start + secs[order].astype("timedelta64[s]")
+    df = pd.DataFrame({
+        "transaction_id": _ids("T", tx_offset, n, 10),
+        "user_id": np.char.add("U", np.char.zfill((user_offset + user[order]).astype(str), 9)),
+        "merchant_id": np.char.add("M", merchant[order].astype(str)),
+        "device_id": device[order],
+        "amount": np.round(amount[order], 2),
+        "timestamp": ts,
+        "is_chargeback": fraud[order].astype(np.int8),
+        "country": COUNTRIES[country_idx[order]],
+        "account_age_days": age0[user[order]] + secs[order] // 86_400,
+        "hour_of_day": (secs[order] // 3_600) % 24,
+    })
+    return df, n_users
+
+
+# ---------- FRAUD API LOGS ----------
+def _fmt(values, spec: str) -> pd.Series:
+    return pd.Series(np.char.mod(spec, values), dtype=object)
+
+def _json_str(values) -> pd.Series:
+    return '"' + pd.Series(values, dtype=object) + '"'
+
+def logs_chunk(rng: np.random.Generator, day_start: np.datetime64, t0: int, t1: int, n: int, tx_offset: int) -> pd.Series:
+    """n API log lines with times in [day_start + t0, day_start + t1) seconds, in time order."""
+    secs = np.sort(rng.integers(t0, t1, n))
+    ts = np.datetime_as_string(day_start + secs.astype("timedelta64[s]"), unit="s")
+    hour = (secs // 3_600) % 24
+
+    n_accounts = max(100, n * 5)
+    account = (n_accounts * rng.random(n) ** 2).astype(np.int64)
+    fraud = rng.random(n) < 0.004 + 0.02 * np.isin(hour, ODD_HOURS)
+    amount = np.round(rng.lognormal(np.where(fraud, 5.5, 3.9), 0.9), 2)
+    age = np.where(rng.random(n) < 0.05, rng.integers(0, 30, n), rng.integers(30, 3_000, n))
+    country = rng.choice(COUNTRIES, n, p=COUNTRY_P)
+    home = np.where(rng.random(n) < 0.9, country, "US")
+    device_new = rng.random(n) < np.where(fraud, 0.7, 0.03)
+    velocity = rng.random(n) < np.where(fraud, 0.5, 0.005)
+
+    # rules_v1.yml evaluated on the synthetic tx / ctx
+    r1 = (amount >= 10_000) & (age < 30)
+    r3 = (country != home) & np.isin(hour, ODD_HOURS)
+    r4 = (amount >= 7_500) & device_new & (age < 365)
+    names = ["R001_HIGH_AMOUNT_NEW_ACCOUNT", "R002_VELOCITY_SPIKE", "R003_CROSS_BORDER_ODD_HOURS", "R004_HIGH_AMOUNT_NEW_DEVICE"]
+    hits = np.stack([r1, velocity, r3, r4], axis=1)
+    rules = pd.Series(["[]"] * n, dtype=object)
+    any_hit = hits.any(axis=1)
+    if any_hit.any():
+        rules[any_hit] = ["[" + ", ".join(f'"{names[j]}"' for j in np.flatnonzero(row)) + "]" for row in hits[any_hit]]
+
+    proba = np.round(np.where(fraud, rng.beta(5, 2, n), rng.beta(0.6, 25, n)), 6)
+    decision = np.where((proba >= 0.5) | any_hit, "flag", "allow")
+    arm = np.where(rng.random(n) < 0.1, "cand", "prod")
+    predict = np.round(rng.gamma(2.0, 0.6, n), 3)
+    latency = np.round(predict + rng.gamma(2.0, 0.4, n), 3)
+    txid = _ids("L", tx_offset, n, 10)
+
+    return (
+        '{"ts": ' + _json_str(ts) + ', "arm": ' + _json_str(arm)
+        + ', "tx": {"amount": ' + _fmt(amount, "%.2f") + ', "account_age_days": ' + _fmt(age, "%d")
+        + ', "country": ' + _json_str(country) + ', "device_id": ' + _json_str(np.char.add("D", (account * 3 + device_new).astype(str)))
+        + ', "hour_of_day": ' + _fmt(hour, "%d") + ', "account_id": ' + _json_str(np.char.add("A", account.astype(str)))
+        + ', "transaction_id": ' + _json_str(txid) + '}'
+        + ', "ctx": {"velocity_spike": ' + pd.Series(np.where(velocity, "true", "false"), dtype=object)
+        + ', "home_country": ' + _json_str(home) + ', "device_is_new": ' + pd.Series(np.where(device_new, "true", "false"), dtype=object) + '}'
+        + ', "proba": ' + _fmt(proba, "%.6f") + ', "decision": ' + _json_str(decision) + ', "rules_hit": ' + rules
+        + ', "latency_ms": ' + _fmt(latency, "%.3f")
+        + ', "stages_ms": {"parse": 0.04, "ctx": 0.02, "rules": 0.03, "frame": 0.2, "predict": ' + _fmt(predict, "%.3f") + '}'
+        + ', "model_ts": "' + MODEL_TS + '"}'
+    )
+
+
+# ---------- MAIN ----------
+def write_loans(out: Path, rows: int, chunk_rows: int, seed: int, fmt: str) -> Path:
+    path = out / f"loans.{fmt}"
+    w = ChunkWriter(path, fmt)
+    for i, off, n in _chunks(rows, chunk_rows):
+        w.write(loans_chunk(_rng(seed, "loans", i), off, n))
+    w.close()
+    return path
+
+def write_transactions(out: Path, rows: int, chunk_rows: int, seed: int, fmt: str, start: np.datetime64, days: int) -> Path:
+    path = out / f"transactions.{fmt}"
+    w = ChunkWriter(path, fmt)
+    users = 0
+    for i, off, n in _chunks(rows, chunk_rows):
+        df, used = transactions_chunk(_rng(seed, "transactions", i), off, users, n, start, days)
+        users += used
+        w.write(df)
+    w.close()
+    return path
+
+def write_logs(out: Path, rows: int, chunk_rows: int, seed: int, start: np.datetime64, days: int) -> list[Path]:
+    out.mkdir(parents=True, exist_ok=True)
+    paths, offset = [], 0
+    per_day = np.full(days, rows // days)
+    per_day[: rows % days] += 1
+    for d in range(days):
+        day_start = start + np.timedelta64(d, "D")
+        path = out / f"{pd.Timestamp(day_start):%Y%m%d}.jsonl"
+        n_day = int(per_day[d])
+        n_chunks = max(1, -(-n_day // chunk_rows))
+        with path.open("w", encoding="utf-8", newline="\n") as f:
+            for i, _, n in _chunks(n_day, chunk_rows):
+                # chunk i covers its own slice of the day, so the file stays time-ordered
+                t0, t1 = 86_400 * i // n_chunks, max(86_400 * (i + 1) // n_chunks, 86_400 * i // n_chunks + 1)
+                lines = logs_chunk(_rng(seed, "logs", d, i), day_start, t0, t1, n, offset)
+                f.write("\n".join(lines.tolist()) + "\n")
+                offset += n
+        paths.append(path)
+    return paths
+
+def _rows(s: str) -> int:
+    return int(float(s))
+
+def main(argv: Optional[list[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Seeded synthetic loans / transactions / fraud API logs at scale.")
+    ap.add_argument("--kinds", nargs="+", choices=list(KIND_IDS), default=list(KIND_IDS))
+    ap.add_argument("--rows", type=_rows, default=100_000, help="rows per kind, e.g. 1e4 .. 1e8 (logs: over all days)")
+    ap.add_argument("--chunk-rows", type=_rows, default=500_000, help="rows generated and written at a time")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--format", choices=["parquet", "csv"], default="parquet", help="loans / transactions file format")
+    ap.add_argument("--start", default="2025-09-01", help="first day of transactions / logs")
+    ap.add_argument("--days", type=int, default=30, help="days covered by transactions / logs")
+    ap.add_argument("--out-dir", type=Path, help="write every kind here instead of the per-system data/synthetic dirs")
+    args = ap.parse_args(argv)
+
+    start = np.datetime64(dt.date.fromisoformat(args.start), "s")
+    chunk = max(1, args.chunk_rows)
+    out: Dict[str, Path] = {k: (args.out_dir / k if k == "logs" else args.out_dir) if args.out_dir else v for k, v in DEFAULT_OUT.items()}
+    for kind in args.kinds:
+        t0 = time.perf_counter()
+        if kind == "loans":
+            written = [write_loans(out[kind], args.rows, chunk, args.seed, args.format)]
+        elif kind == "transactions":
+            written = [write_transactions(out[kind], args.rows, chunk, args.seed, args.format, start, args.days)]
+        else:
+            written = write_logs(out[kind], args.rows, chunk, args.seed, start, args.days)
+        mb = sum(p.stat().st_size for p in written) / 2**20
+        where = written[0] if len(written) == 1 else f"{out[kind]} ({len(written)} files)"
+        print(f"[OK] {kind}: {args.rows:,} rows, {mb:,.1f} MB in {time.perf_counter() - t0:.1f}s -> {where}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
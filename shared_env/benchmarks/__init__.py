@@ -0,0 +1,15 @@
+"""
+Hot-path microbenchmarks for the fraud, credit and monitoring code.
+
+  python -m shared_env.benchmarks run [--sizes 1e3 1e4 1e5] [--only fraud.]
+  python -m shared_env.benchmarks compare <base sha|json> [<new sha|json>] [--threshold 0.10]
+
+`run` times every case in cases.py at each size (rows) and records its peak
+traced memory, then writes docs_global/benchmarks/bench_<short sha>[-dirty].json.
+`compare` diffs two such files and exits 1 when a case got slower or heavier
+than the threshold allows.
+"""
+from .cases import CASES, Case
+from .runner import compare_results, run_cases
+
+__all__ = ["CASES", "Case", "compare_results", "run_cases"]
@@ -0,0 +1,110 @@
+"""
+Usage:
+  python -m shared_env.benchmarks list
+  python -m shared_env.benchmarks run [--sizes 1e3 1e4 1e5] [--only fraud credit.predict_pd] [--no-memory]
+  python -m shared_env.benchmarks compare <base> [<new>] [--threshold 0.10] [--mem-threshold 0.25]
+  python -m shared_env.benchmarks pipeline --rows 1e6 [--chains credit fraud] [--window-min 60] [--keep]
+
+<base>/<new> are result files or commits (default new: the current checkout's
+file). compare exits 1 when any case regressed, so it can gate CI.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from .cases import CASES
+from .pipeline import run_pipeline, write_report
+from .runner import RESULTS_DIR, compare_results, git_state, load_results, result_path, run_cases
+
+def _size(s: str) -> int:
+    return int(float(s))
+
+def cmd_list(_args: argparse.Namespace) -> int:
+    for c in CASES.values():
+        print(f"{c.name:<32} {c.group:<11} max_n={c.max_n:,} ({c.unit})")
+    return 0
+
+def cmd_run(args: argparse.Namespace) -> int:
+    report = run_cases(sorted(set(args.sizes)), args.only, args.seed, args.repeats, args.budget, not args.no_memory)
+    out = args.out or result_path(report["meta"], args.out_dir)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"[OK] Benchmark results written to: {out}")
+    return 1 if any("error" in r for r in report["results"]) else 0
+
+def cmd_compare(args: argparse.Namespace) -> int:
+    base = load_results(args.base, args.out_dir)
+    new = load_results(args.new, args.out_dir) if args.new else json.loads(result_path(git_state(), args.out_dir).read_text(encoding="utf-8"))
+    rows = compare_results(base, new, args.threshold, args.mem_threshold, args.min_time)
+    print(f"base {base['meta']['commit']}{' (dirty)' if base['meta'].get('dirty') else ''} -> "
+          f"new {new['meta']['commit']}{' (dirty)' if new['meta'].get('dirty') else ''}")
+    print(f"{'case':<32} {'n':>9} {'base s':>10} {'new s':>10} {'x time':>7} {'base MB':>9} {'new MB':>9} {'x mem':>6}")
+    for r in rows:
+        flag = "  <-- " + "+".join(r["regression"]) if r["regression"] else ""
+        print(
+            f"{r['case']:<32} {r['n']:>9} {r['time_base_s']:>10.4f} {r['time_new_s']:>10.4f} {r['time_ratio'] or 0:>7.2f} "
+            f"{r['peak_base_mb'] if r['peak_base_mb'] is not None else '-':>9} "
+            f"{r['peak_new_mb'] if r['peak_new_mb'] is not None else '-':>9} {r['peak_ratio'] or 0:>6.2f}{flag}"
+        )
+    bad = [r for r in rows if r["regression"]]
+    if bad:
+        print(f"[FAIL] {len(bad)} regression(s) beyond {args.threshold:.0%}")
+        return 1
+    print(f"[OK] No regressions beyond {args.threshold:.0%} ({len(rows)} comparable results)")
+    return 0
+
+def cmd_pipeline(args: argparse.Namespace) -> int:
+    report = run_pipeline(args.rows, args.log_rows, args.chains, args.seed, args.chunk_rows,
+                          args.workspace, args.keep, args.window_min)
+    stem = write_report(report, args.out_dir)
+    for chain, t in report["totals"].items():
+        over = " OVER WINDOW" if t["over_window"] else ""
+        print(f"[{'OK' if t['ok'] else 'FAIL'}] {chain}: {t['wall_s']:.1f}s wall, peak RSS {t['peak_rss_mb']} MB{over}")
+    print(f"[OK] Pipeline report written to: {stem}.{{json,html}}")
+    return 0 if all(t["ok"] for t in report["totals"].values()) else 1
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m shared_env.benchmarks", description="Hot-path microbenchmarks.")
+    ap.add_argument("--out-dir", type=Path, default=RESULTS_DIR)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("list", help="list the benchmark cases").set_defaults(func=cmd_list)
+
+    run = sub.add_parser("run", help="run the cases and write bench_<commit>.json")
+    run.add_argument("--sizes", type=_size, nargs="+", default=[1_000, 10_000, 100_000],
+                     help="rows per case, e.g. 1e3 1e5 1e7 (cases stop at their max_n)")
+    run.add_argument("--only", nargs="+", help="case name prefixes or groups (fraud, credit, monitoring, reports)")
+    run.add_argument("--repeats", type=int, default=5)
+    run.add_argument("--budget", type=float, default=10.0, help="stop repeating a size after this many seconds")
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory run")
+    run.add_argument("--out", type=Path, help="result file (default: <out-dir>/bench_<commit>[-dirty].json)")
+    run.set_defaults(func=cmd_run)
+
+    cmp_ = sub.add_parser("compare", help="flag regressions between two result files / commits")
+    cmp_.add_argument("base")
+    cmp_.add_argument("new", nargs="?")
+    cmp_.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown (0.10 = +10%%)")
+    cmp_.add_argument("--mem-threshold", type=float, help="allowed relative peak-memory growth (default: --threshold)")
+    cmp_.add_argument("--min-time", type=float, default=1e-3, help="ignore slowdowns smaller than this many seconds")
+    cmp_.set_defaults(func=cmd_compare)
+
+    pipe = sub.add_parser("pipeline", help="run the daily credit / fraud chains end to end, timed per stage")
+    pipe.add_argument("--rows", type=_size, default=100_000, help="loans and transactions to generate (1e4 .. 1e8)")
+    pipe.add_argument("--log-rows", type=_size, help="fraud API log lines over yesterday + today (default: --rows)")
+    pipe.add_argument("--chains", nargs="+", choices=["credit", "fraud"], default=["credit", "fraud"])
+    pipe.add_argument("--chunk-rows", type=_size, default=500_000, help="generator chunk size")
+    pipe.add_argument("--seed", type=int, default=42)
+    pipe.add_argument("--window-min", type=float, help="nightly batch window; chains over it are flagged")
+    pipe.add_argument("--workspace", type=Path, help="workspace dir (kept); default: a temp dir removed afterwards")
+    pipe.add_argument("--keep", action="store_true", help="keep the temp workspace (stage logs, outputs)")
+    pipe.set_defaults(func=cmd_pipeline)
+
+    args = ap.parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""
+Benchmark cases: the functions that run once per request or once per row in
+the daily jobs, fed with seeded synthetic data shaped like the real inputs.
+
+A case's `setup(n, rng)` builds the data for n rows (untimed) and returns
+`prepare`; every timed run calls `prepare()` first (also untimed) and then times
+the zero-arg callable it returns. Functions that mutate their input therefore
+get a fresh copy on each run. `max_n` caps cases whose cost per row makes the
+larger sizes impractical (per-request calls, Python loops, JSONL files on disk).
+
+Scripts under */scripts and shared_env/monitoring are not packages, so they
+are imported by path; a case whose module cannot be imported here (e.g. no
+mlflow or matplotlib) is reported as skipped instead of failing the run.
+"""
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[2]
+
+Prepare = Callable[[], Callable[[], Any]]
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    group: str
+    setup: Callable[[int, np.random.Generator], Prepare]
+    max_n: int = 10_000_000
+    unit: str = "rows"
+
+CASES: Dict[str, Case] = {}
+
+def case(name: str, group: str, max_n: int = 10_000_000, unit: str = "rows"):
+    def register(setup: Callable[[int, np.random.Generator], Prepare]):
+        CASES[name] = Case(name, group, setup, max_n, unit)
+        return setup
+    return register
+
+# ---------- imports ----------
+def _load(rel: str):
+    """Import a repo script by path, once."""
+    name = "_bench_" + Path(rel).stem
+    if name in sys.modules:
+        return sys.modules[name]
+    # score_credit_portfolio.py points mlflow at the repo's mlruns on import
+    os.environ.setdefault("MLFLOW_TRACKING_URI", (Path(tempfile.gettempdir()) / "bench_mlruns").as_uri())
+    spec = importlib.util.spec_from_file_location(name, ROOT / rel)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[name] = mod
+    try:
+        spec.loader.exec_module(mod)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return mod
+
+def _fraud_api():
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    import fraud_detection_system.api.app as api
+
+    return api
+
+# ---------- synthetic data ----------
+COUNTRIES = np.array(["US", "US", "US", "GB", "DE", "FR", "CA", "NG", "BR", "IN"])
+GRADES = np.array(list("ABCDEFG"))
+STATES = np.array(["CA", "TX", "NY", "FL", "IL", "PA", "OH", "GA", "NC", "MI"])
+T0 = np.datetime64("2025-09-01T00:00:00")
+
+def _users(n: int) -> int:
+    return max(1, n // 20)
+
+def _tx_columns(n: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    return {
+        "amount": np.round(rng.lognormal(4.0, 1.3, n), 2),
+        "account_age_days": rng.integers(0, 3000, n),
+        "country": rng.choice(COUNTRIES, n),
+        "device_id": np.char.add("D", rng.integers(0, max(1, n // 5), n).astype(str)),
+        "hour_of_day": rng.integers(0, 24, n),
+    }
+
+def _tx_dicts(n: int, rng: np.random.Generator) -> List[Dict[str, Any]]:
+    cols = _tx_columns(n, rng)
+    return pd.DataFrame(cols).to_dict("records")
+
+def _timestamps(n: int, rng: np.random.Generator, days: int = 30) -> np.ndarray:
+    """n distinct millisecond timestamps over `days`, in random order."""
+    slot = max(1, days * 86_400_000 // n)
+    ms = np.arange(n, dtype=np.int64) * slot + rng.integers(0, slot, n)
+    return T0 + rng.permutation(ms).astype("timedelta64[ms]")
+
+def _fraud_tx_frame(n: int, rng: np.random.Generator) -> pd.DataFrame:
+    """
+    Raw transactions as build_features_fraud.py reads them (30 days, ~20 tx per
+    user). Timestamps are distinct: compute_stream_features assigns its rolling
+    sums back by timestamp and raises on a timestamp shared by two users.
+    """
+    cols = _tx_columns(n, rng)
+    return pd.DataFrame({
+        "transaction_id": np.char.add("T", np.arange(n).astype(str)),
+        "user_id": np.char.add("U", rng.integers(0, _users(n), n).astype(str)),
+        "merchant_id": np.char.add("M", rng.integers(0, max(1, n // 100), n).astype(str)),
+        "device_id": cols["device_id"],
+        "amount": cols["amount"],
+        "timestamp": _timestamps(n, rng),
+        "is_chargeback": (rng.random(n) < 0.01).astype(int),
+        "country": cols["country"],
+    })
+
+def _loans_frame(n: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Raw loans as build_features_credit.py reads them (revol_util as '12.3%' strings)."""
+    util = np.round(rng.uniform(0, 120, n), 1).astype(str)
+    util = np.where(rng.random(n) < 0.02, "", np.char.add(util, "%"))
+    return pd.DataFrame({
+        "borrower_id": np.char.add("B", rng.integers(0, max(1, int(n * 0.9)), n).astype(str)),
+        "loan_amount": rng.integers(1_000, 40_000, n).astype(float),
+        "annual_income": np.round(rng.lognormal(11.0, 0.5, n), 0),
+        "delinq_2yrs": rng.poisson(0.3, n),
+        "revol_util": util,
+    })
+
+def _log_line(tx: Dict[str, Any], proba: float, latency: float, rules: List[str], arm: str) -> str:
+    return json.dumps({
+        "ts": "2025-11-10T12:00:00Z",
+        "arm": arm,
+        "tx": tx,
+        "decision": "review" if rules else ("block" if proba > 0.9 else "allow"),
+        "proba": proba,
+        "rules_hit": rules,
+        "latency_ms": latency,
+        "model_ts": "20251109_205733",
+        "stages_ms": {"parse": 0.05, "rules": 0.02, "frame": 0.3, "predict": round(latency * 0.6, 3)},
+    })
+
+def _write_log(path: Path, n: int, rng: np.random.Generator) -> None:
+    """A fraud API decision log (one JSON line per /score) of n lines."""
+    txs = _tx_dicts(n, rng)
+    proba = np.round(rng.beta(0.5, 8.0, n), 6)
+    latency = np.round(rng.gamma(2.0, 1.5, n), 3)
+    hit = rng.random(n) < 0.05
+    arm = np.where(rng.random(n) < 0.1, "cand", "prod")
+    with path.open("w", encoding="utf-8") as f:
+        for i, tx in enumerate(txs):
+            rules = ["R001_HIGH_AMOUNT_NEW_ACCOUNT"] if hit[i] else []
+            f.write(_log_line(tx, float(proba[i]), float(latency[i]), rules, str(arm[i])) + "\n")
+
+def _credit_model(rng: np.random.Generator):
+    """Small XGBoost PD model over the three credit features (deterministic, ~1 s to fit)."""
+    from xgboost import XGBClassifier
+
+    X = pd.DataFrame({
+        "income_to_loan_ratio": rng.lognormal(1.0, 0.7, 5_000),
+        "num_past_delinquencies": rng.poisson(0.3, 5_000).astype(float),
+        "credit_utilization_pct": rng.uniform(0, 120, 5_000),
+    })
+    logit = -2.5 - 0.4 * X["income_to_loan_ratio"] + 0.8 * X["num_past_delinquencies"] + 0.02 * X["credit_utilization_pct"]
+    y = (rng.random(len(X)) < 1 / (1 + np.exp(-logit))).astype(int)
+    return XGBClassifier(n_estimators=100, max_depth=4, random_state=0).fit(X, y)
+
+def _ctxs(fields, n: int, rng: np.random.Generator) -> List[Dict[str, Any]]:
+    """Online ctx per tx for the ctx.* fields the ruleset reads (countries or flags)."""
+    cols = {f: (rng.choice(COUNTRIES, n) if f.endswith("country") else rng.random(n) < 0.1).tolist() for f in fields}
+    return [dict(zip(cols, vals)) for vals in zip(*cols.values())] if cols else [{} for _ in range(n)]
+
+# ---------- fraud API ----------
+@case("fraud.apply_rules", "fraud", max_n=1_000_000, unit="requests")
+def _apply_rules(n, rng):
+    api = _fraud_api()
+    rules = api._load_rules(api.RULES_PATH)
+    txs = _tx_dicts(n, rng)
+    ctxs = _ctxs(rules.ctx_fields(), n, rng)
+    apply = api._apply_rules
+
+    def run():
+        for tx, ctx in zip(txs, ctxs):
+            apply(tx, rules, ctx)
+    return lambda: run
+
+@case("fraud.apply_rules_batch", "fraud", max_n=1_000_000)
+def _apply_rules_batch(n, rng):
+    api = _fraud_api()
+    rules = api._load_rules(api.RULES_PATH)
+    txs = _tx_dicts(n, rng)
+    ctxs = _ctxs(rules.ctx_fields(), n, rng)
+    return lambda: (lambda: api._apply_rules_batch(txs, rules, ctxs))
+
+@case("fraud.tx_to_frame", "fraud", max_n=100_000, unit="requests")
+def _tx_to_frame(n, rng):
+    api = _fraud_api()
+    txs = _tx_dicts(n, rng)
+    features = ["amount", "account_age_days", "hour_of_day"]
+    to_frame = api._tx_to_frame
+
+    def run():
+        for tx in txs:
+            to_frame(tx, features)
+    return lambda: run
+
+# ---------- fraud features ----------
+@case("fraud.compute_batch_features", "fraud")
+def _batch_features(n, rng):
+    mod = _load("fraud_detection_system/scripts/build_features_fraud.py")
+    df = _fraud_tx_frame(n, rng)
+    args = ("user_id", "timestamp", "amount", "device_id", "merchant_id", "is_chargeback")
+
+    def prepare():
+        d = df.copy()
+        return lambda: mod.compute_batch_features(d, *args)
+    return prepare
+
+@case("fraud.compute_stream_features", "fraud", max_n=1_000_000)
+def _stream_features(n, rng):
+    mod = _load("fraud_detection_system/scripts/build_features_fraud.py")
+    df = _fraud_tx_frame(n, rng)
+    args = ("user_id", "timestamp", "amount", "country", "transaction_id")
+    return lambda: (lambda: mod.compute_stream_features(df, *args))
+
+# ---------- credit ----------
+@case("credit.compute_features", "credit")
+def _credit_features(n, rng):
+    mod = _load("credit_scoring_system/scripts/build_features_credit.py")
+    df = _loans_frame(n, rng)
+
+    def prepare():
+        d = df.copy()
+        return lambda: mod.compute_features(d)
+    return prepare
+
+@case("credit.predict_pd", "credit")
+def _predict_pd(n, rng):
+    mod = _load("credit_scoring_system/scripts/score_credit_portfolio.py")
+    model = _credit_model(np.random.default_rng(0))
+    X = pd.DataFrame({
+        "income_to_loan_ratio": rng.lognormal(1.0, 0.7, n),
+        "num_past_delinquencies": rng.poisson(0.3, n).astype(float),
+        "credit_utilization_pct": rng.uniform(0, 120, n),
+    })
+    return lambda: (lambda: mod._predict_pd(model, X))
+
+@case("credit.make_rollups", "credit")
+def _make_rollups(n, rng):
+    mod = _load("credit_scoring_system/scripts/score_credit_portfolio.py")
+    ead = rng.integers(1_000, 40_000, n).astype(float)
+    pd_ = rng.beta(1.0, 12.0, n)
+    df = pd.DataFrame({
+        "borrower_id": np.char.add("B", np.arange(n).astype(str)),
+        "grade": rng.choice(GRADES, n),
+        "state": rng.choice(STATES, n),
+        "vintage_year": rng.integers(2015, 2026, n),
+        "EAD": ead,
+        "PD": pd_,
+        "EL": pd_ * 0.45 * ead,
+    })
+    return lambda: (lambda: mod._make_rollups(df, ["grade", "state", "vintage_year"], "borrower_id"))
+
+# ---------- monitoring ----------
+def _psi_inputs(n, rng):
+    return rng.lognormal(4.0, 1.3, n), rng.lognormal(4.1, 1.35, n)
+
+@case("monitoring.psi_numeric", "monitoring")
+def _psi_numeric(n, rng):
+    mod = _load("shared_env/monitoring/monitor_fraud_api_logs.py")
+    ref, cur = _psi_inputs(n, rng)
+    return lambda: (lambda: mod.psi_numeric(ref, cur))
+
+@case("monitoring.psi_for_col", "monitoring")
+def _psi_for_col(n, rng):
+    mod = _load("shared_env/monitoring/monitor_credit_drift.py")
+    ref, cur = _psi_inputs(n, rng)
+    return lambda: (lambda: mod.psi_for_col(ref, cur))
+
+@case("monitoring.load_day", "monitoring", max_n=1_000_000)
+def _load_day(n, rng):
+    mod = _load("shared_env/monitoring/monitor_fraud_api_logs.py")
+    tmp = tempfile.TemporaryDirectory(prefix="bench_logs_")
+    path = Path(tmp.name) / "20251110.jsonl"
+    _write_log(path, n, rng)
+
+    def prepare():
+        tmp  # the directory lives as long as this case's prepare
+        return lambda: mod.load_day(path)
+    return prepare
+
+@case("reports.load_jsonl_safe", "reports", max_n=1_000_000)
+def _load_jsonl_safe(n, rng):
+    mod = _load("fraud_detection_system/reports/utils/fraud_report_utils.py")
+    tmp = tempfile.TemporaryDirectory(prefix="bench_logs_")
+    path = Path(tmp.name) / "20251110.jsonl"
+    _write_log(path, n, rng)
+
+    def prepare():
+        tmp
+        return lambda: mod.load_jsonl_safe(path)
+    return prepare
+
+@case("reports.compute_kpis", "reports")
+def _compute_kpis(n, rng):
+    mod = _load("fraud_detection_system/reports/utils/fraud_report_utils.py")
+    rules_count = (rng.random(n) < 0.05).astype(int)
+    df = pd.DataFrame({
+        "decision": np.where(rules_count > 0, "review", np.where(rng.random(n) < 0.01, "block", "allow")),
+        "rules_hit": [["R001_HIGH_AMOUNT_NEW_ACCOUNT"] if c else [] for c in rules_count],
+        "rules_count": rules_count,
+        "latency_ms": rng.gamma(2.0, 1.5, n),
+        "label": np.where(rng.random(n) < 0.3, (rng.random(n) < 0.02).astype(float), np.nan),
+        "arm": np.where(rng.random(n) < 0.1, "cand", "prod"),
+    })
+    return lambda: (lambda: mod.compute_kpis(df, {"drift_share": 0.1}))
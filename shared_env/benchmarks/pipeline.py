@@ -0,0 +1,325 @@
+"""
+End-to-end daily chain at a chosen scale, timed per stage.
+
+A throwaway workspace gets copies of the credit / fraud scripts, configs,
+rules and reports plus synthetic inputs from scripts/generate_synthetic_data.py
+(raw loans.csv, raw transactions.csv, API logs for yesterday and today). Every
+stage script resolves its paths from its own location, so running the copies
+reads and writes only inside the workspace: real models, outputs and mlruns are
+never touched.
+
+Stages run in this process, one after the other, exactly as `python <script>`
+would run them (runpy, argv, cwd, script dir on sys.path); their output goes to
+<workspace>/logs/<stage>.log. Per stage: wall time, CPU time (process-wide,
+so threads count), RSS at start and peak RSS while it ran (sampled every
+20 ms). A stage whose upstream stage failed is skipped.
+
+  credit: build_features_credit -> train_credit_models -> score_credit_portfolio
+          -> monitor_credit_drift -> run_daily_credit_report
+  fraud:  build_features_fraud -> train_fraud_model;
+          monitor_fraud_api_logs -> run_daily_fraud_report
+
+Writes docs_global/benchmarks/pipeline_<commit>[-dirty]_<rows>.{json,html}.
+"""
+from __future__ import annotations
+
+import contextlib
+import html
+import json
+import logging
+import os
+import platform
+import runpy
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .cases import ROOT, _load
+from .runner import RESULTS_DIR, git_state
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Code and config the stages need; data, models and outputs are not copied
+WORKSPACE_COPY = [
+    "credit_scoring_system/__init__.py",
+    "credit_scoring_system/config",
+    "credit_scoring_system/scripts",
+    "credit_scoring_system/reports",
+    "fraud_detection_system/__init__.py",
+    "fraud_detection_system/config",
+    "fraud_detection_system/rules",
+    "fraud_detection_system/src",
+    "fraud_detection_system/scripts",
+    "fraud_detection_system/reports",
+    "shared_env/monitoring/monitor_credit_drift.py",
+    "shared_env/monitoring/monitor_fraud_api_logs.py",
+]
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    chain: str
+    script: str
+    args: Tuple[str, ...] = ()
+    needs: Tuple[str, ...] = ()
+    before: Optional[Callable[[Path], None]] = None
+
+def _reference_scores(ws: Path) -> None:
+    """monitor_credit_drift compares the two latest score files; use yesterday = today's if only one exists."""
+    scores = sorted((ws / "credit_scoring_system" / "outputs" / "scoring").glob("pd_scores_*.parquet"))
+    if len(scores) == 1:
+        ref = scores[0].with_name(f"pd_scores_{date.today() - timedelta(days=1):%Y%m%d}.parquet")
+        if ref.name < scores[0].name:
+            shutil.copyfile(scores[0], ref)
+
+STAGES: List[Stage] = [
+    Stage("build_features_credit", "credit", "credit_scoring_system/scripts/build_features_credit.py"),
+    Stage("train_credit_models", "credit", "credit_scoring_system/scripts/train_credit_models.py", needs=("build_features_credit",)),
+    Stage("score_credit_portfolio", "credit", "credit_scoring_system/scripts/score_credit_portfolio.py", needs=("train_credit_models",)),
+    Stage("monitor_credit_drift", "credit", "shared_env/monitoring/monitor_credit_drift.py",
+          needs=("score_credit_portfolio",), before=_reference_scores),
+    Stage("run_daily_credit_report", "credit", "credit_scoring_system/reports/run_daily_credit_report.py", needs=("monitor_credit_drift",)),
+    Stage("build_features_fraud", "fraud", "fraud_detection_system/scripts/build_features_fraud.py"),
+    Stage("train_fraud_model", "fraud", "fraud_detection_system/scripts/train_fraud_model.py", needs=("build_features_fraud",)),
+    Stage("monitor_fraud_api_logs", "fraud", "shared_env/monitoring/monitor_fraud_api_logs.py"),
+    Stage("run_daily_fraud_report", "fraud", "fraud_detection_system/reports/run_daily_fraud_report.py", needs=("monitor_fraud_api_logs",)),
+]
+
+# ---------- memory ----------
+def _rss() -> Optional[int]:
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+class _RssSampler(threading.Thread):
+    def __init__(self, interval: float = 0.02):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = _rss()
+        self._stop_evt = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_evt.wait(self.interval):
+            rss = _rss()
+            if rss is not None and (self.peak is None or rss > self.peak):
+                self.peak = rss
+
+    def stop(self) -> Optional[int]:
+        self._stop_evt.set()
+        self.join()
+        return self.peak
+
+def _mb(b: Optional[int]) -> Optional[float]:
+    return round(b / 2**20, 1) if b is not None else None
+
+# ---------- workspace ----------
+def build_workspace(ws: Path, rows: int, log_rows: int, chains: List[str], seed: int, chunk_rows: int) -> Dict[str, float]:
+    """Copy the stage code into ws and generate the inputs; returns seconds per setup step."""
+    gen = _load("scripts/generate_synthetic_data.py")
+    timings: Dict[str, float] = {}
+    t0 = time.perf_counter()
+    for rel in WORKSPACE_COPY:
+        src, dst = ROOT / rel, ws / rel
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        if src.is_dir():
+            shutil.copytree(src, dst, ignore=shutil.ignore_patterns("__pycache__"), dirs_exist_ok=True)
+        elif src.exists():
+            shutil.copy2(src, dst)
+    timings["copy_code"] = time.perf_counter() - t0
+
+    if "credit" in chains:
+        t0 = time.perf_counter()
+        gen.write_loans(ws / "credit_scoring_system" / "data" / "raw", rows, chunk_rows, seed, "csv")
+        timings["generate_loans"] = time.perf_counter() - t0
+    if "fraud" in chains:
+        t0 = time.perf_counter()
+        gen.write_transactions(ws / "fraud_detection_system" / "data" / "raw", rows, chunk_rows, seed, "csv",
+                               np.datetime64(date.today() - timedelta(days=30), "s"), 30)
+        timings["generate_transactions"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        # the monitor compares yesterday's log with today's
+        gen.write_logs(ws / "fraud_detection_system" / "api" / "logs", log_rows, chunk_rows, seed,
+                       np.datetime64(date.today() - timedelta(days=1), "s"), 2)
+        timings["generate_logs"] = time.perf_counter() - t0
+    return {k: round(v, 3) for k, v in timings.items()}
+
+# ---------- stages ----------
+def run_stage(stage: Stage, ws: Path) -> Dict[str, Any]:
+    script = ws / stage.script
+    log_path = ws / "logs" / f"{stage.name}.log"
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    if stage.before is not None:
+        stage.before(ws)
+
+    argv, cwd, path, handlers = list(sys.argv), os.getcwd(), list(sys.path), list(logging.root.handlers)
+    status, error = "ok", None
+    sampler = _RssSampler()
+    rss0 = sampler.peak
+    try:
+        sys.argv = [str(script), *stage.args]
+        sys.path.insert(0, str(script.parent))
+        os.chdir(ws)
+        with open(log_path, "w", encoding="utf-8") as out, contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+            sampler.start()
+            t0, c0 = time.perf_counter(), time.process_time()
+            try:
+                runpy.run_path(str(script), run_name="__main__")
+            except SystemExit as e:
+                if e.code not in (None, 0):
+                    status, error = "failed", f"exit code {e.code}"
+            except Exception as e:
+                status, error = "failed", f"{type(e).__name__}: {e}"
+            wall, cpu = time.perf_counter() - t0, time.process_time() - c0
+            peak = sampler.stop()
+    finally:
+        sys.argv, sys.path[:] = argv, path
+        os.chdir(cwd)
+        logging.root.handlers[:] = handlers  # basicConfig() in a stage bound a handler to its log file
+
+    return {
+        "chain": stage.chain,
+        "stage": stage.name,
+        "script": stage.script,
+        "status": status,
+        "error": error,
+        "wall_s": round(wall, 3),
+        "cpu_s": round(cpu, 3),
+        "cpu_util": round(cpu / wall, 2) if wall > 0 else None,
+        "rss_start_mb": _mb(rss0),
+        "peak_rss_mb": _mb(peak),
+        "peak_delta_mb": _mb(peak - rss0) if peak is not None and rss0 is not None else None,
+        "log": str(log_path),
+    }
+
+def run_pipeline(rows: int, log_rows: Optional[int] = None, chains: Optional[List[str]] = None, seed: int = 42,
+                 chunk_rows: int = 500_000, workspace: Optional[Path] = None, keep: bool = False,
+                 window_min: Optional[float] = None, log=print) -> Dict[str, Any]:
+    chains = chains or ["credit", "fraud"]
+    log_rows = log_rows or rows
+    ws = workspace or Path(tempfile.mkdtemp(prefix="pipeline_bench_"))
+    ws.mkdir(parents=True, exist_ok=True)
+    env_saved = os.environ.get("MLFLOW_TRACKING_URI")
+    os.environ["MLFLOW_TRACKING_URI"] = (ws / "mlruns").as_uri()
+    try:
+        log(f"[..] workspace {ws}: generating {rows:,} rows")
+        setup = build_workspace(ws, rows, log_rows, chains, seed, chunk_rows)
+        stages: List[Dict[str, Any]] = []
+        failed: set = set()
+        for stage in (s for s in STAGES if s.chain in chains):
+            blocked = [n for n in stage.needs if n in failed]
+            if blocked:
+                failed.add(stage.name)
+                stages.append({"chain": stage.chain, "stage": stage.name, "script": stage.script,
+                               "status": "skipped", "error": f"upstream failed: {', '.join(blocked)}"})
+                log(f"[SKIP] {stage.name}: upstream failed ({', '.join(blocked)})")
+                continue
+            r = run_stage(stage, ws)
+            stages.append(r)
+            if r["status"] != "ok":
+                failed.add(stage.name)
+                log(f"[FAIL] {stage.name}: {r['error']} (see {r['log']})")
+            else:
+                log(f"[OK] {stage.name:<24} {r['wall_s']:>8.2f}s wall {r['cpu_s']:>8.2f}s cpu  peak {r['peak_rss_mb']} MB")
+    finally:
+        if env_saved is None:
+            os.environ.pop("MLFLOW_TRACKING_URI", None)
+        else:
+            os.environ["MLFLOW_TRACKING_URI"] = env_saved
+        if not keep and workspace is None:
+            shutil.rmtree(ws, ignore_errors=True)
+
+    totals = {}
+    for chain in chains:
+        ran = [s for s in stages if s["chain"] == chain and "wall_s" in s]
+        wall = sum(s["wall_s"] for s in ran)
+        totals[chain] = {
+            "wall_s": round(wall, 3),
+            "cpu_s": round(sum(s["cpu_s"] for s in ran), 3),
+            "peak_rss_mb": max((s["peak_rss_mb"] or 0 for s in ran), default=None),
+            "ok": all(s["status"] == "ok" for s in stages if s["chain"] == chain),
+            "over_window": (wall > window_min * 60) if window_min else None,
+        }
+        for s in ran:
+            s["share_of_chain"] = round(s["wall_s"] / wall, 3) if wall else None
+    return {
+        "meta": {
+            **git_state(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "rows": rows,
+            "log_rows": log_rows,
+            "chains": chains,
+            "seed": seed,
+            "window_min": window_min,
+            "workspace": str(ws) if keep or workspace is not None else None,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "rss_source": "psutil" if psutil is not None else ("/proc/self/statm" if _rss() is not None else None),
+        },
+        "setup_s": setup,
+        "stages": stages,
+        "totals": totals,
+    }
+
+# ---------- report ----------
+def pipeline_stem(report: Dict[str, Any]) -> str:
+    m = report["meta"]
+    return f"pipeline_{m['commit']}{'-dirty' if m['dirty'] else ''}_{m['rows']}"
+
+def to_html(report: Dict[str, Any]) -> str:
+    m = report["meta"]
+    esc = lambda v: html.escape("" if v is None else str(v))  # noqa: E731
+
+    def stage_row(s: Dict[str, Any]) -> str:
+        share = s.get("share_of_chain") or 0
+        bar = f'<div style="background:#4a7;height:10px;width:{share * 200:.0f}px"></div>'
+        cells = [s["chain"], s["stage"], s["status"], s.get("wall_s"), s.get("cpu_s"), s.get("cpu_util"),
+                 s.get("rss_start_mb"), s.get("peak_rss_mb"), s.get("peak_delta_mb")]
+        return ("<tr>" + "".join(f"<td>{esc(c)}</td>" for c in cells) + f"<td>{bar}</td>"
+                + f"<td>{esc(s.get('error'))}</td></tr>")
+
+    totals = "".join(
+        f"<tr><th>{esc(c)}</th><td>{esc(t['wall_s'])}</td><td>{esc(t['cpu_s'])}</td><td>{esc(t['peak_rss_mb'])}</td>"
+        f"<td>{'yes' if t['ok'] else 'no'}</td><td>{esc(t['over_window'])}</td></tr>"
+        for c, t in report["totals"].items()
+    )
+    setup = "".join(f"<tr><th>{esc(k)}</th><td>{esc(v)}</td></tr>" for k, v in report["setup_s"].items())
+    return f"""<!doctype html>
+<html><head><meta charset="utf-8"><title>Pipeline benchmark {esc(m['commit'])} {m['rows']:,} rows</title>
+<style>body{{font-family:sans-serif;margin:2em}}table{{border-collapse:collapse;margin-bottom:1.5em}}
+th,td{{border:1px solid #ccc;padding:4px 10px;text-align:left}}</style></head><body>
+<h1>Daily chain at {m['rows']:,} rows</h1>
+<p>commit {esc(m['commit'])}{' (dirty)' if m['dirty'] else ''} · {esc(m['created_at'])} · {m['cpus']} cpus · python {esc(m['python'])}
+· log lines {m['log_rows']:,}{f" · batch window {m['window_min']} min" if m['window_min'] else ''}</p>
+<h2>Chains</h2>
+<table><tr><th></th><th>wall (s)</th><th>cpu (s)</th><th>peak RSS (MB)</th><th>all ok</th><th>over window</th></tr>{totals}</table>
+<h2>Stages</h2>
+<table><tr><th>chain</th><th>stage</th><th>status</th><th>wall (s)</th><th>cpu (s)</th><th>cpu/wall</th>
+<th>RSS start (MB)</th><th>peak RSS (MB)</th><th>peak - start (MB)</th><th>share of chain</th><th>error</th></tr>
+{''.join(stage_row(s) for s in report['stages'])}</table>
+<p>Stages run in one process, so RSS start includes what earlier stages left allocated; peak - start is the stage's own growth.</p>
+<h2>Setup (untimed)</h2><table>{setup}</table>
+</body></html>
+"""
+
+def write_report(report: Dict[str, Any], out_dir: Path = RESULTS_DIR) -> Path:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stem = out_dir / pipeline_stem(report)
+    stem.with_suffix(".json").write_text(json.dumps(report, indent=2), encoding="utf-8")
+    stem.with_suffix(".html").write_text(to_html(report), encoding="utf-8")
+    return stem
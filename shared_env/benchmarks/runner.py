@@ -0,0 +1,185 @@
+"""
+Timing / memory measurement, result files and the regression comparison.
+
+Time is wall clock (perf_counter) over `repeats` runs; `min` is what compare
+uses, since it is the least disturbed by other load on the machine. Peak memory
+is the tracemalloc peak of one extra run (Python and NumPy allocations made by
+the call itself, the input data excluded), measured separately because
+tracemalloc slows Python-heavy code down.
+"""
+from __future__ import annotations
+
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .cases import CASES, ROOT, Case
+
+RESULTS_DIR = ROOT / "docs_global" / "benchmarks"
+
+# ---------- git ----------
+def _git(*args: str) -> Optional[str]:
+    try:
+        out = subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return out.stdout.strip() if out.returncode == 0 else None
+
+def git_state() -> Dict[str, Any]:
+    sha = _git("rev-parse", "--short=10", "HEAD")
+    dirty = bool(_git("status", "--porcelain", "--untracked-files=no")) if sha else False
+    return {"commit": sha or "unknown", "dirty": dirty, "subject": _git("log", "-1", "--format=%s") if sha else None}
+
+def result_path(state: Dict[str, Any], out_dir: Path = RESULTS_DIR) -> Path:
+    return out_dir / f"bench_{state['commit']}{'-dirty' if state['dirty'] else ''}.json"
+
+# ---------- measurement ----------
+def _time_runs(prepare, repeats: int, budget_s: float) -> List[float]:
+    """At least one timed run; more until `repeats` or the time budget is used up."""
+    times: List[float] = []
+    while len(times) < repeats:
+        fn = prepare()
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+        if sum(times) >= budget_s:
+            break
+    return times
+
+def _peak_mb(prepare) -> float:
+    fn = prepare()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 2**20, 3)
+
+def run_case(c: Case, sizes: Iterable[int], seed: int = 42, repeats: int = 5, budget_s: float = 10.0,
+             memory: bool = True, log=print) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    warmed = False
+    for n in sizes:
+        row: Dict[str, Any] = {"case": c.name, "group": c.group, "n": n, "unit": c.unit}
+        if n > c.max_n:
+            continue
+        try:
+            prepare = c.setup(n, np.random.default_rng(seed))
+            if not warmed:  # first call pays for imports / lazy init
+                prepare()()
+                warmed = True
+            times = _time_runs(prepare, repeats, budget_s)
+            row.update({
+                "repeats": len(times),
+                "time_s": {
+                    "min": round(min(times), 6),
+                    "median": round(statistics.median(times), 6),
+                    "mean": round(statistics.fmean(times), 6),
+                },
+                "per_unit_us": round(min(times) / n * 1e6, 4),
+            })
+            if memory:
+                row["peak_mb"] = _peak_mb(prepare)
+            del prepare
+        except ImportError as e:
+            row["skipped"] = f"{type(e).__name__}: {e}"
+            out.append(row)
+            log(f"[SKIP] {c.name}: {row['skipped']}")
+            break
+        except Exception as e:
+            row["error"] = f"{type(e).__name__}: {e}"
+        out.append(row)
+        if "error" in row:
+            log(f"[ERR] {c.name} n={n}: {row['error']}")
+        else:
+            log(f"[OK] {c.name:<32} n={n:<9} min {row['time_s']['min']:.4f}s  peak {row.get('peak_mb', '-')} MB")
+    return out
+
+def select_cases(only: Optional[List[str]] = None) -> List[Case]:
+    if not only:
+        return list(CASES.values())
+    return [c for c in CASES.values() if any(c.name.startswith(p) or c.group == p for p in only)]
+
+def run_cases(sizes: List[int], only: Optional[List[str]] = None, seed: int = 42, repeats: int = 5,
+              budget_s: float = 10.0, memory: bool = True, log=print) -> Dict[str, Any]:
+    results: List[Dict[str, Any]] = []
+    for c in select_cases(only):
+        results.extend(run_case(c, sizes, seed, repeats, budget_s, memory, log))
+    return {
+        "meta": {
+            **git_state(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "sizes": sizes,
+            "seed": seed,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+# ---------- comparison ----------
+def load_results(ref: str, results_dir: Path = RESULTS_DIR) -> Dict[str, Any]:
+    """A result file path, or a commit (sha / ref) with a bench_<sha>*.json in results_dir."""
+    p = Path(ref)
+    if p.is_file():
+        return json.loads(p.read_text(encoding="utf-8"))
+    sha = _git("rev-parse", "--short=10", ref) or ref
+    found = sorted(results_dir.glob(f"bench_{sha}*.json")) or sorted(results_dir.glob(f"bench_{ref}*.json"))
+    if not found:
+        raise FileNotFoundError(f"No benchmark results for {ref!r} in {results_dir}")
+    # prefer the clean run of that commit over a -dirty one
+    return json.loads(min(found, key=lambda f: "-dirty" in f.name).read_text(encoding="utf-8"))
+
+def compare_results(base: Dict[str, Any], new: Dict[str, Any], threshold: float = 0.10,
+                    mem_threshold: Optional[float] = None, min_time_s: float = 1e-3) -> List[Dict[str, Any]]:
+    """
+    One row per (case, n) present in both runs with the time / peak ratios new / base.
+    `regression` is set when time grew by more than `threshold` (and by more than
+    `min_time_s`, so sub-millisecond noise does not count) or peak memory grew
+    by more than `mem_threshold` (defaults to `threshold`).
+    """
+    mem_threshold = threshold if mem_threshold is None else mem_threshold
+    index = {(r["case"], r["n"]): r for r in base.get("results", []) if "time_s" in r}
+    rows: List[Dict[str, Any]] = []
+    for r in new.get("results", []):
+        b = index.get((r["case"], r["n"]))
+        if b is None or "time_s" not in r:
+            continue
+        t_base, t_new = b["time_s"]["min"], r["time_s"]["min"]
+        t_ratio = t_new / t_base if t_base > 0 else None
+        m_base, m_new = b.get("peak_mb"), r.get("peak_mb")
+        m_ratio = m_new / m_base if m_base and m_new is not None else None
+        reasons = []
+        if t_ratio is not None and t_ratio > 1 + threshold and t_new - t_base > min_time_s:
+            reasons.append("time")
+        if m_ratio is not None and m_ratio > 1 + mem_threshold and m_new - m_base > 0.1:
+            reasons.append("memory")
+        rows.append({
+            "case": r["case"],
+            "n": r["n"],
+            "time_base_s": t_base,
+            "time_new_s": t_new,
+            "time_ratio": round(t_ratio, 3) if t_ratio is not None else None,
+            "peak_base_mb": m_base,
+            "peak_new_mb": m_new,
+            "peak_ratio": round(m_ratio, 3) if m_ratio is not None else None,
+            "regression": reasons,
+        })
+    return rows
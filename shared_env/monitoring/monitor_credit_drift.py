@@ -261,8 +261,8 @@ def main():
     ap.add_argument("--dry-run", action="store_true", help="CI smoke test mode (uses tiny synthetic data).")
     args = ap.parse_args()
 
-    root = Path(r"C:\DevProjects\risk_analysis_flagship")
-    scores_dir = root / r"credit_scoring_system\outputs\scoring"
+    root = Path(__file__).resolve().parents[2]
+    scores_dir = root / "credit_scoring_system" / "outputs" / "scoring"
 
     if args.dry_run:
         ref = pd.DataFrame({"pd": [0.01, 0.02, 0.03], "income_to_loan_ratio": [2, 3, 4]})
@@ -323,7 +323,7 @@ def main():
 
     # Calibration (optional if labels exist)
     cal_png = out_dir / "calibration_plot.png"
-    label_info = try_load_labels(root / r"credit_scoring_system\data\raw\loans.csv")
+    label_info = try_load_labels(root / "credit_scoring_system" / "data" / "raw" / "loans.csv")
     make_calibration_plot(cur, label_info, cal_png)
 
     # MLflow logging (best-effort)
@@ -269,27 +269,37 @@ def load_day(path: Path):
     if not path.exists():
         return pd.DataFrame()
     rows = []
+    cache_hits = 0
     with open(path, "r", encoding="utf-8") as f:
         for line in f:
             try:
                 obj = json.loads(line)
             except Exception:
                 continue
+            if obj.get("cache_hit"):
+                # idempotent retry answered from the API cache: not a new decision
+                cache_hits += 1
+                continue
             tx = obj.get("tx", {})
-            rows.append(
-                {
-                    "amount": tx.get("amount"),
-                    "hour_of_day": tx.get("hour_of_day"),
-                    "country": tx.get("country"),
-                    "device_id": tx.get("device_id"),
-                    "decision": obj.get("decision"),
-                    "proba": obj.get("proba"),
-                    "latency_ms": obj.get("latency_ms"),
-                    "rules_hit": ",".join(obj.get("rules_hit") or []),
-                    "model_ts": obj.get("model_ts") or obj.get("model_timestamp"),
-                }
-            )
-    return pd.DataFrame(rows)
+            row = {
+                "amount": tx.get("amount"),
+                "hour_of_day": tx.get("hour_of_day"),
+                "country": tx.get("country"),
+                "device_id": tx.get("device_id"),
+                "decision": obj.get("decision"),
+                "proba": obj.get("proba"),
+                "latency_ms": obj.get("latency_ms"),
+                "rules_hit": ",".join(obj.get("rules_hit") or []),
+                "model_ts": obj.get("model_ts") or obj.get("model_timestamp"),
+                "degraded": bool(obj.get("degraded")),
+            }
+            # per-stage API timings (parse, ctx, rules, frame, predict, shap, ...)
+            for stage, ms in (obj.get("stages_ms") or {}).items():
+                row[f"stage_{stage}_ms"] = ms
+            rows.append(row)
+    df = pd.DataFrame(rows)
+    df.attrs["cache_hits"] = cache_hits
+    return df
 
 
 def main():
@@ -351,8 +361,13 @@ def main():
     n = len(cur)
     flagged_rate = safe_pct(cur, "decision", "flag") if n else 0.0
     review_rate = safe_pct(cur, "decision", "review") if n else 0.0
-    mean_proba = safe_num_mean(cur, proba_col)
-    p95_latency = safe_quantile(cur, latency_col, 0.95)
+    # rules-only decisions taken under overload have no proba / model latency
+    degraded = int(cur["degraded"].sum()) if "degraded" in cur.columns else 0
+    scored = cur[~cur["degraded"]] if degraded else cur
+    mean_proba = safe_num_mean(scored, proba_col)
+    p95_latency = safe_quantile(scored, latency_col, 0.95)
+    stage_cols = sorted(c for c in cur.columns if c.startswith("stage_") and c.endswith("_ms"))
+    p95_stage_ms = {c[len("stage_") : -len("_ms")]: safe_quantile(cur, c, 0.95) for c in stage_cols}
 
     # -----------------------
     # Drift summary (numeric + categorical)
@@ -427,7 +442,8 @@ def main():
 
     # Latency vs yesterday baseline
     if latency_col and (latency_col in ref.columns):
-        ref_p95 = safe_quantile(ref, latency_col, 0.95)
+        ref_scored = ref[~ref["degraded"]] if "degraded" in ref.columns else ref
+        ref_p95 = safe_quantile(ref_scored, latency_col, 0.95)
         if p95_latency > max(250.0, ref_p95 * 1.5):
             alert_lines.append(
                 f"LATENCY ALERT: p95 {p95_latency:.1f} ms vs {ref_p95:.1f} ms baseline"
@@ -455,6 +471,10 @@ def main():
         "review_rate": review_rate,
         "mean_proba": mean_proba,
         "p95_latency_ms": p95_latency,
+        "p95_stage_ms": p95_stage_ms,
+        "cache_hits": int(cur.attrs.get("cache_hits", 0)),
+        "degraded": degraded,
+        "degraded_rate": degraded / n if n else 0.0,
         "ref_date": ref_date,
         "proba_col": proba_col or "",
         "latency_col": latency_col or "",
@@ -493,6 +513,10 @@ def main():
             mlflow.log_metric("review_rate", review_rate)
             mlflow.log_metric("proba_mean", mean_proba)
             mlflow.log_metric("latency_p95_ms", p95_latency)
+            mlflow.log_metric("cache_hits", metrics["cache_hits"])
+            mlflow.log_metric("degraded_rate", metrics["degraded_rate"])
+            for stage, v in p95_stage_ms.items():
+                mlflow.log_metric(f"stage_{stage}_p95_ms", v)
             mlflow.log_artifact((out_dir / "drift_summary.csv").as_posix())
             if (out_dir / "drift_report.html").exists():
                 mlflow.log_artifact((out_dir / "drift_report.html").as_posix())
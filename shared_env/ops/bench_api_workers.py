@@ -0,0 +1,246 @@
+# shared_env/ops/bench_api_workers.py
+"""
+Throughput scaling of the fraud API from 1 to N pre-forked workers.
+
+For each worker count the launcher (`run_api.py --workers n`) is started on a
+free port, /ready is polled, then a closed-loop load runs for `--duration`
+seconds: `--clients` keep-alive HTTP connections (spread over `--client-procs`
+processes so the load generator is not GIL-bound) each POST /score back to
+back. Per worker count the report has the XGBoost nthread per worker (as the
+launcher picks it: --nthread, else cpu_count // n), requests/s, p50/p95/p99 latency, errors,
+and the launcher's memory: summed RSS vs summed PSS of all its processes
+(Linux /proc), which shows how much of the model is shared copy-on-write.
+
+The client runs on the same machine and uses cores too; for clean numbers pin
+the server and the client to separate cores (taskset) or run them on separate hosts.
+
+Writes docs_global/reports/perf/api_workers_YYYYMMDD.{json,md}.
+
+Usage:
+  python shared_env/ops/bench_api_workers.py [--workers 1 2 4] [--duration 20] [--clients 32] [--nthread 0]
+"""
+
+from __future__ import annotations
+import argparse
+import http.client
+import json
+import multiprocessing as mp
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[2]
+OUT_DIR = ROOT / "docs_global" / "reports" / "perf"
+RUN_API = ROOT / "fraud_detection_system" / "api" / "run_api.py"
+
+COUNTRIES = ("US", "GB", "DE", "FR", "NG", "IN")
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _tx(i: int) -> bytes:
+    return json.dumps({
+        "amount": float(5 + (i * 37) % 2000),
+        "account_age_days": (i * 13) % 1500,
+        "country": COUNTRIES[i % len(COUNTRIES)],
+        "device_id": f"bench-{i % 5000}",
+        "hour_of_day": i % 24,
+    }).encode()
+
+def _wait_ready(proc: subprocess.Popen, port: int, timeout: float) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline and proc.poll() is None:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/ready")
+            if conn.getresponse().status == 200:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.2)
+    return False
+
+def _client_proc(port: int, n_conns: int, duration: float, seed: int, out: "mp.Queue[Any]") -> None:
+    """n_conns keep-alive connections, one thread each; puts (latencies, errors) on `out`."""
+    import threading
+
+    lat: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def run(k: int) -> None:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        local: List[float] = []
+        i = seed * 100_000 + k * 1_000
+        while time.perf_counter() < stop_at:
+            body = _tx(i)
+            i += 1
+            t0 = time.perf_counter()
+            try:
+                conn.request("POST", "/score", body=body, headers={"Content-Type": "application/json"})
+                r = conn.getresponse()
+                r.read()
+                ok = r.status == 200
+            except OSError:
+                ok = False
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+            if ok:
+                local.append(time.perf_counter() - t0)
+            else:
+                with lock:
+                    errors[0] += 1
+        with lock:
+            lat.extend(local)
+
+    threads = [threading.Thread(target=run, args=(k,)) for k in range(n_conns)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    out.put((lat, errors[0]))
+
+def _proc_tree(pid: int) -> List[int]:
+    pids, todo = [], [pid]
+    while todo:
+        p = todo.pop()
+        pids.append(p)
+        try:
+            for task in os.listdir(f"/proc/{p}/task"):
+                todo.extend(int(c) for c in Path(f"/proc/{p}/task/{task}/children").read_text().split())
+        except OSError:
+            pass
+    return pids
+
+def _memory_mb(pid: int) -> Dict[str, Optional[float]]:
+    """Summed RSS / PSS over the launcher and its workers (None off Linux)."""
+    rss = pss = 0
+    try:
+        for p in _proc_tree(pid):
+            for line in Path(f"/proc/{p}/smaps_rollup").read_text().splitlines():
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    kb = int(rest.split()[0])
+                    if key == "Rss":
+                        rss += kb
+                    else:
+                        pss += kb
+    except OSError:
+        return {"rss_mb": None, "pss_mb": None}
+    return {"rss_mb": round(rss / 1024, 1), "pss_mb": round(pss / 1024, 1)}
+
+def _pct(sorted_vals: List[float], q: float) -> Optional[float]:
+    if not sorted_vals:
+        return None
+    return round(sorted_vals[min(len(sorted_vals) - 1, int(q * len(sorted_vals)))] * 1000, 2)
+
+def bench(workers: int, args: argparse.Namespace) -> Dict[str, Any]:
+    port = _free_port()
+    nthread = args.nthread or max(1, (os.cpu_count() or 1) // workers)  # the launcher's default
+    proc = subprocess.Popen(
+        [sys.executable, str(RUN_API), "--workers", str(workers), "--port", str(port), "--log-level", "warning",
+         "--nthread", str(nthread)],
+        cwd=ROOT, start_new_session=True,
+    )
+    try:
+        if not _wait_ready(proc, port, args.ready_timeout):
+            err = "not ready" if proc.poll() is None else f"launcher exited ({proc.returncode})"
+            return {"workers": workers, "nthread": nthread, "error": err}
+        # every worker must be up before the clock starts (the first /ready may hit worker 0 only)
+        time.sleep(1.0)
+        q: "mp.Queue[Any]" = mp.Queue()
+        per_proc = max(1, args.clients // args.client_procs)
+        clients = [mp.Process(target=_client_proc, args=(port, per_proc, args.duration, k, q)) for k in range(args.client_procs)]
+        for c in clients:
+            c.start()
+        results = [q.get() for _ in clients]
+        for c in clients:
+            c.join()
+        mem = _memory_mb(proc.pid)
+    finally:
+        if proc.poll() is None:
+            os.killpg(proc.pid, signal.SIGTERM)
+            try:
+                proc.wait(30)
+            except subprocess.TimeoutExpired:
+                os.killpg(proc.pid, signal.SIGKILL)
+
+    lat = sorted(x for r in results for x in r[0])
+    errors = sum(r[1] for r in results)
+    return {
+        "workers": workers,
+        "nthread": nthread,
+        "requests": len(lat),
+        "errors": errors,
+        "rps": round(len(lat) / args.duration, 1),
+        "p50_ms": _pct(lat, 0.50),
+        "p95_ms": _pct(lat, 0.95),
+        "p99_ms": _pct(lat, 0.99),
+        **mem,
+    }
+
+def to_markdown(report: Dict[str, Any]) -> str:
+    lines = [
+        f"# Fraud API worker scaling — {report['date']}",
+        "",
+        f"cpus: {report['cpus']}, clients: {report['clients']} over {report['client_procs']} procs, "
+        f"{report['duration_s']} s per run",
+        "",
+        "| workers | nthread | req/s | speedup | p50 (ms) | p95 (ms) | p99 (ms) | errors | RSS (MB) | PSS (MB) |",
+        "|---|---|---|---|---|---|---|---|---|---|",
+    ]
+    base = next((r["rps"] for r in report["runs"] if r.get("rps")), None)
+    for r in report["runs"]:
+        if "error" in r:
+            lines.append(f"| {r['workers']} | {r['nthread']} | {r['error']} | | | | | | | |")
+            continue
+        speedup = f"{r['rps'] / base:.2f}x" if base else ""
+        lines.append(
+            f"| {r['workers']} | {r['nthread']} | {r['rps']} | {speedup} | {r['p50_ms']} | {r['p95_ms']} | {r['p99_ms']} "
+            f"| {r['errors']} | {r['rss_mb']} | {r['pss_mb']} |"
+        )
+    return "\n".join(lines) + "\n"
+
+def main() -> None:
+    cpus = os.cpu_count() or 1
+    ap = argparse.ArgumentParser(description="Fraud API throughput vs number of pre-forked workers.")
+    ap.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, cpus} & set(range(1, cpus + 1))))
+    ap.add_argument("--duration", type=float, default=20.0, help="seconds of load per worker count")
+    ap.add_argument("--clients", type=int, default=32, help="concurrent keep-alive connections")
+    ap.add_argument("--client-procs", type=int, default=2, help="load-generator processes")
+    ap.add_argument("--nthread", type=int, default=0, help="XGBoost threads per worker (0: cpu_count // workers)")
+    ap.add_argument("--ready-timeout", type=float, default=120.0)
+    ap.add_argument("--out-dir", type=Path, default=OUT_DIR)
+    args = ap.parse_args()
+
+    report: Dict[str, Any] = {
+        "date": date.today().isoformat(),
+        "cpus": cpus,
+        "clients": args.clients,
+        "client_procs": args.client_procs,
+        "duration_s": args.duration,
+        "runs": [],
+    }
+    for n in args.workers:
+        print(f"[..] {n} worker(s)")
+        r = bench(n, args)
+        report["runs"].append(r)
+        print(f"[OK] {n} worker(s) x nthread={r['nthread']}: {r.get('rps')} req/s, p95 {r.get('p95_ms')} ms, PSS {r.get('pss_mb')} MB")
+
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    stem = f"api_workers_{date.today().strftime('%Y%m%d')}"
+    (args.out_dir / f"{stem}.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
+    (args.out_dir / f"{stem}.md").write_text(to_markdown(report), encoding="utf-8")
+    print(f"[OK] Worker scaling report written to: {args.out_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+# shared_env/ops/loadgen.py
+"""
+Open-loop load generator for the scoring APIs.
+
+Payloads:
+  fraud-logs   - the `tx` of every decision line in fraud_detection_system/api/logs/*.jsonl
+                 (cache_hit marker lines are skipped)
+  fraud-synth  - synthetic TransactionIn payloads
+  credit-synth - synthetic records over the credit PROD feature_list.json
+
+Targets: the fraud API (/score), the credit API (/score) or the gateway
+(shared_env/api_gateway.py: /fraud/score, /credit/score), either over HTTP
+(`--base-url`, e.g. a local uvicorn) or in-process through FastAPI's TestClient
+(`--in-process`; the gateway still forwards to the live downstream APIs).
+
+Open loop: request i is due at t0 + i / rate (or after exponential gaps with
+--poisson) whether or not earlier requests have finished, so a slow server
+builds a backlog instead of slowing the generator down. Latency is measured
+from the scheduled arrival, so time spent waiting for a free client slot
+(`--concurrency`) counts, and coordinated omission does not hide stalls;
+the pure request time is reported as `service_ms`. Requests whose backlog
+exceeds `--max-backlog` are dropped on the client and counted.
+
+Writes docs_global/reports/load/loadtest_<target>_YYYYMMDD_HHMMSS.{json,html}.
+
+Usage:
+  python shared_env/ops/loadgen.py --target fraud --source fraud-logs --rate 200 --duration 30
+  python shared_env/ops/loadgen.py --target credit --source credit-synth --rate 50 --in-process
+"""
+
+from __future__ import annotations
+import argparse
+import html
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+FRAUD_LOGS = ROOT / "fraud_detection_system" / "api" / "logs"
+OUT_DIR = ROOT / "docs_global" / "reports" / "load"
+
+TARGETS = {
+    # name -> (default base url, app module, readiness path, path per payload kind)
+    "fraud": ("http://127.0.0.1:8001", "fraud_detection_system.api.app", "/ready", {"fraud": "/score"}),
+    "credit": ("http://127.0.0.1:8002", "credit_scoring_system.api.app", "/ready", {"credit": "/score"}),
+    "gateway": ("http://127.0.0.1:8000", "shared_env.api_gateway", "/health", {"fraud": "/fraud/score", "credit": "/credit/score"}),
+}
+SOURCES = {"fraud-logs": "fraud", "fraud-synth": "fraud", "credit-synth": "credit"}
+
+_COUNTRIES = ("US", "US", "US", "GB", "DE", "FR", "CA", "IN", "NG", "BR")
+
+# ---------- payloads ----------
+def fraud_log_payloads(logs_glob: str, limit: int) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    for path in sorted(FRAUD_LOGS.glob(logs_glob)):
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    obj = json.loads(line)
+                except ValueError:
+                    continue
+                tx = obj.get("tx")
+                if obj.get("cache_hit") or not isinstance(tx, dict):
+                    continue
+                out.append({k: v for k, v in tx.items() if v is not None})
+                if len(out) >= limit:
+                    return out
+    return out
+
+def fraud_synth_payloads(n: int, rng: random.Random) -> List[Dict[str, Any]]:
+    return [
+        {
+            "amount": round(rng.lognormvariate(4.0, 1.2), 2),
+            "account_age_days": rng.randint(0, 3650),
+            "country": rng.choice(_COUNTRIES),
+            "device_id": f"dev-{rng.randint(0, 20000)}",
+            "hour_of_day": rng.randint(0, 23),
+            "account_id": f"acct-{rng.randint(0, 50000)}",
+        }
+        for _ in range(n)
+    ]
+
+def credit_synth_payloads(n: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """Plausible ranges by feature-name convention; categoricals get 'unknown'."""
+    from credit_scoring_system.api.app import _parse_feature_list, _resolve_prod_dir
+
+    raw = json.loads((Path(_resolve_prod_dir()) / "feature_list.json").read_text(encoding="utf-8"))
+    features = _parse_feature_list(raw)
+    categorical = set(raw.get("categorical_features") or []) if isinstance(raw, dict) else set()
+
+    def value(name: str) -> Any:
+        if name in categorical:
+            return "unknown"
+        if "pct" in name:
+            return round(rng.uniform(0, 100), 2)
+        if name.startswith(("num_", "n_")):
+            return rng.randint(0, 12)
+        if "ratio" in name:
+            return round(rng.uniform(0, 5), 3)
+        return round(rng.uniform(0, 1000), 2)
+
+    return [{f: value(f) for f in features} for _ in range(n)]
+
+# ---------- transports ----------
+class HttpTransport:
+    """Keep-alive http.client connection per client thread."""
+
+    def __init__(self, base_url: str, timeout: float):
+        u = urlsplit(base_url)
+        self.host, self.port = u.hostname or "127.0.0.1", u.port or 80
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _conn(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return conn
+
+    def get(self, path: str) -> int:
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            conn.request("GET", path)
+            return conn.getresponse().status
+        finally:
+            conn.close()
+
+    def post(self, path: str, body: bytes) -> int:
+        conn = self._conn()
+        try:
+            conn.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+            r = conn.getresponse()
+            r.read()
+            return r.status
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            self._local.conn = None
+            raise
+
+    def close(self) -> None:
+        pass
+
+class InProcessTransport:
+    """FastAPI TestClient around the imported app (lifespan runs on enter)."""
+
+    def __init__(self, module: str):
+        import importlib
+
+        from fastapi.testclient import TestClient
+
+        self.client = TestClient(importlib.import_module(module).app)
+        self.client.__enter__()
+
+    def get(self, path: str) -> int:
+        return self.client.get(path).status_code
+
+    def post(self, path: str, body: bytes) -> int:
+        return self.client.post(path, content=body, headers={"Content-Type": "application/json"}).status_code
+
+    def close(self) -> None:
+        self.client.__exit__(None, None, None)
+
+# ---------- run ----------
+def wait_ready(transport: Any, path: str, timeout: float) -> bool:
+    """Poll the readiness endpoint so model loading is not measured as latency."""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if transport.get(path) == 200:
+                return True
+        except (OSError, http.client.HTTPException):
+            pass
+        time.sleep(0.2)
+    return False
+
+def _pct(sorted_ms: List[float], q: float) -> Optional[float]:
+    if not sorted_ms:
+        return None
+    return round(sorted_ms[min(len(sorted_ms) - 1, int(q * len(sorted_ms)))], 3)
+
+def _summary(values: List[float]) -> Dict[str, Optional[float]]:
+    s = sorted(values)
+    return {
+        "p50": _pct(s, 0.50), "p95": _pct(s, 0.95), "p99": _pct(s, 0.99),
+        "max": round(s[-1], 3) if s else None, "mean": round(sum(s) / len(s), 3) if s else None,
+    }
+
+def run_load(
+    post: Callable[[str, bytes], int],
+    path: str,
+    payloads: List[Dict[str, Any]],
+    rate: float,
+    duration: float,
+    concurrency: int,
+    max_backlog: int,
+    poisson: bool,
+    seed: int,
+) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    bodies = [json.dumps(p).encode("utf-8") for p in payloads]
+    lock = threading.Lock()
+    latency_ms: List[float] = []
+    service_ms: List[float] = []
+    statuses: Dict[str, int] = {}
+    backlog = [0]
+    dropped = 0
+
+    def fire(body: bytes, due: float) -> None:
+        t_send = time.perf_counter()
+        try:
+            status = str(post(path, body))
+        except Exception as e:
+            status = type(e).__name__
+        t_done = time.perf_counter()
+        with lock:
+            backlog[0] -= 1
+            statuses[status] = statuses.get(status, 0) + 1
+            if status.startswith("2"):
+                latency_ms.append((t_done - due) * 1000.0)
+                service_ms.append((t_done - t_send) * 1000.0)
+
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="loadgen")
+    t0 = time.perf_counter()
+    due = t0
+    i = 0
+    while True:
+        due += rng.expovariate(rate) if poisson else 1.0 / rate
+        if due - t0 >= duration:
+            break
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        with lock:
+            if max_backlog and backlog[0] >= max_backlog:
+                dropped += 1
+                i += 1
+                continue
+            backlog[0] += 1
+        pool.submit(fire, bodies[i % len(bodies)], due)
+        i += 1
+    t_sched = time.perf_counter() - t0
+    pool.shutdown(wait=True)
+    elapsed = time.perf_counter() - t0
+
+    ok = len(latency_ms)
+    sent = sum(statuses.values())
+    return {
+        "scheduled": i,
+        "sent": sent,
+        "ok": ok,
+        "dropped_client_side": dropped,
+        "errors": sent - ok,
+        "error_rate": round((sent - ok) / sent, 4) if sent else 0.0,
+        "status_counts": statuses,
+        "offered_rps": round(i / t_sched, 2) if t_sched else None,
+        "achieved_rps": round(ok / elapsed, 2) if elapsed else None,
+        "elapsed_s": round(elapsed, 3),
+        "latency_ms": _summary(latency_ms),
+        "service_ms": _summary(service_ms),
+    }
+
+# ---------- report ----------
+def to_html(report: Dict[str, Any]) -> str:
+    r = report["result"]
+
+    def rows(d: Dict[str, Any]) -> str:
+        return "".join(f"<tr><th>{html.escape(str(k))}</th><td>{html.escape(str(v))}</td></tr>" for k, v in d.items())
+
+    lat = "".join(
+        f"<tr><th>{name}</th>" + "".join(f"<td>{r[name][q]}</td>" for q in ("p50", "p95", "p99", "max", "mean")) + "</tr>"
+        for name in ("latency_ms", "service_ms")
+    )
+    cfg = {k: report[k] for k in ("target", "url", "source", "payloads", "rate", "duration_s", "concurrency", "poisson")}
+    counts = {k: r[k] for k in ("scheduled", "sent", "ok", "errors", "error_rate", "dropped_client_side", "offered_rps", "achieved_rps")}
+    return f"""<!doctype html>
+<html><head><meta charset="utf-8"><title>Load test {html.escape(report['target'])} {report['started_at']}</title>
+<style>body{{font-family:sans-serif;margin:2em}}table{{border-collapse:collapse;margin-bottom:1.5em}}
+th,td{{border:1px solid #ccc;padding:4px 10px;text-align:left}}</style></head><body>
+<h1>Load test: {html.escape(report['target'])}</h1>
+<p>{report['started_at']}</p>
+<h2>Config</h2><table>{rows(cfg)}</table>
+<h2>Throughput &amp; errors</h2><table>{rows(counts)}</table>
+<h2>Latency (ms)</h2>
+<table><tr><th></th><th>p50</th><th>p95</th><th>p99</th><th>max</th><th>mean</th></tr>{lat}</table>
+<p>latency_ms is measured from the scheduled arrival (includes client-side queueing); service_ms from the actual send.</p>
+<h2>Status codes</h2><table>{rows(r['status_counts'])}</table>
+</body></html>
+"""
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Open-loop load test for the fraud / credit APIs and the gateway.")
+    ap.add_argument("--target", choices=sorted(TARGETS), default="fraud")
+    ap.add_argument("--source", choices=sorted(SOURCES), default=None, help="default: fraud-logs, or credit-synth for --target credit")
+    ap.add_argument("--base-url", default=None, help="live server (default per target); ignored with --in-process")
+    ap.add_argument("--in-process", action="store_true", help="drive the app through TestClient instead of HTTP")
+    ap.add_argument("--rate", type=float, default=50.0, help="arrivals per second")
+    ap.add_argument("--duration", type=float, default=30.0, help="seconds of arrivals")
+    ap.add_argument("--poisson", action="store_true", help="exponential inter-arrival gaps instead of a fixed interval")
+    ap.add_argument("--concurrency", type=int, default=64, help="max requests in flight")
+    ap.add_argument("--max-backlog", type=int, default=10_000, help="drop arrivals once this many are queued or in flight (0 = never)")
+    ap.add_argument("--logs-glob", default="*.jsonl", help="fraud-logs: files under api/logs (shadow files have no tx)")
+    ap.add_argument("--payloads", type=int, default=5000, help="distinct payloads to cycle through")
+    ap.add_argument("--timeout", type=float, default=10.0, help="per-request timeout (s)")
+    ap.add_argument("--ready-timeout", type=float, default=60.0, help="wait this long for the target to be ready")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--out-dir", type=Path, default=OUT_DIR)
+    args = ap.parse_args()
+
+    source = args.source or ("credit-synth" if args.target == "credit" else "fraud-logs")
+    kind = SOURCES[source]
+    default_url, module, ready_path, paths = TARGETS[args.target]
+    if kind not in paths:
+        raise SystemExit(f"[ERR] target {args.target} does not take {kind} payloads")
+
+    rng = random.Random(args.seed)
+    if source == "fraud-logs":
+        payloads = fraud_log_payloads(args.logs_glob, args.payloads)
+        if not payloads:
+            raise SystemExit(f"[ERR] no tx payloads in {FRAUD_LOGS / args.logs_glob}; try --source fraud-synth")
+    elif source == "fraud-synth":
+        payloads = fraud_synth_payloads(args.payloads, rng)
+    else:
+        payloads = credit_synth_payloads(args.payloads, rng)
+
+    url = "in-process" if args.in_process else (args.base_url or default_url)
+    transport: Any = InProcessTransport(module) if args.in_process else HttpTransport(url, args.timeout)
+    started = datetime.now()
+    print(f"[..] {args.target} {paths[kind]} @ {url}: {args.rate}/s for {args.duration}s, {len(payloads)} payloads ({source})")
+    try:
+        if not wait_ready(transport, ready_path, args.ready_timeout):
+            raise SystemExit(f"[ERR] {url}{ready_path} not ready after {args.ready_timeout}s")
+        result = run_load(
+            transport.post, paths[kind], payloads, args.rate, args.duration,
+            args.concurrency, args.max_backlog, args.poisson, args.seed,
+        )
+    finally:
+        transport.close()
+
+    report = {
+        "target": args.target,
+        "url": url,
+        "path": paths[kind],
+        "source": source,
+        "payloads": len(payloads),
+        "rate": args.rate,
+        "duration_s": args.duration,
+        "concurrency": args.concurrency,
+        "poisson": args.poisson,
+        "started_at": started.isoformat(timespec="seconds"),
+        "result": result,
+    }
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    stem = f"loadtest_{args.target}_{started:%Y%m%d_%H%M%S}"
+    (args.out_dir / f"{stem}.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
+    (args.out_dir / f"{stem}.html").write_text(to_html(report), encoding="utf-8")
+    lat = result["latency_ms"]
+    print(
+        f"[OK] {result['ok']}/{result['sent']} ok, {result['achieved_rps']} req/s, "
+        f"p50 {lat['p50']} / p95 {lat['p95']} / p99 {lat['p99']} / max {lat['max']} ms, "
+        f"error rate {result['error_rate']}, dropped {result['dropped_client_side']}"
+    )
+    print(f"[OK] Load test report written to: {args.out_dir / stem}.{{json,html}}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# shared_env/ops/profile_api_startup.py
+"""
+Startup profile for the fraud and credit APIs.
+
+For each app, in fresh interpreters (so nothing is pre-imported):
+- `python -X importtime -c "import <app module>"` -> total import time and the
+  heaviest modules by cumulative time
+- an in-process harness (TestClient + lifespan) -> time to liveness (/livez 200),
+  time to readiness (/ready 200) and the app's own startup breakdown (import,
+  model load, warm-up) as reported by /ready
+
+Writes docs_global/reports/startup/startup_profile_YYYYMMDD.{json,md}.
+
+Usage:
+  python shared_env/ops/profile_api_startup.py [--apps fraud credit] [--top 15]
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import subprocess
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parents[2]
+OUT_DIR = ROOT / "docs_global" / "reports" / "startup"
+
+APPS = {
+    "fraud": "fraud_detection_system.api.app",
+    "credit": "credit_scoring_system.api.app",
+}
+
+HARNESS = r"""
+import json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {root!r})
+import importlib
+from fastapi.testclient import TestClient
+mod = importlib.import_module({module!r})
+t_import = time.perf_counter()
+out = {{"import_s": round(t_import - t0, 3), "live_s": None, "ready_s": None, "startup": None}}
+with TestClient(mod.app) as c:
+    if c.get("/livez").status_code == 200:
+        out["live_s"] = round(time.perf_counter() - t0, 3)
+    deadline = time.perf_counter() + {timeout}
+    while time.perf_counter() < deadline:
+        r = c.get("/ready")
+        if r.status_code == 200:
+            out["ready_s"] = round(time.perf_counter() - t0, 3)
+            out["startup"] = r.json().get("startup")
+            break
+        time.sleep(0.02)
+print("@@RESULT@@" + json.dumps(out))
+"""
+
+def import_profile(module: str, top: int) -> Dict[str, Any]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    rows: List[Dict[str, Any]] = []
+    for line in proc.stderr.splitlines():
+        # "import time:   self_us |  cumulative_us | <indent>module"
+        raw = line.split("|")
+        if not line.startswith("import time:") or len(raw) != 3 or not raw[1].strip().isdigit():
+            continue
+        rows.append({
+            "module": raw[2].strip(),
+            "depth": (len(raw[2]) - len(raw[2].lstrip())) // 2,
+            "self_ms": round(int(raw[0].split(":")[1]) / 1000, 1),
+            "cumulative_ms": round(int(raw[1]) / 1000, 1),
+        })
+    total = next((r["cumulative_ms"] for r in rows if r["module"] == module), None)
+    heaviest = sorted((r for r in rows if r["module"] != module), key=lambda r: r["cumulative_ms"], reverse=True)
+    return {"ok": proc.returncode == 0, "total_ms": total, "top": heaviest[:top], "stderr_tail": proc.stderr[-500:] if proc.returncode else ""}
+
+def lifecycle_profile(module: str, timeout: float) -> Dict[str, Any]:
+    code = HARNESS.format(root=str(ROOT), module=module, timeout=timeout)
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    for line in proc.stdout.splitlines():
+        if line.startswith("@@RESULT@@"):
+            return json.loads(line[len("@@RESULT@@"):])
+    return {"error": (proc.stderr or proc.stdout)[-500:]}
+
+def to_markdown(report: Dict[str, Any]) -> str:
+    lines = [f"# API startup profile — {report['date']}", ""]
+    lines += ["| app | import (ms) | time to live (s) | time to ready (s) |", "|---|---|---|---|"]
+    for name, r in report["apps"].items():
+        lc = r["lifecycle"]
+        lines.append(f"| {name} | {r['imports']['total_ms']} | {lc.get('live_s')} | {lc.get('ready_s')} |")
+    for name, r in report["apps"].items():
+        lines += ["", f"## {name}", "", f"App startup breakdown: `{json.dumps(r['lifecycle'].get('startup'))}`", ""]
+        lines += ["| module | cumulative (ms) | self (ms) |", "|---|---|---|"]
+        for m in r["imports"]["top"]:
+            lines.append(f"| {m['module']} | {m['cumulative_ms']} | {m['self_ms']} |")
+    return "\n".join(lines) + "\n"
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Profile import / liveness / readiness time of the APIs.")
+    ap.add_argument("--apps", nargs="+", choices=sorted(APPS), default=sorted(APPS))
+    ap.add_argument("--top", type=int, default=15, help="heaviest imports to list per app")
+    ap.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for /ready")
+    ap.add_argument("--out-dir", type=Path, default=OUT_DIR)
+    args = ap.parse_args()
+
+    report: Dict[str, Any] = {"date": date.today().isoformat(), "python": sys.version.split()[0], "apps": {}}
+    for name in args.apps:
+        module = APPS[name]
+        print(f"[..] {name}: {module}")
+        report["apps"][name] = {
+            "module": module,
+            "imports": import_profile(module, args.top),
+            "lifecycle": lifecycle_profile(module, args.timeout),
+        }
+
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    stem = f"startup_profile_{date.today().strftime('%Y%m%d')}"
+    (args.out_dir / f"{stem}.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
+    (args.out_dir / f"{stem}.md").write_text(to_markdown(report), encoding="utf-8")
+    for name, r in report["apps"].items():
+        lc = r["lifecycle"]
+        print(f"[OK] {name}: import {r['imports']['total_ms']} ms, live {lc.get('live_s')} s, ready {lc.get('ready_s')} s")
+    print(f"[OK] Startup profile written to: {args.out_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+from shared_env.benchmarks import compare_results
+
+def _run(commit, t, mb):
+    return {
+        "meta": {"commit": commit},
+        "results": [
+            {"case": "reports.compute_kpis", "n": 100000, "time_s": {"min": t}, "peak_mb": mb},
+            {"case": "monitoring.psi_numeric", "n": 1000, "time_s": {"min": 0.0002}, "peak_mb": 0.03},
+            {"case": "credit.predict_pd", "n": 1000, "skipped": "ModuleNotFoundError: No module named 'mlflow'"},
+        ],
+    }
+
+def test_compare_flags_time_and_memory_regressions_only():
+    base = _run("aaa", 0.070, 8.0)
+    rows = compare_results(base, _run("bbb", 0.075, 8.2), threshold=0.10)
+    assert [r["regression"] for r in rows] == [[], []]  # within 10%; skipped case not compared
+    rows = compare_results(base, _run("ccc", 0.100, 12.0), threshold=0.10)
+    assert rows[0]["regression"] == ["time", "memory"] and rows[0]["time_ratio"] > 1.4
+    # sub-millisecond cases never count, however large the ratio
+    fast = _run("ddd", 0.070, 8.0)
+    fast["results"][1]["time_s"]["min"] = 0.0009
+    assert compare_results(base, fast)[1]["regression"] == []